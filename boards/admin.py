@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import Workspace, Project, Column, Task, Tag, ActivityLog
+from .models import (
+    Workspace, Project, Column, Task, Tag, ActivityLog,
+    ActivityHourlyRollup, ActivityDailyRollup, OutboundEmail,
+)
 
 @admin.register(Workspace)
 class WorkspaceAdmin(admin.ModelAdmin):
@@ -46,3 +49,18 @@ class ActivityLogAdmin(admin.ModelAdmin):
         "user_agent",
     )
 
+
+
+@admin.register(ActivityHourlyRollup, ActivityDailyRollup)
+class ActivityRollupAdmin(admin.ModelAdmin):
+    list_display = ("bucket", "action", "workspace_id", "project_id", "count")
+    list_filter = ("action",)
+    date_hierarchy = "bucket"
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ("subject", "to_email", "status", "attempts", "next_attempt_at", "sent_at")
+    list_filter = ("status",)
+    search_fields = ("to_email", "subject")
+    readonly_fields = ("created_at", "sent_at", "last_error")
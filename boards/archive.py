@@ -0,0 +1,158 @@
+"""Cold storage for old ActivityLog rows as compressed JSONL segments.
+
+Layout under ``ACTIVITY_ARCHIVE_DIR``::
+
+    2025/03/activity-20250314-000123456-000223455.jsonl.gz    one event per line
+    2025/03/activity-20250314-000123456-000223455.index.json  time range + counts
+
+A segment holds events of a single UTC day; large days are split into
+several segments, named after the id range they cover. A segment is only
+visible once its index is written, and rows are deleted from the database
+after that, so a rerun first drops rows already covered by a published
+segment (see ``archived_ranges``) instead of archiving them twice.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+EXTENSIONS = {"gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+
+
+def archive_dir(directory=None) -> Path:
+    directory = directory or getattr(settings, "ACTIVITY_ARCHIVE_DIR", "")
+    if not directory:
+        raise ImproperlyConfigured("Set ACTIVITY_ARCHIVE_DIR or pass a directory.")
+    return Path(directory)
+
+
+def _open(path: Path, mode: str):
+    """Open a segment in text mode, picking the codec from the file name."""
+    if path.name.endswith(EXTENSIONS["zstd"]):
+        try:
+            import zstandard
+        except ImportError as exc:
+            raise ImproperlyConfigured("zstd segments need the 'zstandard' package.") from exc
+        return zstandard.open(path, mode, encoding="utf-8")
+    return gzip.open(path, mode, encoding="utf-8")
+
+
+def serialize(row: dict) -> str:
+    return json.dumps(
+        {
+            "id": row["id"],
+            "created_at": row["created_at"].isoformat(),
+            "user_id": row["user_id"],
+            "action": row["action"],
+            "metadata": row["metadata"],
+            "request_path": row["request_path"],
+            "ip_address": row["ip_address"],
+            "user_agent": row["user_agent"],
+        },
+        separators=(",", ":"),
+    )
+
+
+def _day_folder(directory: Path, day) -> Path:
+    return directory / f"{day:%Y}" / f"{day:%m}"
+
+
+def archived_ranges(directory: Path, day) -> list[tuple[int, int]]:
+    """``(first_id, last_id)`` of every published segment of ``day``."""
+    ranges = []
+    for index_path in sorted(_day_folder(directory, day).glob(f"activity-{day:%Y%m%d}-*.index.json")):
+        index = json.loads(index_path.read_text())
+        ranges.append((index["first_id"], index["last_id"]))
+    return ranges
+
+
+class SegmentWriter:
+    """Streams events of one day into a segment, then writes its index."""
+
+    def __init__(self, directory: Path, day, first_id: int, last_id: int, compression: str = "gzip"):
+        # Rewriting the same id range replaces the segment, never duplicates it.
+        stem = f"activity-{day:%Y%m%d}-{first_id:09d}-{last_id:09d}"
+        folder = _day_folder(directory, day)
+        folder.mkdir(parents=True, exist_ok=True)
+        self.path = folder / f"{stem}{EXTENSIONS[compression]}"
+        self.index_path = folder / f"{stem}.index.json"
+        self._tmp = self.path.with_name(self.path.name + ".tmp")
+        self._fh = _open(self._tmp, "wt")
+        self.actions: Counter = Counter()
+        self.count = 0
+        self.first_id = self.last_id = None
+        self.start = self.end = None
+
+    def write(self, row: dict) -> None:
+        self._fh.write(serialize(row) + "\n")
+        self.count += 1
+        self.actions[row["action"]] += 1
+        self.first_id = row["id"] if self.first_id is None else min(self.first_id, row["id"])
+        self.last_id = row["id"] if self.last_id is None else max(self.last_id, row["id"])
+        self.start = row["created_at"] if self.start is None else min(self.start, row["created_at"])
+        self.end = row["created_at"] if self.end is None else max(self.end, row["created_at"])
+
+    def close(self) -> dict:
+        """Make the segment durable and visible; returns its index."""
+        self._fh.close()
+        with open(self._tmp, "rb") as fh:
+            os.fsync(fh.fileno())
+        os.replace(self._tmp, self.path)
+        index = {
+            "segment": self.path.name,
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "first_id": self.first_id,
+            "last_id": self.last_id,
+            "count": self.count,
+            "actions": dict(self.actions),
+        }
+        tmp = self.index_path.with_name(self.index_path.name + ".tmp")
+        tmp.write_text(json.dumps(index, indent=1))
+        os.replace(tmp, self.index_path)
+        return index
+
+
+def iter_archived_activity(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    action: Optional[str] = None,
+    user_id: Optional[int] = None,
+    directory=None,
+) -> Iterator[dict]:
+    """
+    Yield archived events in ``[start, end)`` matching ``action``/``user_id``.
+
+    Segments are skipped using their index files and read line by line, so
+    memory use does not depend on segment size.
+    """
+    root = archive_dir(directory)
+    for index_path in sorted(root.glob("*/*/activity-*.index.json")):
+        index = json.loads(index_path.read_text())
+        if start and datetime.fromisoformat(index["end"]) < start:
+            continue
+        if end and datetime.fromisoformat(index["start"]) >= end:
+            continue
+        if action and action not in index["actions"]:
+            continue
+
+        with _open(index_path.with_name(index["segment"]), "rt") as fh:
+            for line in fh:
+                event = json.loads(line)
+                if action and event["action"] != action:
+                    continue
+                if user_id is not None and event["user_id"] != user_id:
+                    continue
+                created_at = datetime.fromisoformat(event["created_at"])
+                if (start and created_at < start) or (end and created_at >= end):
+                    continue
+                yield event
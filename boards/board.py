@@ -0,0 +1,307 @@
+"""Board loading helpers shared by the board views."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import RowNumber
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+from django.utils.timezone import now
+
+from .caching import board_cache_enabled, board_version, hash_key, tags_version
+from .models import Task
+
+PRIORITIES = {"low", "medium", "high"}
+CARD_TEMPLATE = "boards/partials/task_card.html"
+
+
+def parse_board_filters(request) -> dict:
+    """Read the board filter bar from the query string (raw values)."""
+    return {
+        "assignee": request.GET.get("assignee"),  # "me" or user id
+        "tag": request.GET.get("tag"),
+        "priority": request.GET.get("priority"),
+        "overdue": request.GET.get("overdue"),  # "1" => overdue only
+    }
+
+
+def task_filter_kwargs(filters: dict, user) -> dict:
+    """Turn raw board filters into ``Task`` queryset lookups."""
+    lookups = {}
+    assignee = filters.get("assignee")
+    if assignee == "me":
+        lookups["assignees__id"] = user.id
+    elif assignee and assignee.isdigit():
+        lookups["assignees__id"] = int(assignee)
+
+    tag_id = filters.get("tag")
+    if tag_id and tag_id.isdigit():
+        lookups["tags__id"] = int(tag_id)
+
+    if filters.get("priority") in PRIORITIES:
+        lookups["priority"] = filters["priority"]
+
+    if filters.get("overdue") == "1":
+        lookups["due_date__lt"] = now().date()
+    return lookups
+
+
+def board_tasks(project, filters: dict, user):
+    """All visible (non-archived) tasks of a board, in board order."""
+    return (
+        Task.objects
+        .filter(project=project, archived=False, **task_filter_kwargs(filters, user))
+        .prefetch_related("tags", "assignees")
+        .order_by("column_id", "rank", "id")
+    )
+
+
+def task_cursor(task) -> str:
+    """Keyset position of a card within its column: ``"<rank>:<id>"``."""
+    return f"{task.rank}:{task.pk}"
+
+
+def parse_task_cursor(raw) -> Optional[tuple[str, int]]:
+    rank, _, pk = (raw or "").rpartition(":")
+    return (rank, int(pk)) if pk.isdigit() else None
+
+
+def column_page_size() -> int:
+    return getattr(settings, "BOARD_COLUMN_PAGE_SIZE", 50)
+
+
+def board_depth(raw) -> int:
+    """
+    Cards per column a client asks for (``?depth=``, e.g. after opening
+    "Load more" pages): whole pages, at least one, at most
+    ``BOARD_JSON_MAX_DEPTH`` rounded up to a page.
+    """
+    page = column_page_size()
+    depth = int(raw) if str(raw or "").isdigit() else page
+    depth = min(depth, getattr(settings, "BOARD_JSON_MAX_DEPTH", 500))
+    return max(1, -(-depth // page)) * page
+
+
+def load_board(
+    project, filters: dict, user, columns: Optional[list] = None, page_size: Optional[int] = None
+) -> list:
+    """
+    Return the board's columns with the first ``page_size`` (default
+    ``BOARD_COLUMN_PAGE_SIZE``) matching cards of each in
+    ``col.filtered_tasks``.
+
+    ``col.filtered_count`` is the number of matching cards in the column
+    and ``col.next_cursor`` the position to continue from with
+    ``column_page`` (``None`` when everything is shown). One query numbers
+    and cuts the cards of all columns, plus one prefetch each for tags and
+    assignees; only filtered boards need an extra query to count, others
+    read the column counters.
+    """
+    if columns is None:
+        columns = list(project.columns.all().order_by("order", "pk"))
+    for _ in iter_board(project, filters, user, columns, page_size=page_size):
+        pass
+    return columns
+
+
+def iter_board(
+    project, filters: dict, user, columns: list, chunk_size: int = 2000,
+    page_size: Optional[int] = None,
+):
+    """
+    Fill ``columns`` (in board order) like ``load_board``, yielding each one
+    as soon as its cards have been read. Cards are streamed from the
+    database ``chunk_size`` at a time, so memory stays bounded by a chunk
+    and the columns already handed out.
+    """
+    tasks = board_tasks(project, filters, user)
+    if task_filter_kwargs(filters, user):
+        counts = dict(
+            tasks.order_by().values_list("column_id").annotate(n=Count("id", distinct=True))
+        )
+    else:
+        counts = {col.pk: col.task_count for col in columns}
+    page_size = page_size or column_page_size()
+    first_pages = (
+        tasks.annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=F("column_id"),
+                order_by=[F("rank").asc(), F("id").asc()],
+            )
+        )
+        .filter(position__lte=page_size + 1)  # one extra tells if there is more
+        .order_by("column__order", "column_id", "rank", "id")
+    )
+
+    def fill(col, page):
+        col.filtered_tasks = page[:page_size]
+        col.filtered_count = counts.get(col.pk, 0)
+        col.next_cursor = (
+            task_cursor(col.filtered_tasks[-1]) if len(page) > len(col.filtered_tasks) else None
+        )
+        return col
+
+    pending = iter(columns)
+    col, page = next(pending, None), []
+    for task in first_pages.iterator(chunk_size=chunk_size):
+        while col is not None and task.column_id != col.pk:
+            yield fill(col, page)
+            col, page = next(pending, None), []
+        page.append(task)
+    while col is not None:
+        yield fill(col, page)
+        col, page = next(pending, None), []
+
+
+def column_page(column, filters: dict, user, after=None, limit: Optional[int] = None):
+    """
+    The matching cards of ``column`` that come after the cursor ``after``
+    (from ``task_cursor``), in board order. Returns ``(tasks, next_cursor)``.
+    """
+    limit = limit or column_page_size()
+    tasks = (
+        Task.objects
+        .filter(column=column, archived=False, **task_filter_kwargs(filters, user))
+        .prefetch_related("tags", "assignees")
+        .order_by("rank", "id")
+    )
+    position = parse_task_cursor(after)
+    if position:
+        rank, pk = position
+        tasks = tasks.filter(Q(rank__gt=rank) | Q(rank=rank, pk__gt=pk))
+    page = list(tasks[: limit + 1])
+    if len(page) > limit:
+        return page[:limit], task_cursor(page[limit - 1])
+    return page, None
+
+
+def get_board(project, filters: dict, user, page_size: Optional[int] = None) -> list:
+    """
+    Cached ``load_board`` (plain ``load_board`` unless
+    ``BOARD_CACHE_ENABLED``).
+
+    Entries are keyed by the project's board version stamp plus the resolved
+    filter lookups ("me" becomes a user id, "overdue" today's date) and the
+    page size, so any change to the board yields a new key and stale boards
+    are never served.
+    """
+    page_size = page_size or column_page_size()
+    if not board_cache_enabled():
+        return load_board(project, filters, user, page_size=page_size)
+    lookups = task_filter_kwargs(filters, user)
+    key = "boards:board:{}:{}:{}:{}".format(
+        project.pk, board_version(project.pk), hash_key(sorted(lookups.items())), page_size
+    )
+    columns = cache.get(key)
+    if columns is None:
+        columns = load_board(project, filters, user, page_size=page_size)
+        cache.set(key, columns, getattr(settings, "BOARD_CACHE_TIMEOUT", 3600))
+    return columns
+
+
+def bump_m2m_version(task_ids) -> None:
+    """Mark the tags/assignees of ``task_ids`` as changed (new card key)."""
+    if task_ids:
+        Task.objects.filter(pk__in=list(task_ids)).update(m2m_version=F("m2m_version") + 1)
+
+
+def card_key(task, tags: str) -> str:
+    # Usernames are read from the prefetched assignees, so a rename makes
+    # a new key too.
+    users = hash_key([(u.pk, u.username) for u in task.assignees.all()])
+    return "boards:card:{}:{}:{}:{}:{}".format(
+        task.pk, task.updated_at.timestamp(), task.m2m_version, tags, users
+    )
+
+
+def render_cards(tasks) -> None:
+    """
+    Set ``t.card_html`` on each task (tags and assignees prefetched).
+
+    Card fragments are cached under the task id, ``updated_at``,
+    ``m2m_version``, the tags version and the assignees' usernames, fetched
+    in one ``get_many``; only the cards that changed are rendered again.
+    Every part of the key comes from the database, so a process-local cache
+    never serves a stale card.
+    """
+    if not tasks:
+        return
+    tags = tags_version()
+    keys = [card_key(t, tags) for t in tasks]
+    cached = cache.get_many(keys)
+    template = get_template(CARD_TEMPLATE)
+    fresh = {}
+    for task, key in zip(tasks, keys):
+        html = cached.get(key)
+        if html is None:
+            html = fresh[key] = template.render({"t": task})
+        task.card_html = mark_safe(html)
+    if fresh:
+        cache.set_many(fresh, getattr(settings, "BOARD_CACHE_TIMEOUT", 3600))
+
+
+def archived_page(project, after=None, limit: int = 50):
+    """
+    Archived tasks of ``project``, most recently archived first, after the
+    cursor ``after`` (``"<archived_at ISO>|<id>"``). Returns ``(tasks,
+    next_cursor)``.
+    """
+    tasks = (
+        Task.objects
+        .filter(project=project, archived=True)
+        .select_related("column")
+        .order_by("-archived_at", "-id")
+    )
+    stamp, _, pk = (after or "").rpartition("|")
+    if stamp and pk.isdigit():
+        try:
+            stamp = datetime.fromisoformat(stamp)
+        except ValueError:
+            pass
+        else:
+            tasks = tasks.filter(Q(archived_at__lt=stamp) | Q(archived_at=stamp, pk__lt=int(pk)))
+    page = list(tasks[: limit + 1])
+    if len(page) > limit:
+        last = page[limit - 1]
+        return page[:limit], f"{last.archived_at.isoformat()}|{last.pk}"
+    return page, None
+
+
+def task_payload(t, tags: dict, users: dict) -> dict:
+    """Card fields of a task (tags/assignees prefetched); fills the lookups."""
+    for tag in t.tags.all():
+        tags[tag.pk] = {"name": tag.name, "color": tag.color}
+    for u in t.assignees.all():
+        users[u.pk] = u.username
+    return {
+        "id": t.pk,
+        "title": t.title,
+        "description": t.description,
+        "priority": t.priority,
+        "due_date": t.due_date.isoformat() if t.due_date else None,
+        "tags": [tag.pk for tag in t.tags.all()],
+        "assignees": [u.pk for u in t.assignees.all()],
+    }
+
+
+def board_payload(project, columns: list) -> dict:
+    """Compact JSON-ready board: only what the cards render."""
+    tags, users = {}, {}
+    out_columns = [
+        {
+            "id": col.pk,
+            "name": col.name,
+            "color": col.color,
+            "tasks": [task_payload(t, tags, users) for t in col.filtered_tasks],
+            "total": col.filtered_count,
+            "next": col.next_cursor,
+        }
+        for col in columns
+    ]
+    return {"project": project.pk, "columns": out_columns, "tags": tags, "users": users}
@@ -0,0 +1,151 @@
+"""Set-based operations on many tasks of one board at once."""
+
+from __future__ import annotations
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils.timezone import now
+
+from .board import PRIORITIES
+from .caching import bump_board_version
+from .counters import adjust_counters
+from .journal import record_changes
+from .models import Tag, Task
+from .ranking import last_rank, ranks_between
+
+OPERATIONS = {
+    "move", "archive", "unarchive", "priority",
+    "add_assignee", "remove_assignee", "add_tag", "remove_tag",
+}
+MAX_TASKS = 500
+JOURNAL_OPS = {"move": "moved", "archive": "archived"}
+
+
+class BulkOperationError(ValueError):
+    """The request is malformed or references objects outside the board."""
+
+
+def _int(value, what: str) -> int:
+    # Only real integers or digit strings: int() would also take 1.9 or true.
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.isascii() and value.isdigit():
+        return int(value)
+    raise BulkOperationError(f"Invalid {what}.")
+
+
+def apply_bulk_operation(project, user, task_ids, op: str, value=None) -> dict:
+    """
+    Apply ``op`` to the tasks ``task_ids`` of ``project`` in one
+    transaction: archived tasks for "unarchive", active ones otherwise.
+    Access to the project must already have been checked.
+
+    Returns ``{"op", "updated", "skipped"}`` where ``skipped`` lists ids that
+    are not such tasks of this board (or, for (un)archive, not the user's).
+    """
+    if op not in OPERATIONS:
+        raise BulkOperationError(f"Unknown operation {op!r}.")
+    if not isinstance(task_ids, list) or not task_ids:
+        raise BulkOperationError("No tasks selected.")
+    if len(task_ids) > MAX_TASKS:
+        raise BulkOperationError(f"At most {MAX_TASKS} tasks per request.")
+    requested = list(dict.fromkeys(_int(pk, "task id") for pk in task_ids))
+
+    tasks = Task.objects.filter(project=project, archived=op == "unarchive", pk__in=requested)
+    if op in ("archive", "unarchive") and project.workspace.owner_id != user.id:
+        # Same rule as task_archive: owner, creator or assignee only.
+        tasks = tasks.filter(
+            Q(creator=user)
+            | Q(pk__in=Task.assignees.through.objects.filter(user=user).values("task_id"))
+        )
+
+    stamp = now()
+    with transaction.atomic():
+        states = {
+            row[0]: row[1:]
+            for row in tasks.select_for_update().values_list("pk", *Task.COUNTER_FIELDS)
+        }
+        found = set(states)
+        ids = [pk for pk in requested if pk in found]  # keep the caller's order
+
+        if ids:
+            if op == "move":
+                column_id = _move(project, ids, value, stamp)
+                _count(states, column_id=column_id)
+            elif op == "archive":
+                Task.objects.filter(pk__in=ids).update(archived=True, archived_at=stamp, updated_at=stamp)
+                _count(states, archived=True)
+            elif op == "unarchive":
+                _unarchive(ids, states, stamp)
+                _count(states, archived=False)
+            elif op == "priority":
+                if value not in PRIORITIES:
+                    raise BulkOperationError("Invalid priority.")
+                Task.objects.filter(pk__in=ids).update(priority=value, updated_at=stamp)
+                _count(states, priority=value)
+            elif op in ("add_assignee", "remove_assignee"):
+                user_id = _int(value, "user id")
+                ws = project.workspace
+                if user_id != ws.owner_id and not ws.memberships.filter(user_id=user_id).exists():
+                    raise BulkOperationError("User is not in this workspace.")
+                _set_m2m(Task.assignees.through, "user_id", user_id, ids, op.startswith("add"), stamp)
+            else:
+                tag_id = _int(value, "tag id")
+                if not Tag.objects.filter(pk=tag_id).exists():
+                    raise BulkOperationError("Unknown tag.")
+                _set_m2m(Task.tags.through, "tag_id", tag_id, ids, op.startswith("add"), stamp)
+
+    # Queryset updates bypass model signals, so invalidate explicitly.
+    if ids:
+        bump_board_version(project.pk)
+        record_changes(project.pk, "task", JOURNAL_OPS.get(op, "updated"), ids)
+    return {"op": op, "updated": len(ids), "skipped": [pk for pk in requested if pk not in found]}
+
+
+def _count(states: dict, **changes) -> None:
+    """Counter deltas for ``states`` (pk -> ``Task.counter_state()``) after
+    setting ``changes`` (``Task.COUNTER_FIELDS`` names) on all of them."""
+    new_states = []
+    for state in states.values():
+        values = {**dict(zip(Task.COUNTER_FIELDS, state)), **changes}
+        new_states.append(tuple(values[field] for field in Task.COUNTER_FIELDS))
+    adjust_counters(states.values(), new_states)
+
+
+def _move(project, ids, column_id, stamp) -> int:
+    column_id = _int(column_id, "column id")
+    if not project.columns.filter(pk=column_id).exists():
+        raise BulkOperationError("Column is not on this board.")
+    # Append in the caller's order below the column's current last card.
+    moving = {t.pk: t for t in Task.objects.filter(pk__in=ids).only("pk")}
+    tasks = []
+    for pk, rank in zip(ids, ranks_between(last_rank(column_id), "", len(ids))):
+        task = moving[pk]
+        task.column_id, task.rank, task.updated_at = column_id, rank, stamp
+        tasks.append(task)
+    Task.objects.bulk_update(tasks, ["column", "rank", "updated_at"], batch_size=500)
+    return column_id
+
+
+def _unarchive(ids, states, stamp) -> None:
+    # Restored cards go to the bottom of their column, in the caller's order.
+    column_index = Task.COUNTER_FIELDS.index("column_id")
+    by_column = {}
+    for pk in ids:
+        by_column.setdefault(states[pk][column_index], []).append(pk)
+    tasks = []
+    for column_id, pks in by_column.items():
+        for pk, rank in zip(pks, ranks_between(last_rank(column_id), "", len(pks))):
+            tasks.append(Task(pk=pk, rank=rank, archived=False, archived_at=None, updated_at=stamp))
+    Task.objects.bulk_update(tasks, ["rank", "archived", "archived_at", "updated_at"], batch_size=500)
+
+
+def _set_m2m(through, field: str, target_id: int, ids, add: bool, stamp) -> None:
+    if add:
+        through.objects.bulk_create(
+            [through(task_id=pk, **{field: target_id}) for pk in ids],
+            ignore_conflicts=True,
+        )
+    else:
+        through.objects.filter(task_id__in=ids, **{field: target_id}).delete()
+    Task.objects.filter(pk__in=ids).update(updated_at=stamp, m2m_version=F("m2m_version") + 1)
@@ -0,0 +1,79 @@
+"""Cache keys and version stamps for board data."""
+
+from __future__ import annotations
+
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max
+
+from .models import Tag
+
+BOARD_VERSION_KEY = "boards:board-version:{}"
+ACCESS_VERSION_KEY = "boards:access-version:{}"
+
+
+def board_cache_enabled() -> bool:
+    """Whether built boards are cached (card fragments always are, see
+    ``boards.board.card_key``)."""
+    return getattr(settings, "BOARD_CACHE_ENABLED", False)
+
+
+def _new_stamp() -> str:
+    # Random rather than a counter: if a stamp is evicted we must never hand
+    # out a value that was used before, or stale entries could come back.
+    return uuid.uuid4().hex
+
+
+def _stamps(keys: list[str]) -> dict:
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, _new_stamp(), None)
+            found[key] = cache.get(key)
+    return found
+
+
+def board_version(project_id: int) -> str:
+    """Current version stamp of a project's board (tags included)."""
+    board_key = BOARD_VERSION_KEY.format(project_id)
+    return f"{_stamps([board_key])[board_key]}.{tags_version()}"
+
+
+def bump_board_version(*project_ids: int) -> None:
+    """Invalidate every cached board of the given projects once committed."""
+    keys = {BOARD_VERSION_KEY.format(pk) for pk in project_ids if pk}
+    if keys:
+        transaction.on_commit(
+            lambda: cache.set_many({key: _new_stamp() for key in keys}, None)
+        )
+
+
+def tags_version() -> str:
+    """
+    Version of the (shared) tag names and colors, read from the database so
+    it is the same in every process: any save moves the newest
+    ``updated_at``, any delete the count.
+    """
+    state = Tag.objects.aggregate(n=Count("pk"), latest=Max("updated_at"))
+    latest = state["latest"].timestamp() if state["latest"] else 0
+    return f"{state['n']}-{latest}"
+
+
+def access_version(workspace_id: int) -> str:
+    """Version stamp of a workspace's membership (owner + members)."""
+    key = ACCESS_VERSION_KEY.format(workspace_id)
+    return _stamps([key])[key]
+
+
+def bump_access_version(workspace_id: int) -> None:
+    """Forget every cached access decision for a workspace once committed."""
+    key = ACCESS_VERSION_KEY.format(workspace_id)
+    transaction.on_commit(lambda: cache.set(key, _new_stamp(), None))
+
+
+def hash_key(*parts) -> str:
+    return hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
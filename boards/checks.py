@@ -0,0 +1,36 @@
+"""System checks for settings that are unsafe with several worker processes."""
+
+from django.conf import settings
+from django.core.checks import Error, register
+
+
+def _cache_is_shared() -> bool:
+    return not settings.CACHES["default"]["BACKEND"].endswith(".LocMemCache")
+
+
+@register()
+def check_board_cache(app_configs, **kwargs):
+    # Version stamps bumped in one process's memory never reach the others.
+    if getattr(settings, "BOARD_CACHE_ENABLED", False) and not _cache_is_shared():
+        return [
+            Error(
+                "BOARD_CACHE_ENABLED needs a cache shared by all workers.",
+                hint="Set CACHE_BACKEND to Redis or Memcached, or disable BOARD_CACHE_ENABLED.",
+                id="boards.E001",
+            )
+        ]
+    return []
+
+
+@register()
+def check_access_cache(app_configs, **kwargs):
+    # A member removed in one worker would keep access in the others.
+    if getattr(settings, "WORKSPACE_ACCESS_CACHE_TIMEOUT", 0) > 0 and not _cache_is_shared():
+        return [
+            Error(
+                "WORKSPACE_ACCESS_CACHE_TIMEOUT needs a cache shared by all workers.",
+                hint="Set CACHE_BACKEND to Redis or Memcached, or set WORKSPACE_ACCESS_CACHE_TIMEOUT=0.",
+                id="boards.E002",
+            )
+        ]
+    return []
@@ -0,0 +1,128 @@
+"""
+Denormalized active-task counters on ``Column`` and ``Project``.
+
+Single-task writes go through the signals in ``boards.signals``, which
+compare the stored state of a task (``Task.counter_state``, read with the
+row locked) to the state it is saved with and apply the difference as
+``F()`` updates.
+Set-based paths (bulk operations, purges) call ``adjust_counters`` or
+``recount_counters`` themselves.
+
+Overdue counts are not kept here: tasks turn overdue at midnight without a
+write, so they are counted at read time (see ``boards.dashboard``).
+"""
+
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Greatest
+
+from .models import Column, Project, Task
+
+COUNTERS = ("task_count", "low_count", "medium_count", "high_count")
+PRIORITY_COUNTERS = {"low": "low_count", "medium": "medium_count", "high": "high_count"}
+RECOUNT_CHUNK = 200  # projects per transaction
+
+
+def _counted_in(state) -> list:
+    """``(model, pk, counter)`` entries a task in ``state`` adds one to."""
+    if state is None:
+        return []
+    project_id, column_id, archived, priority = state
+    if archived:
+        return []
+    fields = ["task_count"]
+    if priority in PRIORITY_COUNTERS:
+        fields.append(PRIORITY_COUNTERS[priority])
+    return [
+        (model, pk, field)
+        for model, pk in ((Column, column_id), (Project, project_id))
+        for field in fields
+    ]
+
+
+def adjust_counters(old_states: Iterable, new_states: Iterable) -> None:
+    """
+    Move counters from what ``old_states`` counted towards to what
+    ``new_states`` count towards. States are ``Task.counter_state()`` tuples
+    (``None`` counts for nothing); one UPDATE per touched column/project.
+    """
+    deltas = Counter()
+    for state in old_states:
+        for key in _counted_in(state):
+            deltas[key] -= 1
+    for state in new_states:
+        for key in _counted_in(state):
+            deltas[key] += 1
+
+    updates = defaultdict(dict)
+    for (model, pk, field), delta in deltas.items():
+        if delta:
+            # Clamp so a drifted counter can never fail a user's write.
+            updates[(model, pk)][field] = Greatest(F(field) + delta, Value(0))
+    for (model, pk), fields in updates.items():
+        model.objects.filter(pk=pk).update(**fields)
+
+
+def subtract_column(column_id: int) -> None:
+    """Remove a column's counts from its project (before deleting it)."""
+    row = Column.objects.filter(pk=column_id).values("project_id", *COUNTERS).first()
+    if not row:
+        return
+    project_id = row.pop("project_id")
+    fields = {field: Greatest(F(field) - value, Value(0)) for field, value in row.items() if value}
+    if fields:
+        Project.objects.filter(pk=project_id).update(**fields)
+
+
+def _aggregates() -> dict:
+    return {
+        "task_count": Count("id"),
+        **{
+            field: Count("id", filter=Q(priority=priority))
+            for priority, field in PRIORITY_COUNTERS.items()
+        },
+    }
+
+
+def recount_counters(project_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recompute the counters of the given projects (default: all) and their
+    columns from the task table. Returns the number of projects.
+    """
+    projects = Project.objects.order_by("pk")
+    if project_ids is not None:
+        projects = projects.filter(pk__in=list(project_ids))
+    ids = list(projects.values_list("pk", flat=True))
+
+    for start in range(0, len(ids), RECOUNT_CHUNK):
+        chunk = ids[start:start + RECOUNT_CHUNK]
+        with transaction.atomic():
+            # Lock the counter rows first: concurrent F() deltas then land
+            # either before the recount (and are included) or after it.
+            project_rows = list(
+                Project.objects.select_for_update().filter(pk__in=chunk).order_by("pk").only("pk", *COUNTERS)
+            )
+            column_rows = list(
+                Column.objects.select_for_update().filter(project_id__in=chunk).order_by("pk").only("pk", *COUNTERS)
+            )
+            active = Task.objects.filter(project_id__in=chunk, archived=False).order_by()
+            by_column = {
+                row.pop("column_id"): row
+                for row in active.values("column_id").annotate(**_aggregates())
+            }
+            by_project = {
+                row.pop("project_id"): row
+                for row in active.values("project_id").annotate(**_aggregates())
+            }
+            for rows, counts in ((column_rows, by_column), (project_rows, by_project)):
+                for obj in rows:
+                    for field in COUNTERS:
+                        setattr(obj, field, counts.get(obj.pk, {}).get(field, 0))
+            Column.objects.bulk_update(column_rows, COUNTERS, batch_size=500)
+            Project.objects.bulk_update(project_rows, COUNTERS, batch_size=500)
+    return len(ids)
@@ -0,0 +1,155 @@
+"""
+Stats for the workspace list and workspace pages, and the "My tasks" list.
+
+Everything comes from the denormalized counters on ``Project`` and
+``Column`` (see ``boards.counters``) plus correlated counts over the
+assignee through table and, for overdue tasks (which change with the date,
+not with writes), over the ``(project, due_date)`` index, so each page is a
+single query however many workspaces or boards it lists. A board's "done"
+tasks are the active tasks of its last column.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Optional
+
+from django.db.models import Case, Count, Exists, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils.timezone import now
+
+from .models import Column, Task, WorkspaceMember
+from .permissions import LIVE_WORKSPACES
+
+LIVE = Q(projects__delete_requested_at=None)
+MY_TASKS_PAGE = 50
+PRIORITY_ORDER = Case(
+    When(priority="high", then=Value(0)),
+    When(priority="medium", then=Value(1)),
+    default=Value(2),
+    output_field=IntegerField(),
+)
+
+
+def _assigned_count(user, **task_lookups):
+    """Correlated subquery: active tasks assigned to ``user`` matching the
+    ``OuterRef`` lookups (on the through table's ``task``)."""
+    lookups = {f"task__{key}": value for key, value in task_lookups.items()}
+    rows = (
+        Task.assignees.through.objects
+        .filter(user_id=user.id, task__archived=False, task__project__delete_requested_at=None, **lookups)
+        .order_by()
+        .values("user_id")
+        .annotate(n=Count("*"))
+        .values("n")
+    )
+    return Coalesce(Subquery(rows, output_field=IntegerField()), Value(0))
+
+
+def _overdue_count(**task_lookups):
+    """Correlated subquery: active tasks past their due date matching the
+    ``OuterRef`` lookups."""
+    rows = (
+        Task.objects
+        .filter(archived=False, due_date__lt=now().date(), project__delete_requested_at=None, **task_lookups)
+        .order_by()
+        .values("archived")
+        .annotate(n=Count("*"))
+        .values("n")
+    )
+    return Coalesce(Subquery(rows, output_field=IntegerField()), Value(0))
+
+
+def user_workspaces(user):
+    """
+    Live workspaces ``user`` owns or belongs to, by name, annotated with
+    ``project_count``, ``open_count``, ``overdue_count`` and
+    ``assigned_count``.
+    """
+    member_of = WorkspaceMember.objects.filter(user_id=user.id).values("workspace_id")
+    return (
+        LIVE_WORKSPACES
+        .filter(Q(owner_id=user.id) | Q(pk__in=member_of))
+        .annotate(
+            project_count=Count("projects", filter=LIVE),
+            open_count=Sum("projects__task_count", filter=LIVE, default=0),
+            overdue_count=_overdue_count(project__workspace_id=OuterRef("pk")),
+            assigned_count=_assigned_count(user, project__workspace_id=OuterRef("pk")),
+        )
+        .order_by("name", "pk")
+    )
+
+
+def workspace_projects(workspace, user):
+    """Live boards of ``workspace``, newest first, annotated with
+    ``done_count``, ``overdue_count`` and ``assigned_count``
+    (``task_count`` is the total)."""
+    last_column = (
+        Column.objects.filter(project_id=OuterRef("pk"))
+        .order_by("-order", "-pk")
+        .values("task_count")[:1]
+    )
+    return (
+        workspace.projects.filter(delete_requested_at=None)
+        .annotate(
+            done_count=Coalesce(Subquery(last_column, output_field=IntegerField()), Value(0)),
+            overdue_count=_overdue_count(project_id=OuterRef("pk")),
+            assigned_count=_assigned_count(user, project_id=OuterRef("pk")),
+        )
+        .order_by("-created_at")
+    )
+
+
+def _parse_my_cursor(raw) -> Optional[tuple]:
+    try:
+        due, prio, pk = (raw or "").split("|")
+        return (date.fromisoformat(due) if due != "-" else None), int(prio), int(pk)
+    except ValueError:
+        return None
+
+
+def _after_my_cursor(due, prio, pk) -> Q:
+    # Keyset over (due_date NULLS LAST, priority rank, id).
+    same_due = Q(prio__gt=prio) | Q(prio=prio, pk__gt=pk)
+    if due is None:
+        return Q(due_date=None) & same_due
+    return Q(due_date=None) | Q(due_date__gt=due) | (Q(due_date=due) & same_due)
+
+
+def assigned_tasks_page(user, after=None, limit: int = MY_TASKS_PAGE):
+    """
+    Active tasks assigned to ``user`` in every live workspace they can open,
+    soonest due first (undated last), then high priority first. ``after`` is
+    the cursor of the previous page; returns ``(tasks, next_cursor)``.
+
+    The query starts from the user's rows in the assignee through table, so
+    its cost follows the user's own assignments, not the boards they see.
+    Board, column and workspace names come in the same query.
+    """
+    member = WorkspaceMember.objects.filter(workspace_id=OuterRef("project__workspace_id"), user_id=user.id)
+    tasks = (
+        Task.objects
+        .filter(
+            assignees__id=user.id,
+            archived=False,
+            project__delete_requested_at=None,
+            project__workspace__delete_requested_at=None,
+        )
+        .filter(Q(project__workspace__owner_id=user.id) | Exists(member))
+        .select_related("project__workspace", "column")
+        .only(
+            "title", "priority", "due_date", "project_id", "column_id",
+            "project__title", "project__workspace__name", "column__name",
+        )
+        .annotate(prio=PRIORITY_ORDER)
+        .order_by(F("due_date").asc(nulls_last=True), "prio", "id")
+    )
+    cursor = _parse_my_cursor(after)
+    if cursor:
+        tasks = tasks.filter(_after_my_cursor(*cursor))
+    page = list(tasks[: limit + 1])
+    if len(page) > limit:
+        last = page[limit - 1]
+        due = last.due_date.isoformat() if last.due_date else "-"
+        return page[:limit], f"{due}|{last.prio}|{last.pk}"
+    return page, None
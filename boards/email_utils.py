@@ -1,12 +1,43 @@
 import os
 import logging
+from dataclasses import dataclass
+from typing import Iterable
+
 import requests
 from django.conf import settings
 
+from .timing import timed
+
 logger = logging.getLogger(__name__)
 
 BREVO_API_KEY = os.getenv("BREVO_API_KEY")
 BREVO_ENDPOINT = "https://api.brevo.com/v3/smtp/email"
+BREVO_TIMEOUT = 10  # seconds per API request
+# SMTP sockets without EMAIL_TIMEOUT block indefinitely; assume this much.
+SMTP_FALLBACK_TIMEOUT = 60
+
+
+# Per-message rejections; anything else may succeed on a later attempt.
+PERMANENT_STATUSES = {400, 413, 422}
+# The account or API key is refused: every message fails until an operator
+# fixes the configuration, so retry and alert instead of giving up.
+CONFIGURATION_STATUSES = {401, 403}
+
+
+class PermanentEmailError(Exception):
+    """The provider rejected the message; retrying will not help."""
+
+
+class EmailConfigurationError(Exception):
+    """The provider refused our credentials; retry once they are fixed."""
+
+
+@dataclass
+class EmailMessageData:
+    subject: str
+    text_body: str
+    to_email: str
+    html_body: str | None = None
 
 
 def _sender_email_from_default() -> str:
@@ -20,65 +51,206 @@ def _sender_email_from_default() -> str:
     return default.strip() or "noreply@example.com"
 
 
-def send_brevo_email(
-    subject: str,
-    text_body: str,
-    to_email: str,
-    html_body: str | None = None,
-) -> None:
+def _brevo_sender() -> dict:
+    return {
+        "email": _sender_email_from_default(),
+        "name": getattr(settings, "SITE_NAME", "Task Manager"),
+    }
+
+
+def _brevo_headers() -> dict:
+    return {
+        "api-key": BREVO_API_KEY,
+        "Content-Type": "application/json",
+        "accept": "application/json",
+    }
+
+
+def _brevo_post(session: requests.Session, payload: dict) -> None:
+    resp = session.post(BREVO_ENDPOINT, json=payload, headers=_brevo_headers(), timeout=BREVO_TIMEOUT)
+    logger.info("Brevo API response %s %s", resp.status_code, resp.text)
+    if resp.status_code in CONFIGURATION_STATUSES:
+        logger.critical(
+            "Brevo refused the API key (%s %s); check BREVO_API_KEY. Email is held for retry.",
+            resp.status_code, resp.text,
+        )
+        raise EmailConfigurationError(f"Brevo refused the API key: {resp.status_code} {resp.text}")
+    if resp.status_code in PERMANENT_STATUSES:
+        raise PermanentEmailError(f"Brevo rejected message: {resp.status_code} {resp.text}")
+    resp.raise_for_status()
+
+
+def delivery_timeout() -> float:
+    """Seconds a single provider call of ``deliver_emails`` may block."""
+    if BREVO_API_KEY:
+        return BREVO_TIMEOUT
+    return getattr(settings, "EMAIL_TIMEOUT", None) or SMTP_FALLBACK_TIMEOUT
+
+
+@timed("email")
+def deliver_emails(messages: Iterable[EmailMessageData]) -> list:
     """
-    Send email via Brevo HTTP API if BREVO_API_KEY exists,
-    otherwise send via Django email backend (SMTP) as multipart (text + html).
+    Deliver ``messages`` over one pooled HTTP session (Brevo) or one SMTP
+    connection (Django backend).
+
+    Returns a list of ``(message, exception_or_None)`` in input order; a
+    failing message does not stop the rest of the batch, except for an
+    ``EmailConfigurationError``, which is reported for every remaining
+    message without calling the provider again.
     """
+    messages = list(messages)
+    results = []
 
     # -----------------------------
     # 1) SMTP / Django backend path
     # -----------------------------
     if not BREVO_API_KEY:
+        from django.core.mail import EmailMultiAlternatives, get_connection
+
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+        except Exception as exc:
+            logger.exception("Failed to open SMTP connection")
+            return [(message, exc) for message in messages]
+
         try:
-            from django.core.mail import EmailMultiAlternatives
+            for message in messages:
+                try:
+                    msg = EmailMultiAlternatives(
+                        message.subject,
+                        message.text_body or "",
+                        settings.DEFAULT_FROM_EMAIL,
+                        [message.to_email],
+                        connection=connection,
+                    )
+                    # If HTML is provided, attach it so the button/link is clickable.
+                    if message.html_body:
+                        msg.attach_alternative(message.html_body, "text/html")
+                    msg.send(fail_silently=False)
+                    results.append((message, None))
+                except Exception as exc:
+                    logger.exception("Failed to send SMTP email to %s", message.to_email)
+                    results.append((message, exc))
+        finally:
+            connection.close()
+        return results
 
-            from_email = settings.DEFAULT_FROM_EMAIL
-            msg = EmailMultiAlternatives(subject, text_body or "", from_email, [to_email])
+    # -----------------------------
+    # 2) Brevo HTTP API path
+    # -----------------------------
+    with requests.Session() as session:
+        for message in messages:
+            payload: dict = {
+                "sender": _brevo_sender(),
+                "to": [{"email": message.to_email}],
+                "subject": message.subject,
+            }
+            if message.text_body:
+                payload["textContent"] = message.text_body
+            if message.html_body:
+                payload["htmlContent"] = message.html_body
+            try:
+                _brevo_post(session, payload)
+                results.append((message, None))
+            except EmailConfigurationError as exc:
+                results.extend((m, exc) for m in messages[len(results):])
+                break
+            except Exception as exc:
+                logger.exception("Failed to send Brevo email to %s", message.to_email)
+                results.append((message, exc))
+    return results
 
-            # If HTML is provided, attach it so the button/link is clickable.
-            if html_body:
-                msg.attach_alternative(html_body, "text/html")
 
-            msg.send(fail_silently=False)
-            return
+@timed("email")
+def send_batch_emails(messages: Iterable[EmailMessageData], batch_size: int = 500) -> int:
+    """
+    Send many distinct messages with as few provider calls as possible.
 
+    Brevo gets one request per ``batch_size`` messages using
+    ``messageVersions`` (max 1000 per call); the SMTP path sends everything
+    over a single connection, message by message. Returns the number of
+    messages accepted.
+    """
+    messages = list(messages)
+    if not messages:
+        return 0
+
+    if not BREVO_API_KEY:
+        from django.core.mail import EmailMultiAlternatives, get_connection
+
+        emails = []
+        for message in messages:
+            msg = EmailMultiAlternatives(
+                message.subject, message.text_body or "",
+                settings.DEFAULT_FROM_EMAIL, [message.to_email],
+            )
+            if message.html_body:
+                msg.attach_alternative(message.html_body, "text/html")
+            emails.append(msg)
+        # One message per send_messages() call on the open connection, so
+        # a failure midway still reports the messages that went out.
+        sent = 0
+        try:
+            with get_connection(fail_silently=False) as connection:
+                for msg in emails:
+                    try:
+                        sent += connection.send_messages([msg]) or 0
+                    except Exception:
+                        logger.exception("Failed to send SMTP email to %s", msg.to[0])
         except Exception:
-            logger.exception("Failed to send SMTP email to %s", to_email)
-            return
+            logger.exception("Failed to open SMTP connection for %d emails", len(emails))
+        return sent
 
-    # -----------------------------
-    # 2) Brevo HTTP API path
-    # -----------------------------
-    payload: dict = {
-        "sender": {
-            "email": _sender_email_from_default(),
-            "name": getattr(settings, "SITE_NAME", "Task Manager"),
-        },
-        "to": [{"email": to_email}],
-        "subject": subject,
-    }
+    batch_size = min(batch_size, 1000)
+    sent = 0
+    with requests.Session() as session:
+        for i in range(0, len(messages), batch_size):
+            chunk = messages[i:i + batch_size]
+            versions = []
+            for message in chunk:
+                version = {"to": [{"email": message.to_email}], "subject": message.subject}
+                if message.text_body:
+                    version["textContent"] = message.text_body
+                if message.html_body:
+                    version["htmlContent"] = message.html_body
+                versions.append(version)
+            # Top-level content is required by the API; every version overrides it.
+            payload = {
+                "sender": _brevo_sender(),
+                "subject": chunk[0].subject,
+                "textContent": chunk[0].text_body or chunk[0].subject,
+                "messageVersions": versions,
+            }
+            try:
+                _brevo_post(session, payload)
+                sent += len(chunk)
+            except Exception:
+                logger.exception("Failed to send Brevo batch of %d emails", len(chunk))
+    return sent
 
-    if text_body:
-        payload["textContent"] = text_body
-    if html_body:
-        payload["htmlContent"] = html_body
 
-    headers = {
-        "api-key": BREVO_API_KEY,
-        "Content-Type": "application/json",
-        "accept": "application/json",
-    }
+@timed("email")
+def send_brevo_email(
+    subject: str,
+    text_body: str,
+    to_email: str,
+    html_body: str | None = None,
+) -> None:
+    """
+    Queue an email in the outbox (EMAIL_OUTBOX_ENABLED), or send it right
+    away via Brevo HTTP API if BREVO_API_KEY exists, otherwise via Django
+    email backend (SMTP) as multipart (text + html).
+    """
+    if getattr(settings, "EMAIL_OUTBOX_ENABLED", False):
+        from .models import OutboundEmail
 
-    try:
-        resp = requests.post(BREVO_ENDPOINT, json=payload, headers=headers, timeout=10)
-        logger.info("Brevo API response %s %s", resp.status_code, resp.text)
-        resp.raise_for_status()
-    except Exception:
-        logger.exception("Failed to send Brevo email to %s", to_email)
+        OutboundEmail.objects.create(
+            subject=subject[:255],
+            text_body=text_body or "",
+            to_email=to_email,
+            html_body=html_body or "",
+        )
         return
+
+    deliver_emails([EmailMessageData(subject, text_body, to_email, html_body)])
@@ -0,0 +1,155 @@
+"""Per-project change journal backing incremental board sync."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils.timezone import now
+
+from .board import task_filter_kwargs, task_payload
+from .caching import hash_key, tags_version
+from .models import BoardChange, Column, Task, Watermark
+from .realtime import publish
+
+TRIM_WATERMARK = "board_changes_trimmed"
+EVENT_MAX_IDS = 100
+
+
+def record_changes(project_id, kind: str, op: str, object_ids) -> None:
+    """
+    Journal ``op`` for each object once the current transaction commits,
+    then push a board event to the project's open streams.
+    """
+    object_ids = list(object_ids)
+    if not project_id or not object_ids:
+        return
+
+    def write():
+        rows = BoardChange.objects.bulk_create([
+            BoardChange(project_id=project_id, kind=kind, object_id=pk, op=op)
+            for pk in object_ids
+        ])
+        publish(project_id, {
+            "kind": kind,
+            "op": op,
+            # Keep events small (NOTIFY payloads are capped); clients re-read anyway.
+            "ids": object_ids[:EVENT_MAX_IDS],
+            "count": len(object_ids),
+            "cursor": rows[-1].pk,
+        })
+
+    transaction.on_commit(write)
+
+
+def _trimmed_upto() -> int:
+    return Watermark.objects.filter(name=TRIM_WATERMARK).values_list("value", flat=True).first() or 0
+
+
+# Journal ids are allocated before the inserting transaction commits, so a
+# row can become visible after rows with higher ids. Cursors therefore never
+# move past rows younger than the settle window: by then every lower id has
+# been committed. Rows inside the window are still returned, and sent again
+# on the next sync (replaying a change is harmless: clients get the current
+# state of the object).
+
+
+def _settled_before():
+    return now() - timedelta(seconds=getattr(settings, "BOARD_SYNC_SETTLE_SECONDS", 5))
+
+
+def latest_cursor() -> int:
+    """Cursor of the newest settled journal row (never below the trimmed
+    range)."""
+    latest = (
+        BoardChange.objects.filter(created_at__lt=_settled_before())
+        .order_by("-id")
+        .values_list("id", flat=True)
+        .first()
+    ) or 0
+    return max(latest, _trimmed_upto())
+
+
+def changes_since(project, cursor: int) -> dict:
+    """
+    Everything that changed on ``project`` after ``cursor``.
+
+    Changed tasks/columns are returned in their current state (the journal
+    only says *which* rows changed); rows that no longer exist, or tasks
+    that are archived, are listed under ``removed``. When the cursor
+    predates the trimmed part of the journal, or the backlog exceeds
+    ``BOARD_SYNC_MAX_CHANGES`` or includes a ``board`` change (e.g. a
+    clear), the answer is ``{"resync": True}`` and the client should
+    reload the full board.
+    """
+    limit = getattr(settings, "BOARD_SYNC_MAX_CHANGES", 500)
+    if cursor < _trimmed_upto():
+        return {"resync": True, "cursor": latest_cursor()}
+
+    settled = _settled_before()
+    rows = list(
+        BoardChange.objects.filter(project_id=project.pk, id__gt=cursor)
+        .order_by("id")
+        .values_list("id", "kind", "object_id", "created_at")[: limit + 1]
+    )
+    if len(rows) > limit or any(row[1] == "board" for row in rows):
+        return {"resync": True, "cursor": latest_cursor()}
+    next_cursor = max((row[0] for row in rows if row[3] < settled), default=cursor)
+
+    task_ids = {row[2] for row in rows if row[1] == "task"}
+    column_ids = {row[2] for row in rows if row[1] == "column"}
+
+    tags, users = {}, {}
+    tasks = []
+    for t in (
+        Task.objects.filter(project=project, pk__in=task_ids, archived=False)
+        .prefetch_related("tags", "assignees")
+        .order_by("column_id", "rank", "id")
+    ):
+        data = task_payload(t, tags, users)
+        data.update(column=t.column_id, rank=t.rank)
+        tasks.append(data)
+
+    columns = list(
+        Column.objects.filter(project=project, pk__in=column_ids)
+        .order_by("order")
+        .values("id", "name", "color", "order")
+    )
+
+    return {
+        "resync": False,
+        "cursor": next_cursor,
+        "tasks": tasks,
+        "columns": columns,
+        "removed": {
+            "tasks": sorted(task_ids - {t["id"] for t in tasks}),
+            "columns": sorted(column_ids - {c["id"] for c in columns}),
+        },
+        "tags": tags,
+        "users": users,
+    }
+
+
+def board_etag(project, filters: dict, user, depth: int) -> str:
+    """
+    Strong ETag of a (filtered) board, computed without touching tasks.
+
+    Every change to a board's tasks and columns (and assignee renames) is
+    journaled, so the newest journal row (or, once trimmed, the trim
+    watermark) plus the tags version, the resolved filter lookups and the
+    depth identify what ``board.json`` returns. Unlike the board version
+    stamp, all of it lives in the database, so every worker agrees.
+    """
+    latest = BoardChange.objects.filter(project_id=project.pk).aggregate(m=Max("id"))["m"] or 0
+    lookups = task_filter_kwargs(filters, user)
+    return '"{}"'.format(
+        hash_key(
+            project.pk,
+            max(latest, _trimmed_upto()),
+            tags_version(),
+            sorted(lookups.items()),
+            depth,
+        )
+    )
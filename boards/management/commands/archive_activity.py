@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from boards.archive import EXTENSIONS, SegmentWriter, archive_dir, archived_ranges
+from boards.models import ActivityLog, Watermark
+
+from .rollup_activity import WATERMARK as ROLLUP_WATERMARK
+
+FIELDS = ("id", "created_at", "user_id", "action", "metadata",
+          "request_path", "ip_address", "user_agent")
+
+
+class Command(BaseCommand):
+    help = (
+        "Move ActivityLog rows older than a cutoff into compressed, day-"
+        "partitioned JSONL segments. Only rows already rolled up are moved."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than-days", type=int, default=30)
+        parser.add_argument("--dir", help="Defaults to ACTIVITY_ARCHIVE_DIR.")
+        parser.add_argument("--compression", choices=sorted(EXTENSIONS),
+                            default=getattr(settings, "ACTIVITY_ARCHIVE_COMPRESSION", "gzip"))
+        parser.add_argument("--segment-rows", type=int, default=100_000)
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **opts):
+        try:
+            root = archive_dir(opts["dir"])
+        except Exception as exc:
+            raise CommandError(str(exc))
+
+        cutoff = timezone.now() - timedelta(days=opts["older_than_days"])
+        cutoff = cutoff.replace(hour=0, minute=0, second=0, microsecond=0)
+        rolled_up = (
+            Watermark.objects.filter(name=ROLLUP_WATERMARK)
+            .values_list("value", flat=True)
+            .first()
+        ) or 0
+        pending = ActivityLog.objects.filter(created_at__lt=cutoff, id__lte=rolled_up)
+
+        segments = rows = 0
+        while True:
+            oldest = pending.order_by("created_at").values_list("created_at", flat=True).first()
+            if oldest is None:
+                break
+            day_start = oldest.replace(hour=0, minute=0, second=0, microsecond=0)
+            day_rows = pending.filter(created_at__gte=day_start,
+                                      created_at__lt=day_start + timedelta(days=1))
+            segments_today, moved = self.archive_day(root, day_start, day_rows, opts)
+            segments += segments_today
+            rows += moved
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {rows} activity rows into {segments} segments under {root}."
+        ))
+
+    def delete_rows(self, rows, chunk_size):
+        while True:
+            ids = list(rows.order_by("id").values_list("id", flat=True)[:chunk_size])
+            if not ids:
+                return
+            with transaction.atomic():
+                ActivityLog.objects.filter(id__in=ids).delete()
+
+    def archive_day(self, root, day, day_rows, opts):
+        # Rows left behind by a run that crashed after publishing a segment
+        # are already archived: finish deleting them rather than re-archive.
+        for first_id, last_id in archived_ranges(root, day):
+            self.delete_rows(day_rows.filter(id__gte=first_id, id__lte=last_id), opts["chunk_size"])
+
+        segments = moved = 0
+        last_id = 0
+        while True:
+            batch = day_rows.filter(id__gt=last_id).order_by("id")
+            ids = list(batch.values_list("id", flat=True)[: opts["segment_rows"]])
+            if not ids:
+                return segments, moved
+
+            writer = SegmentWriter(root, day, ids[0], ids[-1], opts["compression"])
+            for row in (
+                batch.filter(id__lte=ids[-1]).values(*FIELDS).iterator(chunk_size=opts["chunk_size"])
+            ):
+                writer.write(row)
+            index = writer.close()
+
+            # Only delete once the segment is published; a crash before that
+            # rewrites the same segment, a crash after it is handled above.
+            self.delete_rows(day_rows.filter(id__gte=ids[0], id__lte=ids[-1]), opts["chunk_size"])
+
+            self.stdout.write(f"  {writer.path.name}: {index['count']} rows")
+            segments += 1
+            moved += index["count"]
+            last_id = ids[-1]
@@ -0,0 +1,178 @@
+import json
+import math
+import statistics
+import time
+import tracemalloc
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils.timezone import now
+
+from boards.models import Project, Tag, Task
+from boards.purge import finish_clear
+from boards.synthetic import tenant_workspaces
+
+XHR = {"HTTP_X_REQUESTED_WITH": "XMLHttpRequest"}
+BOARD_FILTERS = ["", "assignee=me", "tag={tag}", "priority=high", "overdue=1", "stream=1"]
+
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the main views through the test client against a tenant made by "
+        "generate_tenant and print p50/p95 latency, query counts and peak "
+        "memory per view as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--prefix", default="bench")
+        parser.add_argument("--repeat", type=int, default=20, help="Timed requests per view.")
+        parser.add_argument("--warmup", type=int, default=2, help="Untimed requests per view first.")
+        parser.add_argument("--cold", action="store_true", help="Clear the cache before every request.")
+        parser.add_argument("--skip-clear", action="store_true", help="Don't benchmark project_clear_tasks (destructive).")
+        parser.add_argument("--output", help="Write the JSON here instead of stdout.")
+
+    def handle(self, *args, **opts):
+        if opts["repeat"] < 1:
+            raise CommandError("--repeat must be at least 1.")
+        projects = Project.objects.filter(
+            workspace__in=tenant_workspaces(opts["prefix"]), delete_requested_at=None
+        ).select_related("workspace__owner").order_by("-task_count", "pk")
+        board = projects.first()
+        if board is None:
+            raise CommandError(f"No tenant {opts['prefix']!r}; run generate_tenant first.")
+        owner = board.workspace.owner
+        # Clearing needs the workspace owner, so stay in the same workspace.
+        spare = projects.filter(workspace_id=board.workspace_id).exclude(pk=board.pk).first()
+        columns = list(board.columns.order_by("order", "pk").values_list("pk", flat=True))
+        tasks = list(
+            Task.objects.filter(project=board, archived=False).order_by("pk").values_list("pk", flat=True)[:500]
+        )
+        tag = Tag.objects.filter(task__project=board).values_list("pk", flat=True).first() or 0
+
+        scenarios = {
+            "workspace_list": lambda i: ("get", reverse("workspace_list"), {}),
+            "workspace_detail": lambda i: ("get", reverse("workspace_detail", args=[board.workspace_id]), {}),
+        }
+        for query in BOARD_FILTERS:
+            query = query.format(tag=tag)
+            url = reverse("project_detail", args=[board.pk]) + (f"?{query}" if query else "")
+            scenarios[f"project_detail?{query}" if query else "project_detail"] = (
+                lambda i, url=url: ("get", url, {})
+            )
+        if tasks and len(columns) > 1:
+            scenarios["task_move"] = lambda i: (
+                "post", reverse("task_move", args=[tasks[i % len(tasks)], columns[i % len(columns)]]), XHR,
+            )
+        scenarios["task_create"] = lambda i: (
+            "post",
+            reverse("task_create", args=[board.pk]),
+            {"data": {"title": f"Benchmark task {i}", "description": "", "priority": "medium",
+                      "column": columns[0]}, **XHR},
+        )
+
+        client = Client()
+        client.force_login(owner)
+        results = {}
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+            EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+        ):
+            for name, make_request in scenarios.items():
+                results[name] = self.measure(client, make_request, opts["repeat"], opts["warmup"], opts["cold"])
+                self.stderr.write(f"{name}: p50 {results[name]['p50_ms']}ms")
+            if not opts["skip_clear"]:
+                # Destructive, so a single sample, on another board when there is one.
+                target = spare or board
+                results["project_clear_tasks"] = self.measure(
+                    client, lambda i: ("post", reverse("project_clear", args=[target.pk]), XHR), 1, 0, opts["cold"],
+                    trace=False,
+                )
+                result = results["project_clear_tasks"]
+                result["tasks"] = target.task_count
+                # Boards over one purge chunk are only stamped in the request;
+                # time the purge `process_deletions` would then run as well.
+                result["deferred"] = Project.objects.filter(
+                    pk=target.pk, clear_requested_at__isnull=False
+                ).exists()
+                if result["deferred"]:
+                    with CaptureQueriesContext(connection) as ctx:
+                        started = time.perf_counter()
+                        finish_clear(target.pk)
+                        result["purge_ms"] = round((time.perf_counter() - started) * 1000, 2)
+                    result["purge_queries"] = len(ctx.captured_queries)
+
+        report = {
+            "meta": {
+                "timestamp": now().isoformat(),
+                "database": connection.vendor,
+                "django": django.get_version(),
+                "prefix": opts["prefix"],
+                "project": board.pk,
+                "tasks": board.task_count,
+                "columns": len(columns),
+                "repeat": opts["repeat"],
+                "cold": opts["cold"],
+            },
+            "results": results,
+        }
+        output = json.dumps(report, indent=2)
+        if opts["output"]:
+            with open(opts["output"], "w") as fh:
+                fh.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+    def measure(self, client, make_request, repeat: int, warmup: int, cold: bool, trace: bool = True) -> dict:
+        counter = iter(range(10**9))
+
+        def send():
+            method, url, kwargs = make_request(next(counter))
+            response = getattr(client, method)(url, **kwargs)
+            if response.streaming:
+                b"".join(response.streaming_content)
+            return response
+
+        for _ in range(warmup):
+            send()
+        timings, queries = [], []
+        for _ in range(repeat):
+            if cold:
+                cache.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                response = send()
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(len(ctx.captured_queries))
+
+        result = {
+            "status": response.status_code,
+            "samples": repeat,
+            "p50_ms": round(percentile(timings, 50), 2),
+            "p95_ms": round(percentile(timings, 95), 2),
+            "mean_ms": round(statistics.fmean(timings), 2),
+            "queries": statistics.median_low(queries),
+            "queries_max": max(queries),
+        }
+        if trace:
+            # Separate request: tracemalloc slows everything it watches.
+            if cold:
+                cache.clear()
+            tracemalloc.start()
+            try:
+                send()
+                result["peak_kib"] = round(tracemalloc.get_traced_memory()[1] / 1024)
+            finally:
+                tracemalloc.stop()
+        return result
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from boards.synthetic import TenantSize, delete_tenant, generate_tenant, tenant_users
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic synthetic tenant (users, workspaces, boards, "
+        "cards with tags/assignees, comments, activity) for benchmarking."
+    )
+
+    def add_arguments(self, parser):
+        defaults = TenantSize()
+        parser.add_argument("--prefix", default="bench", help="Username/tag prefix of the tenant.")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--replace", action="store_true", help="Delete an existing tenant with this prefix first.")
+        for field in ("users", "workspaces", "members", "projects", "columns", "tasks", "activity", "tags"):
+            parser.add_argument(f"--{field}", type=int, default=getattr(defaults, field))
+        parser.add_argument("--comments", type=float, default=defaults.comments, help="Average comments per task.")
+
+    def handle(self, *args, **opts):
+        prefix = opts["prefix"]
+        if tenant_users(prefix).exists():
+            if not opts["replace"]:
+                raise CommandError(f"A tenant with prefix {prefix!r} exists; pass --replace.")
+            delete_tenant(prefix)
+
+        size = TenantSize(**{field: opts[field] for field in TenantSize.__dataclass_fields__})
+        if size.users < 1 or size.columns < 1:
+            raise CommandError("Need at least one user and one column.")
+        started = time.monotonic()
+        counts = generate_tenant(prefix, size, seed=opts["seed"], log=self.stdout.write)
+        summary = ", ".join(f"{n} {name}" for name, n in counts.items())
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated tenant {prefix!r}: {summary} in {time.monotonic() - started:.1f}s."
+        ))
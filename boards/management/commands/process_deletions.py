@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from boards.models import Project, Workspace
+from boards.purge import CHUNK_SIZE, finish_clear, teardown_project, teardown_workspace
+
+
+class Command(BaseCommand):
+    help = (
+        "Clear large boards and tear down workspaces and projects marked for "
+        "deletion, in chunks. Interrupted runs resume where they stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+        parser.add_argument("--loop", action="store_true", help="Keep polling for new deletions.")
+        parser.add_argument("--sleep", type=float, default=30.0, help="Seconds between polls in --loop mode.")
+
+    def handle(self, *args, **opts):
+        while True:
+            close_old_connections()
+            handled = self.drain(opts["chunk_size"])
+            if not opts["loop"]:
+                return
+            if not handled:
+                time.sleep(opts["sleep"])
+
+    def drain(self, chunk_size: int) -> int:
+        handled = 0
+        clears = (
+            Project.objects.filter(clear_requested_at__isnull=False, delete_requested_at=None)
+            .filter(workspace__delete_requested_at=None)
+            .order_by("clear_requested_at", "pk")
+            .values_list("pk", flat=True)
+        )
+        for pk in clears:
+            def progress(done, total):
+                self.stdout.write(f"  project {pk}: {done}/{total} tasks cleared")
+
+            deleted = finish_clear(pk, chunk_size, progress)
+            self.stdout.write(self.style.SUCCESS(f"Cleared project {pk} ({deleted} tasks)."))
+            handled += 1
+
+        # Projects first: a deleted workspace tears its projects down anyway.
+        for model, teardown in ((Project, teardown_project), (Workspace, teardown_workspace)):
+            pending = (
+                model.objects.filter(delete_requested_at__isnull=False)
+                .order_by("delete_requested_at", "pk")
+                .values_list("pk", flat=True)
+            )
+            for pk in pending:
+                label = f"{model._meta.model_name} {pk}"
+
+                def progress(done, total):
+                    self.stdout.write(f"  {label}: {done}/{total} tasks deleted")
+
+                deleted = teardown(pk, chunk_size, progress)
+                self.stdout.write(self.style.SUCCESS(f"Deleted {label} ({deleted} tasks)."))
+                handled += 1
+        return handled
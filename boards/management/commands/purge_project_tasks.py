@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from boards.models import Project
+from boards.purge import CHUNK_SIZE, purge_project_tasks
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete every task of a project in chunks (one short transaction per "
+        "chunk). Safe to re-run after an interruption."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("project", type=int, help="Project id.")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **opts):
+        project = Project.objects.filter(pk=opts["project"]).first()
+        if project is None:
+            raise CommandError(f"Project {opts['project']} does not exist.")
+
+        def progress(done, total):
+            self.stdout.write(f"  {done}/{total} tasks deleted")
+
+        deleted = purge_project_tasks(project, chunk_size=opts["chunk_size"], progress=progress)
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} tasks of project {project.pk}."))
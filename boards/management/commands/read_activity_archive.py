@@ -0,0 +1,41 @@
+import json
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from boards.archive import iter_archived_activity
+
+
+def _parse(value):
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Not an ISO date/datetime: {value}")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
+
+
+class Command(BaseCommand):
+    help = "Stream archived activity events as JSONL, filtered by time range, action and user."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", help="ISO date/datetime (inclusive, UTC if naive).")
+        parser.add_argument("--end", help="ISO date/datetime (exclusive, UTC if naive).")
+        parser.add_argument("--action")
+        parser.add_argument("--user", type=int, dest="user_id")
+        parser.add_argument("--dir", help="Defaults to ACTIVITY_ARCHIVE_DIR.")
+
+    def handle(self, *args, **opts):
+        events = iter_archived_activity(
+            start=_parse(opts["start"]),
+            end=_parse(opts["end"]),
+            action=opts["action"],
+            user_id=opts["user_id"],
+            directory=opts["dir"],
+        )
+        for event in events:
+            self.stdout.write(json.dumps(event, separators=(",", ":")))
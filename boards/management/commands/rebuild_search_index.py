@@ -0,0 +1,59 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from boards.models import Comment, SearchDocument, Task
+
+
+class Command(BaseCommand):
+    help = (
+        "Rewrite the search documents of all tasks (or one workspace) and, on "
+        "SQLite, rebuild the FTS5 index from them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workspace", type=int, help="Only this workspace id.")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **opts):
+        tasks = Task.objects.order_by("id")
+        if opts["workspace"]:
+            tasks = tasks.filter(project__workspace_id=opts["workspace"])
+            SearchDocument.objects.filter(workspace_id=opts["workspace"]).exclude(
+                task__in=tasks
+            ).delete()
+
+        last_id, written = 0, 0
+        while True:
+            chunk = list(
+                tasks.filter(id__gt=last_id)
+                .values_list("id", "project__workspace_id", "title", "description")[: opts["chunk_size"]]
+            )
+            if not chunk:
+                break
+            ids = [row[0] for row in chunk]
+            comments = defaultdict(list)
+            for task_id, body in (
+                Comment.objects.filter(task_id__in=ids).order_by("id").values_list("task_id", "body")
+            ):
+                comments[task_id].append(body)
+
+            with transaction.atomic():
+                SearchDocument.objects.filter(task_id__in=ids).delete()
+                SearchDocument.objects.bulk_create([
+                    SearchDocument(
+                        task_id=pk, workspace_id=ws_id, title=title, body=description,
+                        comments="\n".join(comments[pk]),
+                    )
+                    for pk, ws_id, title, description in chunk
+                ])
+            written += len(chunk)
+            last_id = ids[-1]
+
+        if connection.vendor == "sqlite" and not opts["workspace"]:
+            with connection.cursor() as cursor:
+                cursor.execute("INSERT INTO boards_searchdocument_fts(boards_searchdocument_fts) VALUES ('rebuild')")
+                cursor.execute("INSERT INTO boards_searchdocument_fts(boards_searchdocument_fts) VALUES ('optimize')")
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {written} tasks."))
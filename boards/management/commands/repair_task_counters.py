@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from boards.counters import recount_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the task counters of columns and projects from the task "
+        "table, repairing any drift."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--project", type=int, action="append",
+                            help="Only this project id (repeatable).")
+
+    def handle(self, *args, **opts):
+        projects = recount_counters(opts["project"])
+        self.stdout.write(self.style.SUCCESS(f"Recounted tasks of {projects} projects."))
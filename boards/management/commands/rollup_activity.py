@@ -0,0 +1,137 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from boards.models import (
+    ActivityDailyRollup,
+    ActivityHourlyRollup,
+    ActivityLog,
+    Watermark,
+)
+
+WATERMARK = "activity_rollup"
+
+
+def _as_id(value) -> int:
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return 0
+
+
+def _merge(model, counts: Counter) -> None:
+    """Add ``counts`` ({(bucket, action, ws, project): n}) onto ``model`` rows."""
+    existing = {
+        (r.bucket, r.action, r.workspace_id, r.project_id): r
+        for r in model.objects.filter(
+            bucket__in={key[0] for key in counts},
+            action__in={key[1] for key in counts},
+        )
+    }
+    changed, created = [], []
+    for (bucket, action, ws_id, project_id), n in counts.items():
+        row = existing.get((bucket, action, ws_id, project_id))
+        if row is None:
+            created.append(model(bucket=bucket, action=action, workspace_id=ws_id,
+                                 project_id=project_id, count=n))
+        else:
+            row.count += n
+            changed.append(row)
+    model.objects.bulk_update(changed, ["count"], batch_size=500)
+    model.objects.bulk_create(created, batch_size=500)
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold new ActivityLog rows into hourly/daily rollups, then delete raw "
+        "rows that are rolled up and older than the retention period."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--retain-days",
+            type=int,
+            default=getattr(settings, "ACTIVITY_RETENTION_DAYS", 90),
+            help="Delete rolled-up raw rows older than this (0 keeps everything).",
+        )
+        parser.add_argument("--chunk-size", type=int, default=1000,
+                            help="Rows deleted per retention chunk.")
+        parser.add_argument(
+            "--settle-seconds",
+            type=int,
+            default=300,
+            help="Leave rows newer than this for the next run (must exceed the "
+                 "longest delay between a row's created_at and its commit).",
+        )
+
+    def handle(self, *args, **opts):
+        watermark = self.rollup(opts["batch_size"], opts["settle_seconds"])
+        if getattr(settings, "ACTIVITY_ARCHIVE_DIR", ""):
+            # Rows are kept for compliance: archive_activity moves them out.
+            self.stdout.write("ACTIVITY_ARCHIVE_DIR is set; leaving raw rows to archive_activity.")
+        elif opts["retain_days"] > 0:
+            self.prune(watermark, opts["retain_days"], opts["chunk_size"])
+
+    def rollup(self, batch_size: int, settle_seconds: int = 300) -> int:
+        # Ids are allocated before commit, so concurrent (or buffered)
+        # inserts can become visible out of id order. Stopping at the first
+        # row that is not yet settled keeps the watermark behind any row
+        # still in flight; otherwise it would be skipped, then pruned.
+        settled = timezone.now() - timedelta(seconds=settle_seconds)
+        Watermark.objects.get_or_create(name=WATERMARK)
+        total, done = 0, False
+        while not done:
+            with transaction.atomic():
+                # Hold the watermark row while a batch is folded in: an
+                # overlapping run waits here and then resumes after this
+                # batch instead of rolling up the same rows again.
+                mark = Watermark.objects.select_for_update().get(name=WATERMARK)
+                last_id = mark.value
+                rows = list(
+                    ActivityLog.objects.filter(id__gt=last_id)
+                    .order_by("id")
+                    .values_list("id", "action", "created_at", "metadata")[:batch_size]
+                )
+                fresh = next((i for i, row in enumerate(rows) if row[2] >= settled), None)
+                if fresh is not None:
+                    rows, done = rows[:fresh], True
+                if not rows:
+                    break
+
+                hourly, daily = Counter(), Counter()
+                for _, action, created_at, metadata in rows:
+                    metadata = metadata if isinstance(metadata, dict) else {}
+                    ws_id = _as_id(metadata.get("workspace_id"))
+                    project_id = _as_id(metadata.get("project_id"))
+                    hour = created_at.replace(minute=0, second=0, microsecond=0)
+                    hourly[(hour, action, ws_id, project_id)] += 1
+                    daily[(hour.replace(hour=0), action, ws_id, project_id)] += 1
+
+                last_id = rows[-1][0]
+                _merge(ActivityHourlyRollup, hourly)
+                _merge(ActivityDailyRollup, daily)
+                Watermark.objects.filter(pk=mark.pk).update(value=last_id)
+            total += len(rows)
+
+        self.stdout.write(f"Rolled up {total} activity rows (watermark {last_id}).")
+        return last_id
+
+    def prune(self, watermark: int, retain_days: int, chunk_size: int) -> None:
+        cutoff = timezone.now() - timedelta(days=retain_days)
+        expired = ActivityLog.objects.filter(id__lte=watermark, created_at__lt=cutoff)
+        deleted = 0
+        while True:
+            ids = list(expired.order_by("id").values_list("id", flat=True)[:chunk_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                deleted += ActivityLog.objects.filter(id__in=ids).delete()[0]
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} raw activity rows older than {retain_days} days.")
+        )
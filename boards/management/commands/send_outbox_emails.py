@@ -0,0 +1,116 @@
+import random
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from boards.email_utils import (
+    EmailConfigurationError,
+    EmailMessageData,
+    PermanentEmailError,
+    deliver_emails,
+    delivery_timeout,
+)
+from boards.models import OutboundEmail
+
+LEASE_MARGIN = timedelta(minutes=1)
+BACKOFF_BASE = 30  # seconds before the first retry
+BACKOFF_CAP = 6 * 60 * 60
+
+
+def lease(batch_size: int) -> timedelta:
+    """
+    How long a claimed batch stays with its worker: long enough for every
+    message (and opening the SMTP connection) to run into its provider
+    timeout. If the worker dies mid-batch the rows become eligible again
+    once the lease runs out, without racing a slow but live worker.
+    """
+    return timedelta(seconds=(batch_size + 1) * delivery_timeout()) + LEASE_MARGIN
+
+
+def backoff(attempts: int) -> timedelta:
+    delay = min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_CAP)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbox emails in batches, retrying failures with exponential backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--loop", action="store_true", help="Keep polling for new mail.")
+        parser.add_argument("--sleep", type=float, default=5.0, help="Seconds between polls in --loop mode.")
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=getattr(settings, "EMAIL_OUTBOX_MAX_ATTEMPTS", 8),
+        )
+
+    def handle(self, *args, **opts):
+        while True:
+            close_old_connections()
+            sent = self.drain(opts["batch_size"], opts["max_attempts"])
+            if not opts["loop"]:
+                return
+            if not sent:
+                time.sleep(opts["sleep"])
+
+    def drain(self, batch_size: int, max_attempts: int) -> int:
+        """Deliver everything that is due; returns the number of rows handled."""
+        handled = 0
+        while True:
+            batch = self.claim(batch_size)
+            if not batch:
+                return handled
+            self.deliver(batch, max_attempts)
+            handled += len(batch)
+
+    def claim(self, batch_size: int) -> list:
+        now = timezone.now()
+        with transaction.atomic():
+            rows = list(
+                OutboundEmail.objects.select_for_update(skip_locked=True)
+                .filter(Q(status="pending") | Q(status="sending"), next_attempt_at__lte=now)
+                .order_by("next_attempt_at", "id")[:batch_size]
+            )
+            OutboundEmail.objects.filter(pk__in=[r.pk for r in rows]).update(
+                status="sending", next_attempt_at=now + lease(len(rows))
+            )
+        return rows
+
+    def deliver(self, batch: list, max_attempts: int) -> None:
+        messages = [
+            EmailMessageData(r.subject, r.text_body, r.to_email, r.html_body or None)
+            for r in batch
+        ]
+        now = timezone.now()
+        misconfigured = False
+        for row, (_, error) in zip(batch, deliver_emails(messages)):
+            if error is None:
+                row.status, row.sent_at, row.last_error = "sent", now, ""
+                continue
+            row.attempts += 1
+            row.last_error = repr(error)[:2000]
+            if isinstance(error, EmailConfigurationError):
+                # Not the message's fault: keep retrying (capped backoff).
+                misconfigured = True
+                row.status = "pending"
+                row.next_attempt_at = now + backoff(row.attempts)
+            elif isinstance(error, PermanentEmailError) or row.attempts >= max_attempts:
+                row.status = "dead"
+                self.stderr.write(f"Outbox email {row.pk} to {row.to_email} is dead: {row.last_error}")
+            else:
+                row.status = "pending"
+                row.next_attempt_at = now + backoff(row.attempts)
+
+        OutboundEmail.objects.bulk_update(
+            batch, ["status", "sent_at", "attempts", "last_error", "next_attempt_at"]
+        )
+        sent = sum(1 for r in batch if r.status == "sent")
+        self.stdout.write(f"Outbox batch: {sent}/{len(batch)} sent.")
+        if misconfigured:
+            self.stderr.write("The email provider refused our credentials; outbox held for retry.")
@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from boards.journal import TRIM_WATERMARK
+from boards.models import BoardChange, Watermark
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete board change journal rows older than BOARD_CHANGE_RETENTION_DAYS. "
+        "Clients whose cursor falls before the trimmed range are told to resync."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days", type=int,
+            default=getattr(settings, "BOARD_CHANGE_RETENTION_DAYS", 7),
+        )
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def handle(self, *args, **opts):
+        cutoff = timezone.now() - timedelta(days=opts["older_than_days"])
+        # The journal is append-only, so everything up to the newest expired
+        # id can go, even rows with a skewed created_at.
+        upto = BoardChange.objects.filter(created_at__lt=cutoff).aggregate(m=Max("id"))["m"]
+        if upto is None:
+            self.stdout.write("Nothing to trim.")
+            return
+
+        # Raise the watermark first so no client is served a partial diff.
+        watermark, _ = Watermark.objects.get_or_create(name=TRIM_WATERMARK)
+        if upto > watermark.value:
+            watermark.value = upto
+            watermark.save(update_fields=["value", "updated_at"])
+
+        deleted = 0
+        while True:
+            with transaction.atomic():
+                ids = list(
+                    BoardChange.objects.filter(id__lte=upto)
+                    .order_by("id")
+                    .values_list("id", flat=True)[: opts["chunk_size"]]
+                )
+                if not ids:
+                    break
+                deleted += BoardChange.objects.filter(id__in=ids).delete()[0]
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {deleted} board changes up to #{upto}."
+        ))
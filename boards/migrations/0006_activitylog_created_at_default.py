@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-16 20:31
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boards", "0005_activitylog"),
+    ]
+
+    operations = [
+        migrations.RenameIndex(
+            model_name="activitylog",
+            new_name="boards_acti_action_ba26ec_idx",
+            old_name="boards_act_action__c77dcd_idx",
+        ),
+        migrations.RenameIndex(
+            model_name="activitylog",
+            new_name="boards_acti_user_id_da9a0b_idx",
+            old_name="boards_act_user_id_de2bcb_idx",
+        ),
+        migrations.AlterField(
+            model_name="activitylog",
+            name="created_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False
+            ),
+        ),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 5.2.7 on 2026-10-16 20:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boards", "0006_activitylog_created_at_default"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Watermark",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=60, unique=True)),
+                ("value", models.BigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ActivityDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("bucket", models.DateTimeField()),
+                ("action", models.CharField(max_length=120)),
+                ("workspace_id", models.BigIntegerField(default=0)),
+                ("project_id", models.BigIntegerField(default=0)),
+                ("count", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["-bucket", "action"],
+                "abstract": False,
+                "indexes": [
+                    models.Index(
+                        fields=["action", "bucket"], name="daily_rollup_action_bucket"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("bucket", "action", "workspace_id", "project_id"),
+                        name="activitydailyrollup_uniq_bucket",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="ActivityHourlyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("bucket", models.DateTimeField()),
+                ("action", models.CharField(max_length=120)),
+                ("workspace_id", models.BigIntegerField(default=0)),
+                ("project_id", models.BigIntegerField(default=0)),
+                ("count", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["-bucket", "action"],
+                "abstract": False,
+                "indexes": [
+                    models.Index(
+                        fields=["action", "bucket"], name="hourly_rollup_action_bucket"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("bucket", "action", "workspace_id", "project_id"),
+                        name="activityhourlyrollup_uniq_bucket",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-16 20:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boards", "0008_outboundemail"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("archived", False)),
+                fields=["due_date"],
+                name="task_active_due_date",
+            ),
+        ),
+    ]
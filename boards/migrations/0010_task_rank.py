@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-16 20:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def evenly_spaced(count):
+    """Frozen copy of ``boards.ranking.evenly_spaced`` as of this migration."""
+    base = len(DIGITS)
+    width = 1
+    while base ** width <= count:
+        width += 1
+    step = base ** width // (count + 1)
+    keys = []
+    for n in range(1, count + 1):
+        value, digits = n * step, []
+        for _ in range(width):
+            value, digit = divmod(value, base)
+            digits.append(DIGITS[digit])
+        keys.append("".join(reversed(digits)).rstrip("0"))
+    return keys
+
+
+def assign_ranks(apps, schema_editor):
+    """Keep the previous (id) order inside each column."""
+    Task = apps.get_model("boards", "Task")
+    column_ids = Task.objects.values_list("column_id", flat=True).distinct()
+    for column_id in column_ids.iterator():
+        tasks = list(Task.objects.filter(column_id=column_id).order_by("id").only("id"))
+        for task, rank in zip(tasks, evenly_spaced(len(tasks))):
+            task.rank = rank
+        Task.objects.bulk_update(tasks, ["rank"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boards", "0009_task_active_due_date_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="rank",
+            field=models.CharField(default="", editable=False, max_length=64),
+        ),
+        migrations.RunPython(assign_ranks, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["column", "rank"], name="boards_task_column__524692_idx"
+            ),
+        ),
+    ]
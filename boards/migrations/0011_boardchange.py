@@ -0,0 +1,61 @@
+# Generated by Django 5.2.7 on 2026-10-16 20:38
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boards", "0010_task_rank"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BoardChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("project_id", models.BigIntegerField()),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("task", "Task"), ("column", "Column")], max_length=10
+                    ),
+                ),
+                ("object_id", models.BigIntegerField()),
+                (
+                    "op",
+                    models.CharField(
+                        choices=[
+                            ("created", "Created"),
+                            ("updated", "Updated"),
+                            ("moved", "Moved"),
+                            ("archived", "Archived"),
+                            ("deleted", "Deleted"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["project_id", "id"],
+                        name="boards_boar_project_e25260_idx",
+                    ),
+                    models.Index(
+                        fields=["created_at"], name="boards_boar_created_06f9e5_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
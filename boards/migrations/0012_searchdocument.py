@@ -0,0 +1,113 @@
+# Generated by Django 5.2.7 on 2026-10-16 20:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE boards_searchdocument_fts USING fts5(
+        title, body, comments,
+        content='boards_searchdocument', content_rowid='task_id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER boards_searchdocument_ai AFTER INSERT ON boards_searchdocument BEGIN
+        INSERT INTO boards_searchdocument_fts(rowid, title, body, comments)
+        VALUES (new.task_id, new.title, new.body, new.comments);
+    END
+    """,
+    """
+    CREATE TRIGGER boards_searchdocument_ad AFTER DELETE ON boards_searchdocument BEGIN
+        INSERT INTO boards_searchdocument_fts(boards_searchdocument_fts, rowid, title, body, comments)
+        VALUES ('delete', old.task_id, old.title, old.body, old.comments);
+    END
+    """,
+    """
+    CREATE TRIGGER boards_searchdocument_au
+    AFTER UPDATE OF title, body, comments ON boards_searchdocument BEGIN
+        INSERT INTO boards_searchdocument_fts(boards_searchdocument_fts, rowid, title, body, comments)
+        VALUES ('delete', old.task_id, old.title, old.body, old.comments);
+        INSERT INTO boards_searchdocument_fts(rowid, title, body, comments)
+        VALUES (new.task_id, new.title, new.body, new.comments);
+    END
+    """,
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS boards_searchdocument_au",
+    "DROP TRIGGER IF EXISTS boards_searchdocument_ad",
+    "DROP TRIGGER IF EXISTS boards_searchdocument_ai",
+    "DROP TABLE IF EXISTS boards_searchdocument_fts",
+]
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE boards_searchdocument ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', title), 'A')
+        || setweight(to_tsvector('english', body), 'B')
+        || setweight(to_tsvector('english', comments), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX boards_searchdocument_vector ON boards_searchdocument USING GIN (search_vector)",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS boards_searchdocument_vector",
+    "ALTER TABLE boards_searchdocument DROP COLUMN IF EXISTS search_vector",
+]
+# One document per existing task; comments joined by newlines.
+BACKFILL = """
+    INSERT INTO boards_searchdocument (task_id, workspace_id, title, body, comments)
+    SELECT t.id, p.workspace_id, t.title, t.description,
+           COALESCE((SELECT {agg} FROM boards_comment c WHERE c.task_id = t.id), '')
+    FROM boards_task t JOIN boards_project p ON p.id = t.project_id
+"""
+
+
+def create_fts_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        statements, agg = SQLITE_FORWARD, "group_concat(c.body, char(10))"
+    elif vendor == "postgresql":
+        statements, agg = POSTGRES_FORWARD, "string_agg(c.body, E'\\n' ORDER BY c.id)"
+    else:  # MySQL; boards.search falls back to LIKE there
+        statements, agg = [], "GROUP_CONCAT(c.body SEPARATOR '\\n')"
+    for sql in statements:
+        schema_editor.execute(sql)
+    schema_editor.execute(BACKFILL.format(agg=agg))
+
+
+def drop_fts_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {"sqlite": SQLITE_BACKWARD, "postgresql": POSTGRES_BACKWARD}.get(vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boards", "0011_boardchange"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchDocument",
+            fields=[
+                (
+                    "task",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="search_document",
+                        serialize=False,
+                        to="boards.task",
+                    ),
+                ),
+                ("workspace_id", models.BigIntegerField(db_index=True)),
+                ("title", models.CharField(max_length=200)),
+                ("body", models.TextField(blank=True)),
+                ("comments", models.TextField(blank=True)),
+            ],
+        ),
+        migrations.RunPython(create_fts_index, drop_fts_index),
+    ]
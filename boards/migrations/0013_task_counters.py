@@ -0,0 +1,73 @@
+# Generated by Django 5.2.7 on 2026-10-16 20:50
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+COUNTERS = ("task_count", "low_count", "medium_count", "high_count")
+
+
+def count_tasks(apps, schema_editor):
+    Task = apps.get_model("boards", "Task")
+    aggregates = {
+        "task_count": Count("id"),
+        "low_count": Count("id", filter=Q(priority="low")),
+        "medium_count": Count("id", filter=Q(priority="medium")),
+        "high_count": Count("id", filter=Q(priority="high")),
+    }
+    active = Task.objects.filter(archived=False).order_by()
+    for model_name, key in (("Column", "column_id"), ("Project", "project_id")):
+        model = apps.get_model("boards", model_name)
+        rows = active.values(key).annotate(**aggregates)
+        objs = [model(pk=row.pop(key), **row) for row in rows.iterator()]
+        model.objects.bulk_update(objs, COUNTERS, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boards", "0012_searchdocument"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="column",
+            name="high_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="column",
+            name="low_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="column",
+            name="medium_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="column",
+            name="task_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="high_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="low_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="medium_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="task_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_tasks, migrations.RunPython.noop),
+    ]
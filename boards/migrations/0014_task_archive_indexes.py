@@ -0,0 +1,56 @@
+# Generated by Django 5.2.7 on 2026-10-16 20:51
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_archived_at(apps, schema_editor):
+    """Best guess for tasks archived before the timestamp existed."""
+    Task = apps.get_model("boards", "Task")
+    Task.objects.filter(archived=True, archived_at__isnull=True).update(archived_at=F("updated_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boards", "0013_task_counters"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="task",
+            name="boards_task_column__524692_idx",
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="archived_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_archived_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("archived", False)),
+                fields=["project", "column", "rank", "id"],
+                name="task_active_board",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("archived", False)),
+                fields=["column", "rank", "id"],
+                name="task_active_column",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("archived", True)),
+                fields=["project", "-archived_at", "-id"],
+                name="task_archived_recent",
+            ),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-16 20:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boards", "0014_task_archive_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="boardchange",
+            name="kind",
+            field=models.CharField(
+                choices=[("task", "Task"), ("column", "Column"), ("board", "Board")],
+                max_length=10,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="boardchange",
+            name="op",
+            field=models.CharField(
+                choices=[
+                    ("created", "Created"),
+                    ("updated", "Updated"),
+                    ("moved", "Moved"),
+                    ("archived", "Archived"),
+                    ("deleted", "Deleted"),
+                    ("cleared", "Cleared"),
+                ],
+                max_length=10,
+            ),
+        ),
+    ]
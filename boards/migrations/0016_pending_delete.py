@@ -0,0 +1,54 @@
+# Generated by Django 5.2.7 on 2026-10-16 20:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boards", "0015_boardchange_board_cleared"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="delete_requested_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="clear_requested_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="workspace",
+            name="delete_requested_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(
+                condition=models.Q(("delete_requested_at__isnull", False)),
+                fields=["delete_requested_at"],
+                name="project_pending_delete",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(
+                condition=models.Q(("clear_requested_at__isnull", False)),
+                fields=["clear_requested_at"],
+                name="project_pending_clear",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="workspace",
+            index=models.Index(
+                condition=models.Q(("delete_requested_at__isnull", False)),
+                fields=["delete_requested_at"],
+                name="workspace_pending_delete",
+            ),
+        ),
+    ]
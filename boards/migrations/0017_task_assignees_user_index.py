@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    "My tasks" reads the assignee through table by user. Django only indexes
+    ``user_id`` there; ``(user_id, task_id)`` answers the lookup from the
+    index alone. The through table is auto-created, so this is plain SQL.
+    """
+
+    dependencies = [
+        ("boards", "0016_pending_delete"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            "CREATE INDEX task_assignees_user_task ON boards_task_assignees (user_id, task_id)",
+            "DROP INDEX task_assignees_user_task",
+        ),
+    ]
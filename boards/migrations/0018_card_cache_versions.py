@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-16 20:58
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boards", "0017_task_assignees_user_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="m2m_version",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="tag",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 
 
 class Workspace(models.Model):
@@ -11,6 +12,17 @@ class Workspace(models.Model):
         related_name="owned_workspaces",
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the owner deletes it; `process_deletions` removes it later.
+    delete_requested_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["delete_requested_at"],
+                name="workspace_pending_delete",
+                condition=models.Q(delete_requested_at__isnull=False),
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -33,19 +45,53 @@ class WorkspaceMember(models.Model):
 
 
 
-class Project(models.Model):
+class TaskCounters(models.Model):
+    """
+    Active (non-archived) task counts, kept current by ``boards.counters``.
+    Overdue tasks are counted when read, since they turn overdue without a
+    write.
+    """
+    task_count = models.PositiveIntegerField(default=0, editable=False)
+    low_count = models.PositiveIntegerField(default=0, editable=False)
+    medium_count = models.PositiveIntegerField(default=0, editable=False)
+    high_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        abstract = True
+
+
+class Project(TaskCounters):
     """A board (Trello-like) within a workspace."""
     workspace = models.ForeignKey(
         Workspace, on_delete=models.CASCADE, related_name="projects"
     )
     title = models.CharField(max_length=160)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the owner deletes it; `process_deletions` removes it later.
+    delete_requested_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Set when a large board is cleared; `process_deletions` deletes the
+    # tasks created up to then.
+    clear_requested_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["delete_requested_at"],
+                name="project_pending_delete",
+                condition=models.Q(delete_requested_at__isnull=False),
+            ),
+            models.Index(
+                fields=["clear_requested_at"],
+                name="project_pending_clear",
+                condition=models.Q(clear_requested_at__isnull=False),
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
 
-class Column(models.Model):
+class Column(TaskCounters):
     project = models.ForeignKey(
         Project, on_delete=models.CASCADE, related_name="columns"
     )
@@ -64,6 +110,8 @@ class Column(models.Model):
 class Tag(models.Model):
     name = models.CharField(max_length=40, unique=True)
     color = models.CharField(max_length=9, default="#64748b")
+    # Cached cards are keyed by the newest tag change (boards.caching).
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -89,7 +137,13 @@ class Task(models.Model):
         settings.AUTH_USER_MODEL, blank=True, related_name="assigned_tasks"
     )
     tags = models.ManyToManyField(Tag, blank=True)
+    # Bumped on every tag/assignee change, which leaves updated_at alone;
+    # part of the cached card key (see boards.board.render_cards).
+    m2m_version = models.PositiveIntegerField(default=0, editable=False)
     archived = models.BooleanField(default=False)
+    archived_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Position inside the column, see boards.ranking.
+    rank = models.CharField(max_length=64, default="", editable=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -98,11 +152,64 @@ class Task(models.Model):
         indexes = [
             models.Index(fields=["project", "priority"]),
             models.Index(fields=["project", "due_date"]),
+            # Boards and column pages only read active tasks, in rank order;
+            # partial indexes keep archived rows out of that hot path.
+            models.Index(
+                fields=["project", "column", "rank", "id"],
+                condition=models.Q(archived=False),
+                name="task_active_board",
+            ),
+            models.Index(
+                fields=["column", "rank", "id"],
+                condition=models.Q(archived=False),
+                name="task_active_column",
+            ),
+            # Archive browser: newest first per project.
+            models.Index(
+                fields=["project", "-archived_at", "-id"],
+                condition=models.Q(archived=True),
+                name="task_archived_recent",
+            ),
+            # Cross-project due-date scans (digests) only care about active tasks.
+            models.Index(
+                fields=["due_date"],
+                condition=models.Q(archived=False),
+                name="task_active_due_date",
+            ),
         ]
 
     def __str__(self):
         return self.title
 
+    # What a task counts towards in Column/Project counters (boards.counters).
+    COUNTER_FIELDS = ("project_id", "column_id", "archived", "priority")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded state so deletes can take it off the counters.
+        if set(cls.COUNTER_FIELDS).issubset(field_names):
+            instance._counter_state = instance.counter_state()
+        return instance
+
+    def counter_state(self) -> tuple:
+        return tuple(getattr(self, field) for field in self.COUNTER_FIELDS)
+
+    def save(self, *args, **kwargs):
+        if not self.rank and self.column_id:
+            from .ranking import rank_at_end
+
+            self.rank = rank_at_end(self.column_id, exclude_pk=self.pk)
+        if self.archived != (self.archived_at is not None):
+            self.archived_at = timezone.now() if self.archived else None
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "archived" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "archived_at"}
+        # The counter signals lock the row in pre_save and apply the delta
+        # in post_save (boards.signals): both must run in one transaction.
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="comments")
@@ -114,6 +221,27 @@ class Comment(models.Model):
         return f"Comment by {self.author} on {self.task}"
 
 
+class SearchDocument(models.Model):
+    """
+    Searchable text of a task and its comments, one row per task.
+
+    The full-text index itself lives outside the ORM (migration 0012): an
+    FTS5 external-content table kept current by triggers on SQLite, a
+    generated ``tsvector`` column with a GIN index on PostgreSQL. Rows are
+    maintained by signals, see ``boards.search``.
+    """
+    task = models.OneToOneField(
+        Task, on_delete=models.CASCADE, primary_key=True, related_name="search_document"
+    )
+    workspace_id = models.BigIntegerField(db_index=True)
+    title = models.CharField(max_length=200)
+    body = models.TextField(blank=True)
+    comments = models.TextField(blank=True)
+
+    def __str__(self):
+        return self.title
+
+
 class ActivityLog(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -126,7 +254,8 @@ class ActivityLog(models.Model):
     request_path = models.CharField(max_length=255, blank=True)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.CharField(max_length=255, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the event happens, not when a buffered batch is written.
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ["-created_at"]
@@ -137,3 +266,127 @@ class ActivityLog(models.Model):
 
     def __str__(self):
         return f"{self.action} @ {self.created_at:%Y-%m-%d %H:%M:%S}"
+
+
+class Watermark(models.Model):
+    """Progress marker of an incremental maintenance job (e.g. last row id)."""
+    name = models.CharField(max_length=60, unique=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
+class ActivityRollup(models.Model):
+    """
+    Pre-aggregated ActivityLog counts per time bucket and action.
+
+    ``workspace_id``/``project_id`` are copied from the log metadata (0 when
+    absent) and are plain integers so rollups outlive deleted objects.
+    """
+    bucket = models.DateTimeField()
+    action = models.CharField(max_length=120)
+    workspace_id = models.BigIntegerField(default=0)
+    project_id = models.BigIntegerField(default=0)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+        ordering = ["-bucket", "action"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["bucket", "action", "workspace_id", "project_id"],
+                name="%(class)s_uniq_bucket",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.action} @ {self.bucket:%Y-%m-%d %H:%M}: {self.count}"
+
+
+class ActivityHourlyRollup(ActivityRollup):
+    class Meta(ActivityRollup.Meta):
+        indexes = [models.Index(fields=["action", "bucket"], name="hourly_rollup_action_bucket")]
+
+
+class ActivityDailyRollup(ActivityRollup):
+    class Meta(ActivityRollup.Meta):
+        indexes = [models.Index(fields=["action", "bucket"], name="daily_rollup_action_bucket")]
+
+
+class OutboundEmail(models.Model):
+    """Email waiting in the outbox for the `send_outbox_emails` worker."""
+    STATUS = [
+        ("pending", "Pending"),
+        ("sending", "Sending"),
+        ("sent", "Sent"),
+        ("dead", "Dead"),
+    ]
+
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    text_body = models.TextField(blank=True)
+    html_body = models.TextField(blank=True)
+    status = models.CharField(max_length=10, choices=STATUS, default="pending")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # Earliest next delivery attempt; doubles as the lease of a "sending" row.
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} → {self.to_email} ({self.status})"
+
+
+class DigestDelivery(models.Model):
+    """Day the last due-date digest went to a user (see `send_due_digests`)."""
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="digest_delivery"
+    )
+    sent_on = models.DateField()
+
+    def __str__(self):
+        return f"{self.user} digest sent {self.sent_on}"
+
+
+class BoardChange(models.Model):
+    """
+    Append-only journal of task/column changes; ``id`` is the sync cursor.
+    A ``board`` row (``object_id`` is the project) marks a change too large
+    to list, such as clearing the board: clients past it resync.
+
+    ``project_id`` is a plain integer so journal rows written while a
+    project is being deleted never block the delete; old rows are trimmed
+    by the `trim_board_changes` command.
+    """
+    KIND = [("task", "Task"), ("column", "Column"), ("board", "Board")]
+    OP = [
+        ("created", "Created"),
+        ("updated", "Updated"),
+        ("moved", "Moved"),
+        ("archived", "Archived"),
+        ("deleted", "Deleted"),
+        ("cleared", "Cleared"),
+    ]
+
+    project_id = models.BigIntegerField()
+    kind = models.CharField(max_length=10, choices=KIND)
+    object_id = models.BigIntegerField()
+    op = models.CharField(max_length=10, choices=OP)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["project_id", "id"]),
+            models.Index(fields=["created_at"]),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.kind} {self.object_id} {self.op}"
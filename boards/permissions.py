@@ -1,19 +1,72 @@
+from django.conf import settings
+from django.core.cache import cache
 from django.http import HttpResponseForbidden
 from django.shortcuts import get_object_or_404
-from .models import Workspace, Project
+
+from .caching import access_version
+from .models import Workspace, Project, Task, WorkspaceMember
+
+
+def user_can_access_workspace(request, workspace):
+    """
+    True if the current user owns or is a member of ``workspace``.
+
+    Membership answers are memoized on the request. With a positive
+    ``WORKSPACE_ACCESS_CACHE_TIMEOUT`` (shared caches only) they are also
+    cached across requests under the workspace's access version, which is
+    bumped whenever its owner or member rows change (see ``boards.signals``).
+    """
+    user_id = request.user.id
+    if workspace.owner_id == user_id:
+        return True
+
+    memo = request.__dict__.setdefault("_workspace_access", {})
+    if workspace.pk not in memo:
+        timeout = getattr(settings, "WORKSPACE_ACCESS_CACHE_TIMEOUT", 0)
+        key = allowed = None
+        if timeout > 0:
+            key = "boards:access:{}:{}:{}".format(
+                workspace.pk, access_version(workspace.pk), user_id
+            )
+            allowed = cache.get(key)
+        if allowed is None:
+            allowed = WorkspaceMember.objects.filter(
+                workspace_id=workspace.pk, user_id=user_id
+            ).exists()
+            if key:
+                cache.set(key, allowed, timeout)
+        memo[workspace.pk] = allowed
+    return memo[workspace.pk]
+
+
+# Workspaces and projects awaiting deletion are gone as far as users can tell.
+LIVE_WORKSPACES = Workspace.objects.filter(delete_requested_at=None)
+LIVE_PROJECTS = Project.objects.filter(delete_requested_at=None, workspace__delete_requested_at=None)
+
 
 def user_in_workspace_or_403(request, workspace_id):
-    ws = get_object_or_404(Workspace, pk=workspace_id)
-    if ws.owner_id == request.user.id or ws.memberships.filter(user=request.user).exists():
+    ws = get_object_or_404(LIVE_WORKSPACES, pk=workspace_id)
+    if user_can_access_workspace(request, ws):
         return ws
     return HttpResponseForbidden("Not allowed")
 
 def user_can_see_project_or_403(request, project_id):
-    project = get_object_or_404(Project, pk=project_id)
-    ws = project.workspace
-    if ws.owner_id == request.user.id or ws.memberships.filter(user=request.user).exists():
+    project = get_object_or_404(LIVE_PROJECTS.select_related("workspace"), pk=project_id)
+    if user_can_access_workspace(request, project.workspace):
         return project
     return HttpResponseForbidden("Not allowed")
 
+def user_can_see_task_or_403(request, task_id):
+    """Load a task with its project and workspace in one query."""
+    task = get_object_or_404(
+        Task.objects.select_related("project__workspace"),
+        pk=task_id,
+        project__delete_requested_at=None,
+        project__workspace__delete_requested_at=None,
+    )
+    if user_can_access_workspace(request, task.project.workspace):
+        return task
+    return HttpResponseForbidden("Not allowed")
+
 def user_is_workspace_owner(request, workspace):
     return workspace.owner_id == request.user.id
@@ -0,0 +1,139 @@
+"""
+Chunked bulk deletion of tasks, boards and workspaces.
+
+``QuerySet.delete()`` on tasks makes Django's collector load every task,
+comment and M2M row (and send a signal per object) before deleting. Here
+each chunk of task ids is removed with a handful of set-based DELETEs in
+its own short transaction, so memory and lock time stay bounded whatever
+the board size. Derived data (counters, board cache, journal) is updated
+explicitly since no per-object signals fire: a purge is journaled as one
+``board`` change, which makes syncing clients reload the board.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Callable, Optional
+
+from django.db import transaction
+from django.utils.timezone import now
+
+from .caching import bump_board_version
+from .counters import recount_counters
+from .journal import record_changes
+from .models import BoardChange, Column, Comment, Project, SearchDocument, Task, Workspace
+
+CHUNK_SIZE = 1000
+
+Progress = Callable[[int, int], None]  # (deleted so far, total)
+
+
+def delete_task_chunk(task_ids: list) -> None:
+    """Delete tasks and everything hanging off them, children first."""
+    # _raw_delete: one DELETE, no collector, no per-object signals.
+    comments = Comment.objects.filter(task_id__in=task_ids)
+    comments._raw_delete(comments.db)
+    Task.tags.through.objects.filter(task_id__in=task_ids).delete()
+    Task.assignees.through.objects.filter(task_id__in=task_ids).delete()
+    SearchDocument.objects.filter(task_id__in=task_ids).delete()
+    tasks = Task.objects.filter(pk__in=task_ids)
+    tasks._raw_delete(tasks.db)
+
+
+def _delete_in_chunks(tasks, chunk_size: int, progress: Optional[Progress] = None) -> int:
+    tasks = tasks.order_by("pk")
+    total = tasks.count()
+    deleted, last_id = 0, 0
+    while True:
+        with transaction.atomic():
+            ids = list(tasks.filter(pk__gt=last_id).values_list("pk", flat=True)[:chunk_size])
+            if not ids:
+                break
+            delete_task_chunk(ids)
+        deleted += len(ids)
+        last_id = ids[-1]
+        if progress:
+            progress(deleted, total)
+    return deleted
+
+
+def purge_project_tasks(
+    project,
+    chunk_size: int = CHUNK_SIZE,
+    progress: Optional[Progress] = None,
+    created_until: Optional[datetime] = None,
+) -> int:
+    """
+    Delete every task of ``project`` (archived ones included; with
+    ``created_until``, only those created up to then) in id-ordered chunks
+    of ``chunk_size``, one transaction per chunk. A failure leaves the
+    already-deleted chunks deleted; running again finishes the job.
+    Returns the number of tasks deleted.
+    """
+    tasks = Task.objects.filter(project=project)
+    if created_until is not None:
+        tasks = tasks.filter(created_at__lte=created_until)
+    deleted = _delete_in_chunks(tasks, chunk_size, progress=progress)
+    recount_counters([project.pk])
+    bump_board_version(project.pk)
+    record_changes(project.pk, "board", "cleared", [project.pk])
+    return deleted
+
+
+def request_clear(project) -> bool:
+    """
+    Clear ``project``'s tasks: right away when they fit in one chunk,
+    otherwise by stamping ``clear_requested_at`` for `process_deletions`.
+    Returns whether the clear was deferred.
+    """
+    if not Task.objects.filter(project=project).values_list("pk")[CHUNK_SIZE:CHUNK_SIZE + 1]:
+        purge_project_tasks(project)
+        return False
+    project.clear_requested_at = now()
+    project.save(update_fields=["clear_requested_at"])
+    return True
+
+
+def finish_clear(project_id: int, chunk_size: int = CHUNK_SIZE, progress: Optional[Progress] = None) -> int:
+    """Delete the tasks of a requested clear; returns the tasks deleted."""
+    project = Project.objects.filter(pk=project_id).first()
+    if project is None or project.clear_requested_at is None:
+        return 0
+    stamp = project.clear_requested_at
+    deleted = purge_project_tasks(project, chunk_size, progress, created_until=stamp)
+    # A newer request (made meanwhile) keeps its stamp for the next run.
+    Project.objects.filter(pk=project_id, clear_requested_at=stamp).update(clear_requested_at=None)
+    return deleted
+
+
+# ---------- Pending deletes ----------
+#
+# Deleting a workspace or project only stamps ``delete_requested_at``; the
+# object disappears from every list and permission check at once, and the
+# `process_deletions` worker tears it down here. Each step commits on its
+# own and the stamp stays until the final row is gone, so an interrupted
+# run simply resumes where it stopped.
+
+
+def teardown_project(project_id: int, chunk_size: int = CHUNK_SIZE, progress: Optional[Progress] = None) -> int:
+    """Delete a project and everything in it; returns the tasks deleted."""
+    deleted = _delete_in_chunks(Task.objects.filter(project_id=project_id), chunk_size, progress=progress)
+    with transaction.atomic():
+        # Only columns are left: nothing to count, index or journal.
+        columns = Column.objects.filter(project_id=project_id)
+        columns._raw_delete(columns.db)
+        BoardChange.objects.filter(project_id=project_id).delete()
+        Project.objects.filter(pk=project_id).delete()
+    bump_board_version(project_id)
+    return deleted
+
+
+def teardown_workspace(workspace_id: int, chunk_size: int = CHUNK_SIZE, progress: Optional[Progress] = None) -> int:
+    """Delete a workspace, project by project; returns the tasks deleted."""
+    deleted = 0
+    for project_id in Project.objects.filter(workspace_id=workspace_id).order_by("pk").values_list("pk", flat=True):
+        deleted += teardown_project(project_id, chunk_size, progress)
+    # Memberships and the workspace itself: small, and their signals bump
+    # the workspace's access version.
+    Workspace.objects.filter(pk=workspace_id).delete()
+    return deleted
@@ -0,0 +1,143 @@
+"""Lexicographic rank keys for ordering tasks inside a column.
+
+A rank is a base-36 fraction written without the leading "0." ("i" is 0.5),
+so string comparison equals numeric comparison as long as keys never end in
+"0", which ``rank_between`` guarantees. There is always room for a key
+between two others, so moving a card writes exactly one row; keys only grow
+when cards keep landing in the same gap, and ``rebalance_column`` resets
+them in bulk once they get too long.
+"""
+
+from __future__ import annotations
+
+from django.db import transaction
+
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+MAX_RANK_LENGTH = 24  # rebalance beyond this; the column holds 64
+
+
+def rank_between(lo: str = "", hi: str = "") -> str:
+    """
+    Return a key strictly between ``lo`` and ``hi``.
+
+    An empty ``lo`` means "before everything", an empty ``hi`` "after
+    everything".
+    """
+    if lo and hi and lo >= hi:
+        raise ValueError(f"rank_between({lo!r}, {hi!r}): lo must sort before hi")
+
+    result = []
+    i = 0
+    upper_bounded = bool(hi)
+    while True:
+        lo_digit = DIGITS.index(lo[i]) if i < len(lo) else 0
+        hi_digit = (DIGITS.index(hi[i]) if i < len(hi) else 0) if upper_bounded else BASE
+        if hi_digit - lo_digit > 1:
+            result.append(DIGITS[(lo_digit + hi_digit) // 2])
+            return "".join(result)
+        result.append(DIGITS[lo_digit])
+        if hi_digit - lo_digit == 1:
+            # Prefix is now below hi; only lo constrains the remaining digits.
+            upper_bounded = False
+        i += 1
+
+
+def ranks_between(lo: str, hi: str, count: int) -> list[str]:
+    """``count`` increasing keys between ``lo`` and ``hi`` (by bisection, so
+    keys grow with log(count) instead of count)."""
+    if count <= 0:
+        return []
+    mid = rank_between(lo, hi)
+    left = count // 2
+    return ranks_between(lo, mid, left) + [mid] + ranks_between(mid, hi, count - left - 1)
+
+
+def evenly_spaced(count: int) -> list[str]:
+    """``count`` short, increasing keys spread over the whole key space."""
+    width = 1
+    while BASE ** width <= count:
+        width += 1
+    step = BASE ** width // (count + 1)
+    keys = []
+    for n in range(1, count + 1):
+        value, digits = n * step, []
+        for _ in range(width):
+            value, digit = divmod(value, BASE)
+            digits.append(DIGITS[digit])
+        keys.append("".join(reversed(digits)).rstrip("0"))
+    return keys
+
+
+def _active(column_id: int, exclude_pk=None):
+    from .models import Task
+
+    qs = Task.objects.filter(column_id=column_id, archived=False)
+    return qs.exclude(pk=exclude_pk) if exclude_pk else qs
+
+
+def last_rank(column_id: int, exclude_pk=None) -> str:
+    """Rank of the bottom card of a column ("" when it is empty)."""
+    return (
+        _active(column_id, exclude_pk)
+        .order_by("-rank")
+        .values_list("rank", flat=True)
+        .first()
+    ) or ""
+
+
+def rank_at_end(column_id: int, exclude_pk=None) -> str:
+    return rank_between(last_rank(column_id, exclude_pk), "")
+
+
+def rank_for_drop(column_id: int, task_pk, before=None, after=None) -> str:
+    """
+    Rank for dropping ``task_pk`` into ``column_id`` right after the task
+    ``after`` or right before the task ``before`` (ids of active tasks in
+    that column). Without either, the task goes to the bottom.
+    """
+    siblings = _active(column_id, task_pk)
+    if after is not None:
+        lo = siblings.filter(pk=after).values_list("rank", flat=True).first()
+        if lo is not None:
+            hi = siblings.filter(rank__gt=lo).order_by("rank").values_list("rank", flat=True).first()
+            return _between_or_rebalance(column_id, task_pk, lo, hi or "", before, after)
+    if before is not None:
+        hi = siblings.filter(pk=before).values_list("rank", flat=True).first()
+        if hi:
+            lo = siblings.filter(rank__lt=hi).order_by("-rank").values_list("rank", flat=True).first()
+            return _between_or_rebalance(column_id, task_pk, lo or "", hi, before, after)
+    return rank_at_end(column_id, task_pk)
+
+
+def _between_or_rebalance(column_id, task_pk, lo, hi, before, after) -> str:
+    try:
+        return rank_between(lo, hi)
+    except ValueError:
+        # Duplicate keys (e.g. rows written before ranks existed): spread the
+        # column out once, then retry against the fresh keys.
+        rebalance_column(column_id)
+        return rank_for_drop(column_id, task_pk, before=before, after=after)
+
+
+def needs_rebalance(rank: str) -> bool:
+    return len(rank) > MAX_RANK_LENGTH
+
+
+def rebalance_column(column_id: int) -> int:
+    """Rewrite the ranks of a column's active tasks as short, even keys."""
+    from .caching import bump_board_version
+    from .journal import record_changes
+    from .models import Task
+
+    with transaction.atomic():
+        tasks = list(
+            _active(column_id).select_for_update().order_by("rank", "id").only("id", "rank", "project_id")
+        )
+        for task, rank in zip(tasks, evenly_spaced(len(tasks))):
+            task.rank = rank
+        Task.objects.bulk_update(tasks, ["rank"], batch_size=500)
+    if tasks:
+        bump_board_version(tasks[0].project_id)
+        record_changes(tasks[0].project_id, "task", "moved", [t.pk for t in tasks])
+    return len(tasks)
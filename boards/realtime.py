@@ -0,0 +1,234 @@
+"""
+Real-time board events for the ASGI app.
+
+Writes publish a small event per change (see ``boards.journal``) through a
+pluggable broker. Each worker process runs one ``Hub`` on its event loop
+that receives events from the broker and fans them out to the open
+server-sent-event streams of that project, so an idle board tab costs one
+suspended coroutine and a small queue.
+
+``LocalBroker`` only reaches streams in the same process (single worker,
+development, tests); ``PostgresBroker`` uses LISTEN/NOTIFY so that every
+worker sees every event, and is the default on PostgreSQL.
+
+Open streams re-check the viewer's access every heartbeat and end once it
+is gone, so a removed member stops receiving events.
+"""
+
+from __future__ import annotations
+
+import abc
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 100  # per stream; clients only need one event to refresh
+
+# libpq connection keywords; Django's OPTIONS may also hold its own keys
+# (isolation_level, server_side_binding, pool, ...) that psycopg2 rejects.
+LIBPQ_KEYWORDS = frozenset({
+    "host", "hostaddr", "port", "dbname", "user", "password", "passfile",
+    "require_auth", "channel_binding", "connect_timeout", "client_encoding",
+    "options", "application_name", "fallback_application_name", "keepalives",
+    "keepalives_idle", "keepalives_interval", "keepalives_count",
+    "tcp_user_timeout", "gssencmode", "sslmode", "requiressl",
+    "sslcompression", "sslcert", "sslkey", "sslpassword", "sslcertmode",
+    "sslrootcert", "sslcrl", "sslcrldir", "sslsni", "requirepeer",
+    "ssl_min_protocol_version", "ssl_max_protocol_version", "krbsrvname",
+    "gsslib", "gssdelegation", "service", "target_session_attrs",
+    "load_balance_hosts",
+})
+
+Deliver = Callable[[int, dict], None]
+
+
+class Broker(abc.ABC):
+    """Carries board events between worker processes."""
+
+    @abc.abstractmethod
+    def publish(self, project_id: int, event: dict) -> None:
+        """Send ``event`` to the streams of ``project_id`` in every process."""
+
+    @abc.abstractmethod
+    def start(self, deliver: Deliver) -> None:
+        """Call ``deliver(project_id, event)`` (from any thread) for every
+        event published from now on."""
+
+
+class LocalBroker(Broker):
+    """In-process broker: events never leave the publishing process."""
+
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+
+    def publish(self, project_id: int, event: dict) -> None:
+        if self._deliver is not None:
+            self._deliver(project_id, event)
+
+    def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+
+class PostgresBroker(Broker):
+    """
+    LISTEN/NOTIFY broker. Publishing uses the request's own connection (in
+    autocommit, since events are published on commit); each process listens
+    on one extra connection from a daemon thread.
+    """
+
+    CHANNEL = "board_events"
+
+    def publish(self, project_id: int, event: dict) -> None:
+        from django.db import connection
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_notify(%s, %s)",
+                [self.CHANNEL, json.dumps({"project": project_id, **event})],
+            )
+
+    def start(self, deliver: Deliver) -> None:
+        threading.Thread(
+            target=self._listen, args=(deliver,), name="board-events", daemon=True
+        ).start()
+
+    def _connect(self):
+        import psycopg2
+
+        db = settings.DATABASES["default"]
+        options = {
+            key: value for key, value in db.get("OPTIONS", {}).items() if key in LIBPQ_KEYWORDS
+        }
+        conn = psycopg2.connect(
+            **{
+                "dbname": db["NAME"],
+                "user": db.get("USER") or None,
+                "password": db.get("PASSWORD") or None,
+                "host": db.get("HOST") or None,
+                "port": db.get("PORT") or None,
+                **options,
+            }
+        )
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.CHANNEL}")
+        return conn
+
+    def _listen(self, deliver: Deliver) -> None:
+        while True:
+            try:
+                conn = self._connect()
+                try:
+                    while True:
+                        if select.select([conn], [], [], 60)[0]:
+                            conn.poll()
+                            while conn.notifies:
+                                data = json.loads(conn.notifies.pop(0).payload)
+                                deliver(data.pop("project"), data)
+                finally:
+                    conn.close()
+            except Exception:
+                logger.exception("Board event listener failed; reconnecting")
+                time.sleep(5)
+
+
+class Hub:
+    """Per-process fan-out from the broker to this worker's open streams."""
+
+    def __init__(self, broker: Broker):
+        self.broker = broker
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queues: dict[int, set] = defaultdict(set)
+
+    def _start(self) -> None:
+        # Bind to the serving loop on first subscription; only then is there
+        # anyone to deliver to.
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            self.broker.start(self._deliver)
+
+    def _deliver(self, project_id: int, event: dict) -> None:
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._fan_out, project_id, event)
+
+    def _fan_out(self, project_id: int, event: dict) -> None:
+        for queue in self._queues.get(project_id, ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                pass  # the client refreshes on the events already queued
+
+    async def listen(self, project_id: int, heartbeat: float):
+        """Yield events for ``project_id``, or ``None`` after ``heartbeat``
+        idle seconds, until the consumer goes away."""
+        self._start()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        subscribers = self._queues[project_id]
+        subscribers.add(queue)
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            subscribers.discard(queue)
+            if not subscribers:
+                self._queues.pop(project_id, None)
+
+
+_hub: Optional[Hub] = None
+_hub_lock = threading.Lock()
+
+
+def get_hub() -> Hub:
+    global _hub
+    if _hub is None:
+        with _hub_lock:
+            if _hub is None:
+                broker_path = getattr(settings, "REALTIME_BROKER", "boards.realtime.LocalBroker")
+                _hub = Hub(import_string(broker_path)())
+    return _hub
+
+
+def publish(project_id: int, event: dict) -> None:
+    """Send ``event`` to every open stream of the project (best effort)."""
+    try:
+        get_hub().broker.publish(project_id, event)
+    except Exception:
+        logger.exception("Failed to publish board event for project %s", project_id)
+
+
+async def event_stream(project_id: int, still_allowed: Optional[Callable] = None):
+    """
+    Server-sent-events body for one board. ``still_allowed`` (an async
+    callable) is awaited at most once per heartbeat; the stream ends as
+    soon as it returns False.
+    """
+    heartbeat = getattr(settings, "REALTIME_HEARTBEAT", 15)
+    yield "retry: 5000\n\n"
+    events = get_hub().listen(project_id, heartbeat)
+    checked = time.monotonic()
+    try:
+        async for event in events:
+            if still_allowed is not None and time.monotonic() - checked >= heartbeat:
+                if not await still_allowed():
+                    return
+                checked = time.monotonic()
+            if event is None:
+                yield ": ping\n\n"  # keeps proxies from closing an idle stream
+            else:
+                yield f"event: board\ndata: {json.dumps(event)}\n\n"
+    finally:
+        await events.aclose()
@@ -0,0 +1,200 @@
+"""
+Workspace full-text search over task titles, descriptions and comments.
+
+Each task has one ``SearchDocument`` row (kept current by the signals in
+``boards.signals``). SQLite searches it through an FTS5 table ranked with
+bm25, PostgreSQL through a GIN-indexed ``tsvector`` ranked with
+``ts_rank_cd``; other databases fall back to ``icontains``. Results are
+ordered by ``(score, task id)`` ascending, which is also the keyset cursor.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from django.db import connection
+from django.db.models import Q
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Comment, Project, SearchDocument, Task
+
+PAGE_SIZE = 20
+MAX_TERMS = 8
+MARK_START, MARK_END = "\x02", "\x03"
+
+SQLITE_SEARCH = """
+    SELECT d.task_id, bm25(boards_searchdocument_fts, 10.0, 4.0, 1.0) AS score,
+           snippet(boards_searchdocument_fts, -1, char(2), char(3), '…', 16)
+    FROM boards_searchdocument_fts
+    JOIN boards_searchdocument d ON d.task_id = boards_searchdocument_fts.rowid
+    JOIN boards_task t ON t.id = d.task_id
+    WHERE boards_searchdocument_fts MATCH %s AND d.workspace_id = %s {archived} {after}
+    ORDER BY score, d.task_id
+    LIMIT %s
+"""
+
+# The inner query ranks and pages; headlines (the expensive part) are only
+# built for the rows of the page.
+POSTGRES_SCORE = "(-ts_rank_cd(d.search_vector, q.query, 32))::float8"
+POSTGRES_SEARCH = f"""
+    SELECT page.task_id, page.score,
+           ts_headline('english', page.body || E'\\n' || page.comments, page.query, %s)
+    FROM (
+        SELECT d.task_id, d.body, d.comments, q.query, {POSTGRES_SCORE} AS score
+        FROM boards_searchdocument d
+        JOIN boards_task t ON t.id = d.task_id
+        CROSS JOIN to_tsquery('english', %s) AS q(query)
+        WHERE d.search_vector @@ q.query AND d.workspace_id = %s {{archived}} {{after}}
+        ORDER BY score, d.task_id
+        LIMIT %s
+    ) page
+    ORDER BY page.score, page.task_id
+"""
+POSTGRES_HEADLINE_OPTIONS = (
+    f"StartSel={MARK_START}, StopSel={MARK_END}, "
+    "MaxWords=24, MinWords=8, MaxFragments=2, FragmentDelimiter=\" … \""
+)
+
+
+@dataclass
+class SearchHit:
+    task: Task
+    snippet: str  # safe HTML with <mark> around matches ("" if unavailable)
+
+
+def _terms(query: str) -> list[str]:
+    # Only word characters reach the FTS syntax, so user input can never
+    # produce a query syntax error.
+    return re.findall(r"\w+", query.lower())[:MAX_TERMS]
+
+
+def parse_cursor(raw) -> Optional[tuple[float, int]]:
+    try:
+        score, pk = (raw or "").rsplit(":", 1)
+        return float(score), int(pk)
+    except ValueError:
+        return None
+
+
+def format_cursor(score: float, pk: int) -> str:
+    return f"{score!r}:{pk}"
+
+
+def _highlight(snippet: str) -> str:
+    html = escape(snippet or "")
+    return mark_safe(html.replace(MARK_START, "<mark>").replace(MARK_END, "</mark>"))
+
+
+def _search_sqlite(workspace_id, terms, after, limit, include_archived) -> list:
+    # Every term must match; the last one as a prefix (search-as-you-type).
+    match = " ".join(f'"{term}"' for term in terms) + "*"
+    params = [match, workspace_id]
+    after_sql = ""
+    if after:
+        after_sql = "AND (score, d.task_id) > (%s, %s)"
+        params += list(after)
+    sql = SQLITE_SEARCH.format(
+        archived="" if include_archived else "AND t.archived = 0", after=after_sql
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params + [limit])
+        return cursor.fetchall()
+
+
+def _search_postgres(workspace_id, terms, after, limit, include_archived) -> list:
+    tsquery = " & ".join(terms[:-1] + [f"{terms[-1]}:*"])
+    params = [POSTGRES_HEADLINE_OPTIONS, tsquery, workspace_id]
+    after_sql = ""
+    if after:
+        after_sql = f"AND ({POSTGRES_SCORE}, d.task_id) > (%s, %s)"
+        params += list(after)
+    sql = POSTGRES_SEARCH.format(
+        archived="" if include_archived else "AND NOT t.archived", after=after_sql
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params + [limit])
+        return cursor.fetchall()
+
+
+def _search_fallback(workspace_id, terms, after, limit, include_archived) -> list:
+    docs = SearchDocument.objects.filter(workspace_id=workspace_id)
+    for term in terms:
+        docs = docs.filter(
+            Q(title__icontains=term) | Q(body__icontains=term) | Q(comments__icontains=term)
+        )
+    if not include_archived:
+        docs = docs.filter(task__archived=False)
+    if after:
+        docs = docs.filter(task_id__gt=after[1])
+    return [(pk, 0.0, "") for pk in docs.order_by("task_id").values_list("task_id", flat=True)[:limit]]
+
+
+def search_tasks(
+    workspace_id: int,
+    query: str,
+    after: Optional[str] = None,
+    limit: int = PAGE_SIZE,
+    include_archived: bool = False,
+) -> tuple[list[SearchHit], Optional[str]]:
+    """
+    One page of tasks in the workspace matching ``query``, best first.
+
+    ``after`` is the cursor returned with the previous page; the second
+    value returned is the cursor of the next page (``None`` on the last).
+    Access to the workspace must already have been checked.
+    """
+    terms = _terms(query)
+    if not terms:
+        return [], None
+
+    search = {
+        "sqlite": _search_sqlite,
+        "postgresql": _search_postgres,
+    }.get(connection.vendor, _search_fallback)
+    rows = search(workspace_id, terms, parse_cursor(after), limit + 1, include_archived)
+
+    more, rows = len(rows) > limit, rows[:limit]
+    tasks = (
+        Task.objects.select_related("project", "column")
+        .filter(project__delete_requested_at=None)  # boards awaiting deletion
+        .in_bulk([row[0] for row in rows])
+    )
+    hits = [SearchHit(tasks[pk], _highlight(snippet)) for pk, _, snippet in rows if pk in tasks]
+    next_cursor = format_cursor(rows[-1][1], rows[-1][0]) if more else None
+    return hits, next_cursor
+
+
+# ---------- Index maintenance ----------
+
+def _workspace_id(task) -> int:
+    if Task.project.is_cached(task):
+        return task.project.workspace_id
+    return Project.objects.values_list("workspace_id", flat=True).get(pk=task.project_id)
+
+
+def index_task(task, created: bool = False) -> None:
+    """Write the title/description of ``task`` to its search document."""
+    if not created:
+        changed = (
+            SearchDocument.objects.filter(task_id=task.pk)
+            .exclude(title=task.title, body=task.description)
+            .update(title=task.title, body=task.description)
+        )
+        if changed or SearchDocument.objects.filter(task_id=task.pk).exists():
+            return
+    SearchDocument.objects.create(
+        task_id=task.pk,
+        workspace_id=_workspace_id(task),
+        title=task.title,
+        body=task.description,
+        comments="\n".join(Comment.objects.filter(task_id=task.pk).values_list("body", flat=True)),
+    )
+
+
+def index_comments(task_id: int) -> None:
+    """Refresh the comment text of a task's search document."""
+    bodies = Comment.objects.filter(task_id=task_id).order_by("id").values_list("body", flat=True)
+    SearchDocument.objects.filter(task_id=task_id).update(comments="\n".join(bodies))
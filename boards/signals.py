@@ -0,0 +1,176 @@
+"""Signal receivers keeping derived board data in sync with the models."""
+
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .caching import bump_access_version, bump_board_version
+from .board import bump_m2m_version
+from .counters import adjust_counters, subtract_column
+from .journal import record_changes
+from .models import Column, Comment, Task, Workspace, WorkspaceMember
+from .search import index_comments, index_task
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+@receiver(post_save, sender=Column)
+@receiver(post_delete, sender=Column)
+def task_or_column_changed(sender, instance, **kwargs):
+    bump_board_version(instance.project_id)
+
+
+def _deleted_directly(origin, model) -> bool:
+    """Whether a delete started at ``model`` (instance or queryset) rather
+    than cascading from a parent."""
+    return getattr(origin, "model", type(origin)) is model
+
+
+@receiver(pre_save, sender=Task)
+def remember_counter_state(sender, instance, **kwargs):
+    # Take the delta from the stored row, locked until the save commits, not
+    # from the state the task was loaded with: two saves of the same loaded
+    # task would otherwise both apply it.
+    if not instance._state.adding:
+        instance._counter_state = (
+            Task.objects.select_for_update()
+            .filter(pk=instance.pk)
+            .values_list(*Task.COUNTER_FIELDS)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Task)
+def count_task_saved(sender, instance, created, **kwargs):
+    old = None if created else getattr(instance, "_counter_state", None)
+    new = instance.counter_state()
+    if old != new:
+        adjust_counters([old], [new])
+    instance._counter_state = new
+
+
+@receiver(post_delete, sender=Task)
+def count_task_deleted(sender, instance, origin=None, **kwargs):
+    # Counters of a deleted column or board go away with it.
+    if _deleted_directly(origin, Task):
+        adjust_counters([getattr(instance, "_counter_state", instance.counter_state())], [])
+
+
+@receiver(pre_delete, sender=Column)
+def count_column_deleted(sender, instance, origin=None, **kwargs):
+    if _deleted_directly(origin, Column):
+        subtract_column(instance.pk)
+
+
+@receiver(post_save, sender=Task)
+def journal_task_saved(sender, instance, created, update_fields, **kwargs):
+    fields = set(update_fields or ())
+    if created:
+        op = "created"
+    elif instance.archived and (not fields or "archived" in fields):
+        op = "archived"
+    elif fields and fields <= {"column", "rank"}:
+        op = "moved"
+    else:
+        op = "updated"
+    record_changes(instance.project_id, "task", op, [instance.pk])
+
+
+@receiver(post_save, sender=Column)
+def journal_column_saved(sender, instance, created, **kwargs):
+    record_changes(instance.project_id, "column", "created" if created else "updated", [instance.pk])
+
+
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=Column)
+def journal_deleted(sender, instance, **kwargs):
+    kind = "task" if sender is Task else "column"
+    record_changes(instance.project_id, kind, "deleted", [instance.pk])
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    project_id = (
+        Task.objects.filter(pk=instance.task_id)
+        .values_list("project_id", flat=True)
+        .first()
+    )
+    bump_board_version(project_id)
+
+
+@receiver(post_save, sender=Task)
+def index_task_saved(sender, instance, created, update_fields, **kwargs):
+    # Moves and archiving don't touch the searchable text.
+    if update_fields and not {"title", "description"} & set(update_fields):
+        return
+    index_task(instance, created)
+
+
+@receiver(post_save, sender=Comment)
+def index_comment_saved(sender, instance, **kwargs):
+    index_comments(instance.task_id)
+
+
+@receiver(post_delete, sender=Comment)
+def index_comment_deleted(sender, instance, origin=None, **kwargs):
+    # Comments removed along with their task (or board) need no reindex.
+    if _deleted_directly(origin, Comment):
+        index_comments(instance.task_id)
+
+
+@receiver(m2m_changed, sender=Task.tags.through)
+@receiver(m2m_changed, sender=Task.assignees.through)
+def task_m2m_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        # Task.tags / Task.assignees side: ``instance`` is the task.
+        if action.startswith("post_"):
+            bump_m2m_version([instance.pk])
+            instance.m2m_version += 1
+            bump_board_version(instance.project_id)
+            record_changes(instance.project_id, "task", "updated", [instance.pk])
+        return
+
+    # Tag.task_set / User.assigned_tasks side: the tasks are in ``pk_set``,
+    # except for clear(), where they have to be looked up before removal.
+    if action == "pre_clear":
+        field = "tags" if sender is Task.tags.through else "assignees"
+        instance._board_clear_tasks = list(
+            Task.objects.filter(**{field: instance}).values_list("project_id", "pk")
+        )
+    elif action == "post_clear":
+        _m2m_touched(getattr(instance, "_board_clear_tasks", ()))
+    elif action in ("post_add", "post_remove") and pk_set:
+        _m2m_touched(Task.objects.filter(pk__in=pk_set).values_list("project_id", "pk"))
+
+
+def _m2m_touched(project_task_pairs):
+    by_project = {}
+    for project_id, task_id in project_task_pairs:
+        by_project.setdefault(project_id, []).append(task_id)
+    bump_m2m_version([pk for pks in by_project.values() for pk in pks])
+    bump_board_version(*by_project)
+    for project_id, task_ids in by_project.items():
+        record_changes(project_id, "task", "updated", task_ids)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_saved(sender, instance, created, update_fields, **kwargs):
+    # Cards show assignee usernames: rebuild the boards they appear on.
+    if created or (update_fields is not None and "username" not in update_fields):
+        return
+    assigned = {}
+    for task_id, project_id in Task.objects.filter(assignees=instance).values_list("pk", "project_id"):
+        assigned.setdefault(project_id, []).append(task_id)
+    bump_board_version(*assigned)
+    # Journal the cards too, so board.json ETags and incremental sync see it.
+    for project_id, task_ids in assigned.items():
+        record_changes(project_id, "task", "updated", task_ids)
+
+
+@receiver(post_save, sender=Workspace)
+@receiver(post_delete, sender=Workspace)
+@receiver(post_save, sender=WorkspaceMember)
+@receiver(post_delete, sender=WorkspaceMember)
+def workspace_access_changed(sender, instance, **kwargs):
+    bump_access_version(instance.pk if sender is Workspace else instance.workspace_id)
@@ -0,0 +1,209 @@
+"""
+Deterministic synthetic tenants for benchmarking (see the
+`generate_tenant` and `benchmark_views` commands).
+
+Everything is written with ``bulk_create``, so no signals fire; counters
+and search documents are rebuilt explicitly at the end. The same seed and
+sizes always produce the same users, boards, cards, tags, assignees,
+comments and activity; dates are offsets from the day of the run.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.db import transaction
+from django.utils.timezone import now
+
+from .counters import recount_counters
+from .models import ActivityLog, Column, Comment, Project, Tag, Task, Workspace, WorkspaceMember
+from .purge import teardown_workspace
+from .ranking import evenly_spaced
+
+BATCH_SIZE = 1000
+DEFAULT_COLUMNS = ["Backlog", "Todo", "In Progress", "Done"]
+VERBS = ["Fix", "Add", "Refactor", "Document", "Review", "Test", "Migrate", "Design", "Ship", "Investigate"]
+NOUNS = [
+    "login flow", "billing page", "search index", "export job", "onboarding email", "API client",
+    "dashboard", "settings form", "audit log", "mobile layout", "cache layer", "release notes",
+]
+WORDS = (
+    "customer report blocked waiting review staging deploy regression flaky timeout "
+    "design spec follow-up estimate priority sprint backlog metrics alert latency"
+).split()
+ACTIONS = ["task_created", "task_moved", "task_updated", "comment_created", "project_created", "login"]
+
+
+@dataclass
+class TenantSize:
+    users: int = 50
+    workspaces: int = 3
+    members: int = 10  # per workspace, besides the owner
+    projects: int = 4  # per workspace
+    columns: int = 4  # per project
+    tasks: int = 2000  # per project
+    tags: int = 12
+    comments: float = 1.0  # per task, on average
+    activity: int = 20000
+
+
+def tenant_users(prefix: str):
+    return get_user_model().objects.filter(username__startswith=f"{prefix}-user-")
+
+
+def tenant_workspaces(prefix: str):
+    return Workspace.objects.filter(owner__in=tenant_users(prefix))
+
+
+def delete_tenant(prefix: str) -> None:
+    """Remove a previously generated tenant (boards first, in chunks)."""
+    for workspace_id in tenant_workspaces(prefix).values_list("pk", flat=True):
+        teardown_workspace(workspace_id)
+    users = tenant_users(prefix)
+    ActivityLog.objects.filter(user__in=users).delete()
+    users.delete()
+    Tag.objects.filter(name__startswith=f"{prefix}-").delete()
+
+
+def _sentence(rng: random.Random, count: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(count)).capitalize() + "."
+
+
+def generate_tenant(prefix: str, size: TenantSize, seed: int = 1, log=None) -> dict:
+    """Create the tenant; returns the number of rows written per model."""
+    rng = random.Random(seed)
+    today = now().date()
+    counts = dict.fromkeys(["users", "workspaces", "members", "projects", "columns", "tasks", "comments", "activity"], 0)
+    log = log or (lambda message: None)
+
+    User = get_user_model()
+    password = make_password(prefix)  # hashed once; every user logs in with it
+    users = User.objects.bulk_create([
+        User(username=f"{prefix}-user-{i:04d}", email=f"{prefix}-user-{i:04d}@example.com", password=password)
+        for i in range(size.users)
+    ])
+    counts["users"] = len(users)
+
+    Tag.objects.bulk_create(
+        [Tag(name=f"{prefix}-{i:02d}") for i in range(size.tags)], ignore_conflicts=True
+    )
+    tag_ids = list(Tag.objects.filter(name__startswith=f"{prefix}-").order_by("name").values_list("pk", flat=True))
+
+    workspaces = Workspace.objects.bulk_create([
+        Workspace(name=f"{prefix.title()} workspace {i}", owner=users[i % len(users)])
+        for i in range(size.workspaces)
+    ])
+    counts["workspaces"] = len(workspaces)
+
+    project_ids = []
+    for ws in workspaces:
+        others = [u for u in users if u.pk != ws.owner_id]
+        members = rng.sample(others, min(size.members, len(others)))
+        WorkspaceMember.objects.bulk_create([WorkspaceMember(workspace=ws, user=u) for u in members])
+        counts["members"] += len(members)
+        people = [ws.owner_id] + [u.pk for u in members]
+
+        projects = Project.objects.bulk_create([
+            Project(workspace=ws, title=f"{rng.choice(NOUNS).title()} board {i}")
+            for i in range(size.projects)
+        ])
+        counts["projects"] += len(projects)
+        for project in projects:
+            project_ids.append(project.pk)
+            counts["tasks"] += _generate_board(rng, project, people, tag_ids, size, today, counts)
+            log(f"  {ws.name} / {project.title}: {size.tasks} tasks")
+
+    _generate_activity(rng, users, workspaces, project_ids, size.activity)
+    counts["activity"] = size.activity
+
+    recount_counters(project_ids)
+    for ws in workspaces:
+        call_command("rebuild_search_index", workspace=ws.pk, stdout=StringIO())
+    return counts
+
+
+def _generate_board(rng, project, people, tag_ids, size, today, counts) -> int:
+    names = DEFAULT_COLUMNS[: size.columns] + [
+        f"Column {i}" for i in range(len(DEFAULT_COLUMNS), size.columns)
+    ]
+    columns = Column.objects.bulk_create([
+        Column(project=project, name=name, order=i) for i, name in enumerate(names)
+    ])
+    counts["columns"] += len(columns)
+
+    per_column = {col.pk: 0 for col in columns}
+    placed = []
+    for _ in range(size.tasks):
+        col = rng.choice(columns)
+        per_column[col.pk] += 1
+        placed.append(col)
+    ranks = {pk: iter(evenly_spaced(n)) for pk, n in per_column.items()}
+
+    stamp = now()
+    with transaction.atomic():
+        tasks = []
+        for n, col in enumerate(placed):
+            archived = rng.random() < 0.05
+            due = None if rng.random() < 0.4 else today + timedelta(days=rng.randint(-30, 60))
+            tasks.append(Task(
+                project=project,
+                column=col,
+                title=f"{rng.choice(VERBS)} {rng.choice(NOUNS)} #{n}",
+                description=_sentence(rng, rng.randint(0, 30)),
+                priority=rng.choice(["low", "medium", "medium", "high"]),
+                due_date=due,
+                creator_id=rng.choice(people),
+                rank=next(ranks[col.pk]),
+                archived=archived,
+                archived_at=stamp if archived else None,
+            ))
+        tasks = Task.objects.bulk_create(tasks, batch_size=BATCH_SIZE)
+
+        Task.tags.through.objects.bulk_create(
+            [
+                Task.tags.through(task_id=t.pk, tag_id=tag_id)
+                for t in tasks
+                for tag_id in rng.sample(tag_ids, min(len(tag_ids), rng.choice([0, 0, 1, 1, 2, 3])))
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        Task.assignees.through.objects.bulk_create(
+            [
+                Task.assignees.through(task_id=t.pk, user_id=user_id)
+                for t in tasks
+                for user_id in rng.sample(people, min(len(people), rng.choice([0, 1, 1, 2])))
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        comments = []
+        for t in tasks:
+            # Geometric number of comments with mean ``size.comments``.
+            while size.comments and rng.random() < size.comments / (1 + size.comments):
+                comments.append(Comment(task_id=t.pk, author_id=rng.choice(people), body=_sentence(rng, rng.randint(3, 25))))
+        Comment.objects.bulk_create(comments, batch_size=BATCH_SIZE)
+        counts["comments"] += len(comments)
+    return len(tasks)
+
+
+def _generate_activity(rng, users, workspaces, project_ids, total: int) -> None:
+    stamp = now()
+    for start in range(0, total, BATCH_SIZE):
+        ActivityLog.objects.bulk_create([
+            ActivityLog(
+                user=rng.choice(users),
+                action=rng.choice(ACTIONS),
+                metadata={
+                    "workspace_id": rng.choice(workspaces).pk,
+                    "project_id": rng.choice(project_ids) if project_ids else None,
+                },
+                request_path="/",
+                created_at=stamp - timedelta(seconds=rng.randint(0, 30 * 86400)),
+            )
+            for _ in range(min(BATCH_SIZE, total - start))
+        ])
@@ -2,11 +2,20 @@
 
 from __future__ import annotations
 
+import atexit
+import logging
+import os
+import queue
+import threading
 from typing import Any, Optional
 
 from django.conf import settings
+from django.db import connection
 
 from .models import ActivityLog
+from .timing import timed
+
+logger = logging.getLogger(__name__)
 
 
 def _get_client_ip(request) -> Optional[str]:
@@ -18,14 +27,114 @@ def _get_client_ip(request) -> Optional[str]:
     return request.META.get("REMOTE_ADDR")
 
 
+class ActivityBuffer:
+    """
+    In-process queue of unsaved ``ActivityLog`` rows.
+
+    A daemon thread writes them with ``bulk_create`` once ``batch_size``
+    entries are waiting or every ``flush_interval`` seconds, whichever comes
+    first. ``put`` never blocks: when the queue is full it returns False and
+    the caller writes synchronously instead.
+    """
+
+    def __init__(self, max_size: int, batch_size: int, flush_interval: float):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=max_size)
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    def put(self, entry: ActivityLog) -> bool:
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            return False
+        if self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+        return True
+
+    def flush(self) -> int:
+        """Write everything currently queued; returns the number of rows."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = []
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if not batch:
+                    return written
+                try:
+                    ActivityLog.objects.bulk_create(batch)
+                    written += len(batch)
+                except Exception:
+                    logger.exception("Dropped %d buffered activity rows", len(batch))
+
+    def _ensure_thread(self) -> None:
+        # Threads do not survive fork(), so (re)start lazily per process.
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name="activity-buffer", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            finally:
+                connection.close()
+
+
+_buffer: Optional[ActivityBuffer] = None
+_buffer_lock = threading.Lock()
+
+
+def _get_buffer() -> ActivityBuffer:
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = ActivityBuffer(
+                    max_size=getattr(settings, "TELEMETRY_BUFFER_SIZE", 1000),
+                    batch_size=getattr(settings, "TELEMETRY_BATCH_SIZE", 100),
+                    flush_interval=getattr(settings, "TELEMETRY_FLUSH_INTERVAL", 2.0),
+                )
+    return _buffer
+
+
+def flush_activity_buffer() -> int:
+    """Write out buffered activity rows (called on worker shutdown)."""
+    if _buffer is None:
+        return 0
+    return _buffer.flush()
+
+
+atexit.register(flush_activity_buffer)
+
+
+@timed("telemetry")
 def log_activity(request, action: str, **metadata: Any) -> None:
     """Persist a user/action pair plus useful request metadata."""
     if not getattr(settings, "ENABLE_TELEMETRY", True):
         return
 
-    ActivityLog.objects.create(
-        user=(
-            request.user
+    entry = ActivityLog(
+        user_id=(
+            request.user.pk
             if getattr(request, "user", None) and request.user.is_authenticated
             else None
         ),
@@ -37,3 +146,9 @@ def log_activity(request, action: str, **metadata: Any) -> None:
             request.META.get("HTTP_USER_AGENT", "") if request else ""
         )[:255],
     )
+
+    if getattr(settings, "TELEMETRY_MODE", "sync") == "buffered":
+        if _get_buffer().put(entry):
+            return
+        # Buffer full: fall back to a synchronous write rather than drop it.
+    entry.save()
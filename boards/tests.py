@@ -1,3 +1,1013 @@
-from django.test import TestCase
+import asyncio
+import json
+import shutil
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import now
+
+from .archive import SegmentWriter, iter_archived_activity
+from .board import archived_page, column_page, get_board, iter_board, load_board, render_cards
+from .bulk import BulkOperationError, _int, apply_bulk_operation
+from .counters import COUNTERS, recount_counters
+from .dashboard import assigned_tasks_page, user_workspaces, workspace_projects
+from .email_utils import EmailConfigurationError, PermanentEmailError, send_brevo_email
+from .journal import TRIM_WATERMARK, changes_since
+from .management.commands.archive_activity import FIELDS as ARCHIVE_FIELDS
+from .management.commands.rollup_activity import WATERMARK as ROLLUP_WATERMARK
+from .management.commands.send_outbox_emails import Command as SendOutboxCommand
+from .models import (
+    ActivityDailyRollup,
+    ActivityHourlyRollup,
+    ActivityLog,
+    BoardChange,
+    Column,
+    Comment,
+    DigestDelivery,
+    OutboundEmail,
+    Project,
+    SearchDocument,
+    Tag,
+    Task,
+    Watermark,
+    Workspace,
+    WorkspaceMember,
+)
+from .permissions import user_can_access_workspace
+from .purge import purge_project_tasks, request_clear
+from .ranking import rank_between, ranks_between
+from .realtime import Broker, Hub, LocalBroker, event_stream, publish
+from .search import search_tasks
+from .telemetry import ActivityBuffer, log_activity
+from .views import stream_access
+
+
+User = get_user_model()
+
+# Full pages use {% static %}, whose manifest only exists after collectstatic.
+PLAIN_STATIC = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+
+class BoardTestCase(TestCase):
+    """A workspace with one member and a two-column board."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner", password="pw")
+        cls.member = User.objects.create_user("member", password="pw")
+        cls.ws = Workspace.objects.create(name="Team", owner=cls.owner)
+        WorkspaceMember.objects.create(workspace=cls.ws, user=cls.member)
+        cls.project = Project.objects.create(workspace=cls.ws, title="Board")
+        cls.todo = Column.objects.create(project=cls.project, name="Todo", order=0)
+        cls.done = Column.objects.create(project=cls.project, name="Done", order=1)
+
+    def setUp(self):
+        # Version stamps and cached boards are keyed by ids, which the
+        # test database hands out again.
+        cache.clear()
+        self.client.force_login(self.owner)
+
+    def make_task(self, title="Task", column=None, **fields):
+        column = column or self.todo
+        return Task.objects.create(
+            project_id=column.project_id, column=column, title=title, creator=self.owner, **fields
+        )
+
+    def counters(self, obj) -> dict:
+        obj.refresh_from_db()
+        return {field: getattr(obj, field) for field in COUNTERS}
+
+    def assertCountersExact(self, project):
+        """The running counters equal a full recount from the task table."""
+        objs = [project, *project.columns.all()]
+        running = [self.counters(obj) for obj in objs]
+        recount_counters([project.pk])
+        self.assertEqual(running, [self.counters(obj) for obj in objs])
+
+
+class BoardLoaderTests(BoardTestCase):
+    def board(self, **filters):
+        columns = load_board(Project.objects.get(pk=self.project.pk), filters, self.owner)
+        return {col.name: [t.title for t in col.filtered_tasks] for col in columns}
+
+    def test_tasks_are_grouped_by_column(self):
+        self.make_task("a", priority="high")
+        self.make_task("b", column=self.done)
+        self.make_task("c")
+        self.make_task("old", archived=True)
+        self.assertEqual(self.board(), {"Todo": ["a", "c"], "Done": ["b"]})
+        self.assertEqual(self.board(priority="high"), {"Todo": ["a"], "Done": []})
+
+    def test_queries_do_not_grow_with_the_board(self):
+        self.make_task()
+
+        def count():
+            project = Project.objects.get(pk=self.project.pk)
+            with CaptureQueriesContext(connection) as queries:
+                load_board(project, {}, self.owner)
+            return len(queries)
+
+        small = count()
+        tag = Tag.objects.create(name="t")
+        for i in range(3):
+            column = Column.objects.create(project=self.project, name=f"Extra {i}", order=2 + i)
+            for _ in range(2):
+                task = self.make_task(column=column)
+                task.tags.add(tag)
+                task.assignees.add(self.member)
+        self.assertEqual(count(), small)
+
+
+@override_settings(BOARD_CACHE_ENABLED=True)
+class BoardCacheTests(BoardTestCase):
+    def board(self, **filters):
+        return get_board(Project.objects.get(pk=self.project.pk), filters, self.owner)
+
+    def titles(self, **filters):
+        return [t.title for col in self.board(**filters) for t in col.filtered_tasks]
+
+    def test_cached_board_is_reused_until_the_board_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            task = self.make_task("first")
+        self.assertEqual(self.titles(), ["first"])
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.titles(), ["first"])
+        self.assertFalse([q for q in queries.captured_queries if "boards_task" in q["sql"]])
+        self.assertEqual(self.titles(priority="high"), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            task.title = "renamed"
+            task.save()
+        self.assertEqual(self.titles(), ["renamed"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            task.tags.add(Tag.objects.create(name="red"))
+        card = self.board()[0].filtered_tasks[0]
+        self.assertEqual([tag.name for tag in card.tags.all()], ["red"])
+
+
+@override_settings(WORKSPACE_ACCESS_CACHE_TIMEOUT=300)
+class AccessCacheTests(BoardTestCase):
+    def allowed(self, user, request=None):
+        request = request or RequestFactory().get("/")
+        request.user = user
+        return user_can_access_workspace(request, self.ws)
+
+    def test_answers_are_memoized_and_cached(self):
+        request = RequestFactory().get("/")
+        self.assertTrue(self.allowed(self.member, request))
+        with self.assertNumQueries(0):
+            self.assertTrue(self.allowed(self.member, request))
+            self.assertTrue(self.allowed(self.member))
+            self.assertTrue(self.allowed(self.owner))
+        self.assertFalse(self.allowed(User.objects.create_user("outsider")))
+
+    def test_membership_changes_invalidate_cached_answers(self):
+        self.assertTrue(self.allowed(self.member))
+        with self.captureOnCommitCallbacks(execute=True):
+            WorkspaceMember.objects.get(workspace=self.ws, user=self.member).delete()
+        self.assertFalse(self.allowed(self.member))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            WorkspaceMember.objects.create(workspace=self.ws, user=self.member)
+        self.assertTrue(self.allowed(self.member))
+
+
+class ActivityBufferTests(TestCase):
+    def setUp(self):
+        # Flush by hand instead of from the background thread.
+        patcher = mock.patch.object(ActivityBuffer, "_ensure_thread")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_flush_writes_queued_rows_in_batches(self):
+        buffer = ActivityBuffer(max_size=10, batch_size=2, flush_interval=60)
+        entries = [ActivityLog(action=f"action {i}") for i in range(5)]
+        for entry in entries:
+            self.assertTrue(buffer.put(entry))
+        self.assertFalse(ActivityLog.objects.exists())
+
+        with self.assertNumQueries(3):
+            self.assertEqual(buffer.flush(), 5)
+        self.assertEqual(buffer.flush(), 0)
+        self.assertEqual(
+            sorted(ActivityLog.objects.values_list("action", "created_at")),
+            sorted((entry.action, entry.created_at) for entry in entries),
+        )
+
+    @override_settings(ENABLE_TELEMETRY=True, TELEMETRY_MODE="buffered")
+    def test_full_buffer_falls_back_to_a_synchronous_write(self):
+        buffer = ActivityBuffer(max_size=1, batch_size=10, flush_interval=60)
+        with mock.patch("boards.telemetry._get_buffer", return_value=buffer):
+            log_activity(None, "buffered")
+            log_activity(None, "written")
+        self.assertEqual(list(ActivityLog.objects.values_list("action", flat=True)), ["written"])
+        buffer.flush()
+        self.assertEqual(ActivityLog.objects.count(), 2)
+
+
+class RollupTests(TestCase):
+    def test_runs_do_not_count_rows_twice(self):
+        old = now() - timedelta(hours=2)
+        ActivityLog.objects.bulk_create([
+            ActivityLog(action="task_created", metadata={"workspace_id": 1}, created_at=old) for _ in range(3)
+        ])
+        call_command("rollup_activity", "--retain-days", "0", "--batch-size", "2", stdout=StringIO())
+        call_command("rollup_activity", "--retain-days", "0", stdout=StringIO())
+        self.assertEqual(sum(ActivityHourlyRollup.objects.values_list("count", flat=True)), 3)
+        self.assertEqual(sum(ActivityDailyRollup.objects.values_list("count", flat=True)), 3)
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        old = now() - timedelta(days=40)
+        rows = ActivityLog.objects.bulk_create([
+            ActivityLog(action="login" if i % 2 else "task_created", created_at=old - timedelta(days=i // 3))
+            for i in range(6)
+        ])
+        self.ids = sorted(row.pk for row in rows)
+        Watermark.objects.create(name=ROLLUP_WATERMARK, value=self.ids[-1])
+
+    def archive(self):
+        call_command("archive_activity", "--dir", self.dir, "--segment-rows", "2", stdout=StringIO())
+
+    def archived_ids(self, **filters):
+        return sorted(event["id"] for event in iter_archived_activity(directory=self.dir, **filters))
+
+    def test_old_rolled_up_rows_move_to_segments(self):
+        recent = ActivityLog.objects.create(action="login")
+        self.archive()
+        self.assertEqual(list(ActivityLog.objects.all()), [recent])
+        self.assertEqual(self.archived_ids(), self.ids)
+        self.assertEqual(self.archived_ids(action="login"), self.ids[1::2])
+        # Two days of three rows, two rows per segment.
+        self.assertEqual(len(list(Path(self.dir).glob("*/*/*.index.json"))), 4)
+
+    def test_rerun_after_a_crash_does_not_archive_rows_twice(self):
+        # A run that published a segment but died before deleting its rows.
+        first = ActivityLog.objects.order_by("id")[0]
+        day = first.created_at.replace(hour=0, minute=0, second=0, microsecond=0)
+        writer = SegmentWriter(Path(self.dir), day, self.ids[0], self.ids[1])
+        for row in ActivityLog.objects.filter(id__in=self.ids[:2]).order_by("id").values(*ARCHIVE_FIELDS):
+            writer.write(row)
+        writer.close()
+
+        self.archive()
+        self.assertFalse(ActivityLog.objects.exists())
+        self.assertEqual(self.archived_ids(), self.ids)
+
+
+@override_settings(EMAIL_OUTBOX_ENABLED=True)
+class OutboxTests(TestCase):
+    def setUp(self):
+        # The worker recycles stale connections between polls; not the test's.
+        patcher = mock.patch("boards.management.commands.send_outbox_emails.close_old_connections")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def queue(self, count=1):
+        for i in range(count):
+            send_brevo_email(f"Hello {i}", "Body", f"user{i}@example.com")
+        return list(OutboundEmail.objects.order_by("id"))
+
+    def work(self, error=None, *args):
+        """Run the worker once; every delivery ends with ``error``."""
+        with mock.patch(
+            "boards.management.commands.send_outbox_emails.deliver_emails",
+            side_effect=lambda messages: [(message, error) for message in messages],
+        ) as deliver:
+            call_command("send_outbox_emails", *args, stdout=StringIO(), stderr=StringIO())
+        return deliver
+
+    def test_queued_mail_is_delivered_in_batches(self):
+        self.queue(3)
+        deliver = self.work(None, "--batch-size", "2")
+        self.assertEqual([len(call.args[0]) for call in deliver.call_args_list], [2, 1])
+        self.assertEqual(set(OutboundEmail.objects.values_list("status", flat=True)), {"sent"})
+
+    @override_settings(EMAIL_TIMEOUT=20)
+    def test_lease_outlasts_a_batch_of_timeouts(self):
+        self.queue(3)
+        started = now()
+        rows = SendOutboxCommand().claim(3)
+        self.assertEqual(len(rows), 3)
+        for row in OutboundEmail.objects.all():
+            self.assertEqual(row.status, "sending")
+            # Opening the connection plus three sends may each take 20s.
+            self.assertGreaterEqual(row.next_attempt_at - started, timedelta(seconds=4 * 20 + 60))
+
+    def test_failures_back_off_then_go_dead(self):
+        [row] = self.queue()
+        self.work(ConnectionError("down"))
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts), ("pending", 1))
+        self.assertTrue(20 < (row.next_attempt_at - now()).total_seconds() <= 36)
+
+        deliver = self.work(ConnectionError("down"))
+        deliver.assert_not_called()  # not due yet
+
+        OutboundEmail.objects.filter(pk=row.pk).update(next_attempt_at=now())
+        self.work(ConnectionError("down"), "--max-attempts", "2")
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts), ("dead", 2))
+
+    def test_permanent_errors_are_dead_at_once(self):
+        [row] = self.queue()
+        self.work(PermanentEmailError("bad address"))
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts), ("dead", 1))
+
+    def test_configuration_errors_are_retried(self):
+        [row] = self.queue()
+        self.work(EmailConfigurationError("bad key"), "--max-attempts", "1")
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts), ("pending", 1))
+
+
+class DigestTests(BoardTestCase):
+    def setUp(self):
+        super().setUp()
+        for user in (self.owner, self.member):
+            User.objects.filter(pk=user.pk).update(email=f"{user.username}@example.com")
+
+    def send(self, *args):
+        call_command("send_due_digests", *args, stdout=StringIO())
+        return {message.to[0]: message.body for message in mail.outbox}
+
+    def test_one_digest_per_user_with_due_tasks(self):
+        today = now().date()
+        for title, due, fields in [
+            ("Overdue report", today - timedelta(days=1), {}),
+            ("Soon review", today + timedelta(days=2), {}),
+            ("Later plan", today + timedelta(days=10), {}),
+            ("Archived chore", today, {"archived": True}),
+        ]:
+            self.make_task(title, due_date=due, **fields).assignees.add(self.member)
+        self.make_task("Owner task", due_date=today).assignees.add(self.owner)
+
+        digests = self.send()
+        self.assertEqual(set(digests), {"member@example.com", "owner@example.com"})
+        body = digests["member@example.com"]
+        self.assertIn("Overdue report", body)
+        self.assertIn("Soon review", body)
+        self.assertNotIn("Later plan", body)
+        self.assertNotIn("Archived chore", body)
+
+    def test_dry_run_sends_nothing(self):
+        self.make_task(due_date=now().date()).assignees.add(self.member)
+        self.assertEqual(self.send("--dry-run"), {})
+
+    def test_users_get_one_digest_a_day(self):
+        self.make_task("Due today", due_date=now().date()).assignees.add(self.member)
+        self.assertEqual(set(self.send()), {"member@example.com"})
+        mail.outbox.clear()
+        self.assertEqual(self.send(), {})
+
+        DigestDelivery.objects.update(sent_on=now().date() - timedelta(days=1))
+        self.assertEqual(set(self.send()), {"member@example.com"})
+
+    def test_tasks_of_workspaces_left_are_skipped(self):
+        self.make_task("Due today", due_date=now().date()).assignees.add(self.member)
+        WorkspaceMember.objects.filter(user=self.member).delete()
+        self.assertEqual(self.send(), {})
+
+
+class RankingTests(BoardTestCase):
+    def test_rank_between_sorts_strictly_between(self):
+        for lo, hi in [("", ""), ("", "i"), ("i", ""), ("a", "b"), ("a", "a1"), ("az", "b")]:
+            rank = rank_between(lo, hi)
+            if lo:
+                self.assertLess(lo, rank)
+            if hi:
+                self.assertLess(rank, hi)
+            self.assertFalse(rank.endswith("0"))
+
+    def test_rank_between_rejects_unordered_bounds(self):
+        with self.assertRaises(ValueError):
+            rank_between("b", "a")
+        with self.assertRaises(ValueError):
+            rank_between("a", "a")
+
+    def test_repeated_inserts_into_one_gap_stay_ordered(self):
+        lo, hi = "a", "b"
+        for _ in range(50):
+            hi = rank_between(lo, hi)
+            self.assertLess(lo, hi)
+
+    def test_ranks_between_are_increasing(self):
+        ranks = ranks_between("", "", 100)
+        self.assertEqual(len(ranks), 100)
+        self.assertEqual(ranks, sorted(set(ranks)))
+
+    def titles(self, column):
+        return list(column.tasks.order_by("rank").values_list("title", flat=True))
+
+    def test_drop_lands_between_neighbours(self):
+        a, b, c = (self.make_task(title) for title in "abc")
+        self.client.post(reverse("task_move", args=[c.pk, self.todo.pk]), {"before": a.pk})
+        self.client.post(reverse("task_move", args=[a.pk, self.done.pk]))
+        self.client.post(reverse("task_move", args=[b.pk, self.done.pk]), {"after": a.pk})
+        self.assertEqual(self.titles(self.todo), ["c"])
+        self.assertEqual(self.titles(self.done), ["a", "b"])
+
+
+class CounterTests(BoardTestCase):
+    def test_counters_follow_saves(self):
+        self.make_task(priority="high")
+        task = self.make_task(priority="low")
+        task.column = self.done
+        task.save()
+        self.assertEqual(self.counters(self.todo)["task_count"], 1)
+        self.assertEqual(self.counters(self.done)["low_count"], 1)
+        self.assertEqual(self.counters(self.project)["task_count"], 2)
+        self.assertCountersExact(self.project)
+
+    def test_saving_a_stale_copy_applies_no_delta_twice(self):
+        task = self.make_task(priority="low")
+        first, second = Task.objects.get(pk=task.pk), Task.objects.get(pk=task.pk)
+        for copy in (first, second):
+            copy.priority = "high"
+            copy.column = self.done
+            copy.save()
+        self.assertEqual(self.counters(self.done)["high_count"], 1)
+        self.assertEqual(self.counters(self.project)["task_count"], 1)
+        self.assertCountersExact(self.project)
+
+    def test_bulk_operations_keep_counters_exact(self):
+        tasks = [self.make_task(f"T{i}") for i in range(4)]
+        ids = [t.pk for t in tasks]
+        apply_bulk_operation(self.project, self.owner, ids[:2], "move", self.done.pk)
+        apply_bulk_operation(self.project, self.owner, ids, "priority", "high")
+        apply_bulk_operation(self.project, self.owner, ids[1:3], "archive")
+        self.assertCountersExact(self.project)
+        self.assertEqual(self.counters(self.project)["task_count"], 2)
+
+        apply_bulk_operation(self.project, self.owner, ids[1:3], "unarchive")
+        self.assertCountersExact(self.project)
+        self.assertEqual(self.counters(self.project)["high_count"], 4)
+
+    def test_move_view_keeps_counters_exact(self):
+        task = self.make_task()
+        response = self.client.post(reverse("task_move", args=[task.pk, self.done.pk]))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.counters(self.done)["task_count"], 1)
+        self.assertCountersExact(self.project)
+
+    def test_column_delete_subtracts_from_project(self):
+        self.make_task(column=self.done)
+        self.make_task(column=self.done)
+        self.make_task()
+        self.client.post(reverse("column_delete", args=[self.done.pk]))
+        self.assertEqual(self.counters(self.project)["task_count"], 1)
+        self.assertCountersExact(self.project)
+
+    def test_archive_browser_restores_tasks(self):
+        task = self.make_task(archived=True)
+        response = self.client.post(reverse("project_archive", args=[self.project.pk]), {"tasks": [task.pk]})
+        self.assertEqual(response.status_code, 302)
+        task.refresh_from_db()
+        self.assertFalse(task.archived)
+        self.assertEqual(self.counters(self.project)["task_count"], 1)
+        self.assertCountersExact(self.project)
+
+
+class BulkTests(BoardTestCase):
+    def test_int_accepts_only_integers(self):
+        self.assertEqual(_int(3, "id"), 3)
+        self.assertEqual(_int("42", "id"), 42)
+        for value in (True, 1.5, "1.5", "-1", "", None, "٣", [1]):
+            with self.assertRaises(BulkOperationError):
+                _int(value, "id")
+
+    def post(self, payload):
+        return self.client.post(
+            reverse("task_bulk", args=[self.project.pk]),
+            data=payload if isinstance(payload, str) else json.dumps(payload),
+            content_type="application/json",
+        )
+
+    def test_bad_requests_are_400(self):
+        task = self.make_task()
+        for payload in (
+            {"op": "explode", "tasks": [task.pk]},
+            {"op": "archive", "tasks": [True]},
+            {"op": "archive", "tasks": ["1.0"]},
+            {"op": "archive", "tasks": []},
+            {"op": "archive", "tasks": task.pk},
+            {"op": "priority", "tasks": [task.pk], "value": "urgent"},
+            {"op": "move", "tasks": [task.pk], "value": "x"},
+            "[1, 2]",
+            "{not json",
+        ):
+            response = self.post(payload)
+            self.assertEqual(response.status_code, 400, payload)
+            self.assertFalse(response.json()["ok"])
+        task.refresh_from_db()
+        self.assertEqual(task.priority, "medium")
+
+    def test_tasks_of_other_boards_are_skipped(self):
+        other = Project.objects.create(workspace=self.ws, title="Other")
+        foreign = self.make_task(column=Column.objects.create(project=other, name="X"))
+        task = self.make_task()
+        response = self.post({"op": "priority", "tasks": [task.pk, foreign.pk], "value": "low"})
+        self.assertEqual(response.json(), {"ok": True, "op": "priority", "updated": 1, "skipped": [foreign.pk]})
+        foreign.refresh_from_db()
+        self.assertEqual(foreign.priority, "medium")
+
+
+class BoardJsonTests(BoardTestCase):
+    def url(self, **params):
+        return reverse("project_board_json", args=[self.project.pk]) + (
+            "?" + "&".join(f"{k}={v}" for k, v in params.items()) if params else ""
+        )
+
+    def test_payload_has_card_fields_and_lookups(self):
+        task = self.make_task(description="long text")
+        tag = Tag.objects.create(name="red")
+        task.tags.add(tag)
+        task.assignees.add(self.member)
+        data = self.client.get(self.url()).json()
+        card = data["columns"][0]["tasks"][0]
+        self.assertEqual(set(card), {"id", "title", "description", "priority", "due_date", "tags", "assignees"})
+        self.assertEqual(data["tags"], {str(tag.pk): {"name": "red", "color": tag.color}})
+        self.assertEqual(data["users"], {str(self.member.pk): "member"})
+
+    def test_unchanged_board_is_304_without_loading_tasks(self):
+        self.make_task()
+        etag = self.client.get(self.url())["ETag"]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url(), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertFalse([q for q in queries.captured_queries if "boards_task" in q["sql"]])
+
+    def test_changes_and_filters_move_the_etag(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            task = self.make_task()
+        etag = self.client.get(self.url())["ETag"]
+        self.assertNotEqual(self.client.get(self.url(priority="high"))["ETag"], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            task.title = "Renamed"
+            task.save()
+        response = self.client.get(self.url(), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["columns"][0]["tasks"][0]["title"], "Renamed")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tag = Tag.objects.create(name="urgent")
+        etag = self.client.get(self.url())["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            tag.delete()
+        self.assertEqual(self.client.get(self.url(), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_comes_from_the_database(self):
+        self.make_task()
+        etag = self.client.get(self.url())["ETag"]
+        # Another worker with its own (empty) cache agrees on the ETag ...
+        cache.clear()
+        self.assertEqual(self.client.get(self.url(), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # ... and sees a change made elsewhere.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_task("other")
+        cache.clear()
+        self.assertEqual(self.client.get(self.url(), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_assignee_rename_moves_the_etag(self):
+        task = self.make_task()
+        with self.captureOnCommitCallbacks(execute=True):
+            task.assignees.add(self.member)
+        etag = self.client.get(self.url())["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.member.username = "renamed"
+            self.member.save()
+        response = self.client.get(self.url(), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["users"], {str(self.member.pk): "renamed"})
+
+    @override_settings(BOARD_COLUMN_PAGE_SIZE=2, BOARD_JSON_MAX_DEPTH=4)
+    def test_depth_keeps_loaded_pages(self):
+        for i in range(6):
+            self.make_task(f"t{i}")
+        first = self.client.get(self.url())
+        column = first.json()["columns"][0]
+        self.assertEqual((len(column["tasks"]), column["total"]), (2, 6))
+
+        # Three cards shown (a page and a half) come back as two whole pages.
+        deeper = self.client.get(self.url(depth=3))
+        column = deeper.json()["columns"][0]
+        self.assertEqual([t["title"] for t in column["tasks"]], ["t0", "t1", "t2", "t3"])
+        last = Task.objects.get(title="t3")
+        self.assertEqual(column["next"], f"{last.rank}:{last.pk}")
+        self.assertNotEqual(deeper["ETag"], first["ETag"])
+        # Capped at BOARD_JSON_MAX_DEPTH.
+        self.assertEqual(len(self.client.get(self.url(depth=100)).json()["columns"][0]["tasks"]), 4)
+
+
+class JournalTests(BoardTestCase):
+    def cursor(self):
+        return BoardChange.objects.order_by("-id").values_list("id", flat=True).first() or 0
+
+    def test_changes_come_back_in_their_current_state(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            kept, archived, deleted = (self.make_task(title) for title in ("kept", "archived", "deleted"))
+        cursor = self.cursor()
+        with self.captureOnCommitCallbacks(execute=True):
+            kept.title = "renamed"
+            kept.save()
+            archived.archived = True
+            archived.save()
+            deleted_pk = deleted.pk
+            deleted.delete()
+
+        changes = changes_since(self.project, cursor)
+        self.assertFalse(changes["resync"])
+        self.assertEqual([t["title"] for t in changes["tasks"]], ["renamed"])
+        self.assertEqual(changes["removed"]["tasks"], sorted([archived.pk, deleted_pk]))
+
+    def test_cursor_waits_for_the_settle_window(self):
+        cursor = self.cursor()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_task("fresh")
+        changes = changes_since(self.project, cursor)
+        self.assertEqual([t["title"] for t in changes["tasks"]], ["fresh"])
+        # Younger rows may still have uncommitted neighbours below them.
+        self.assertEqual(changes["cursor"], cursor)
+
+        BoardChange.objects.update(created_at=now() - timedelta(minutes=1))
+        self.assertEqual(changes_since(self.project, cursor)["cursor"], self.cursor())
+
+    @override_settings(BOARD_SYNC_MAX_CHANGES=1)
+    def test_long_or_trimmed_backlogs_ask_for_a_resync(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_task()
+        self.assertFalse(changes_since(self.project, 0)["resync"])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_task()
+        self.assertTrue(changes_since(self.project, 0)["resync"])
+
+        cursor = self.cursor()
+        Watermark.objects.create(name=TRIM_WATERMARK, value=cursor)
+        self.assertTrue(changes_since(self.project, cursor - 1)["resync"])
+        self.assertFalse(changes_since(self.project, cursor)["resync"])
+
+    def test_view_rejects_bad_cursors_with_a_resync(self):
+        url = reverse("project_changes", args=[self.project.pk])
+        self.assertTrue(self.client.get(url, {"since": "abc"}).json()["resync"])
+        self.assertFalse(self.client.get(url, {"since": "0"}).json()["resync"])
+
+
+class RealtimeTests(BoardTestCase):
+    def test_hub_fans_events_out_to_the_projects_streams(self):
+        hub = Hub(LocalBroker())
+
+        async def scenario():
+            streams = [hub.listen(project_id, heartbeat=0.05) for project_id in (1, 1, 2)]
+            waiting = [asyncio.ensure_future(stream.__anext__()) for stream in streams]
+            await asyncio.sleep(0.01)  # let every stream subscribe
+            hub.broker.publish(1, {"op": "moved"})
+            received = await asyncio.gather(*waiting)
+            for stream in streams:
+                await stream.aclose()
+            return received
+
+        self.assertEqual(asyncio.run(scenario()), [{"op": "moved"}, {"op": "moved"}, None])
+        self.assertFalse(hub._queues)
+
+    def test_stream_ends_once_access_is_gone(self):
+        allowed = True
+
+        async def still_allowed():
+            return allowed
+
+        async def scenario():
+            nonlocal allowed
+            stream = event_stream(7, still_allowed)
+            parts = [await stream.__anext__()]
+            waiting = asyncio.ensure_future(stream.__anext__())
+            await asyncio.sleep(0.01)
+            publish(7, {"op": "created"})
+            parts.append(await waiting)
+            allowed = False
+            parts += [part async for part in stream]
+            return parts
+
+        with mock.patch("boards.realtime._hub", Hub(LocalBroker())), override_settings(REALTIME_HEARTBEAT=0.05):
+            parts = asyncio.run(scenario())
+        self.assertEqual(parts[0], "retry: 5000\n\n")
+        self.assertEqual(parts[1], 'event: board\ndata: {"op": "created"}\n\n')
+        self.assertLessEqual(len(parts), 3)  # at most one ping before the check
+
+    def test_access_checks_close_their_connection(self):
+        request = RequestFactory().get("/")
+        request.user = self.member
+        with mock.patch("boards.views.connection") as conn:
+            self.assertEqual(stream_access(request, self.project.pk), self.project)
+            WorkspaceMember.objects.filter(user=self.member).delete()
+            self.assertNotIsInstance(stream_access(request, self.project.pk), Project)
+        self.assertEqual(conn.close.call_count, 2)
+
+    def test_brokers_implement_publish_and_start(self):
+        class PublishOnly(Broker):
+            def publish(self, project_id, event):
+                pass
+
+        with self.assertRaises(TypeError):
+            PublishOnly()
+
+
+class PagerTests(BoardTestCase):
+    def collect(self, fetch):
+        items, cursor = [], None
+        while True:
+            page, cursor = fetch(cursor)
+            items += page
+            if cursor is None:
+                return items
+
+    def test_search_pages_without_gaps(self):
+        expected = {self.make_task(f"alpha {i}").pk for i in range(5)}
+        self.make_task("beta")
+        other = Workspace.objects.create(name="Other", owner=self.owner)
+        board = Project.objects.create(workspace=other, title="Other")
+        self.make_task("alpha elsewhere", column=Column.objects.create(project=board, name="X"))
+
+        paged = self.collect(lambda after: search_tasks(self.ws.pk, "alpha", after=after, limit=2))
+        ids = [hit.task.pk for hit in paged]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(set(ids), expected)
+
+    def test_column_pages_follow_board_order(self):
+        tasks = [self.make_task(f"T{i}") for i in range(5)]
+        self.make_task("elsewhere", column=self.done)
+        paged = self.collect(lambda after: column_page(self.todo, {}, self.owner, after=after, limit=2))
+        self.assertEqual(paged, tasks)
+
+    @override_settings(BOARD_COLUMN_PAGE_SIZE=2)
+    def test_board_shows_a_first_page_and_loads_the_rest(self):
+        tasks = [self.make_task(f"T{i}") for i in range(3)]
+        col = load_board(Project.objects.get(pk=self.project.pk), {}, self.owner)[0]
+        self.assertEqual(col.filtered_tasks, tasks[:2])
+        self.assertEqual(col.filtered_count, 3)
+
+        response = self.client.get(reverse("column_tasks", args=[self.todo.pk]), {"after": col.next_cursor})
+        self.assertContains(response, "T2")
+        self.assertNotContains(response, "T1")
+        self.assertEqual(response["X-Next-Cursor"], "")
+
+    def test_archive_pages_newest_first(self):
+        stamp = now()
+        tasks = [self.make_task(f"T{i}", archived=True) for i in range(5)]
+        for i, task in enumerate(tasks):
+            # Two share a timestamp so the id breaks the tie.
+            Task.objects.filter(pk=task.pk).update(archived_at=stamp - timedelta(minutes=min(i, 3)))
+        self.make_task("active")
+        paged = self.collect(lambda after: archived_page(self.project, after=after, limit=2))
+        self.assertEqual([t.pk for t in paged], [t.pk for t in tasks[:3]] + [tasks[4].pk, tasks[3].pk])
+
+    def test_assigned_tasks_pages_in_order(self):
+        today = date.today()
+        tasks = []
+        for i, (due, priority) in enumerate([
+            (today, "low"), (today, "high"), (None, "high"), (today + timedelta(days=1), "medium"),
+            (today - timedelta(days=1), "low"), (None, "low"), (today, "high"),
+        ]):
+            task = self.make_task(f"T{i}", due_date=due, priority=priority)
+            task.assignees.add(self.member)
+            tasks.append(task)
+        hidden = self.make_task("archived", archived=True)
+        hidden.assignees.add(self.member)
+
+        full, cursor = assigned_tasks_page(self.member, limit=100)
+        self.assertIsNone(cursor)
+        paged = self.collect(lambda after: assigned_tasks_page(self.member, after=after, limit=2))
+        self.assertEqual([t.pk for t in paged], [t.pk for t in full])
+        self.assertEqual(len(paged), len(tasks))
+        prio = {"high": 0, "medium": 1, "low": 2}
+        self.assertEqual(
+            [t.pk for t in paged],
+            [t.pk for t in sorted(tasks, key=lambda t: (t.due_date is None, t.due_date or today, prio[t.priority], t.pk))],
+        )
+
+    def test_assigned_tasks_skip_boards_being_deleted(self):
+        self.make_task().assignees.add(self.member)
+        Project.objects.filter(pk=self.project.pk).update(delete_requested_at=now())
+        self.assertEqual(assigned_tasks_page(self.member), ([], None))
+
+
+class PurgeTests(BoardTestCase):
+    def fill(self, count=5):
+        tag = Tag.objects.create(name="t")
+        tasks = [self.make_task(f"T{i}", archived=i == 0) for i in range(count)]
+        for task in tasks:
+            task.tags.add(tag)
+            task.assignees.add(self.member)
+            Comment.objects.create(task=task, author=self.owner, body="hi")
+        return tasks
+
+    def test_purge_deletes_everything_and_journals_once(self):
+        self.fill()
+        cursor = BoardChange.objects.order_by("-id").values_list("id", flat=True).first() or 0
+        with self.captureOnCommitCallbacks(execute=True):
+            deleted = purge_project_tasks(self.project, chunk_size=2)
+        self.assertEqual(deleted, 5)
+        self.assertFalse(Task.objects.filter(project=self.project).exists())
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(Task.tags.through.objects.exists())
+        self.assertFalse(Task.assignees.through.objects.exists())
+        self.assertFalse(SearchDocument.objects.exists())
+        self.assertEqual(self.counters(self.project)["task_count"], 0)
+        self.assertEqual(
+            list(BoardChange.objects.filter(id__gt=cursor).values_list("kind", "op")), [("board", "cleared")]
+        )
+        self.assertTrue(changes_since(self.project, cursor)["resync"])
+
+    def test_large_boards_are_cleared_in_the_background(self):
+        self.fill()
+        with mock.patch("boards.purge.CHUNK_SIZE", 2):
+            response = self.client.post(reverse("project_clear", args=[self.project.pk]))
+        self.assertEqual(response.status_code, 302)
+        self.project.refresh_from_db()
+        self.assertIsNotNone(self.project.clear_requested_at)
+        self.assertEqual(Task.objects.filter(project=self.project).count(), 5)
+
+        later = self.make_task("added after the clear")
+        Task.objects.filter(pk=later.pk).update(created_at=self.project.clear_requested_at + timedelta(seconds=1))
+        call_command("process_deletions", stdout=StringIO())
+        self.project.refresh_from_db()
+        self.assertIsNone(self.project.clear_requested_at)
+        self.assertEqual(list(Task.objects.filter(project=self.project)), [later])
+        self.assertCountersExact(self.project)
+
+    def test_small_boards_are_cleared_in_the_request(self):
+        self.fill(2)
+        self.assertFalse(request_clear(self.project))
+        self.assertFalse(Task.objects.filter(project=self.project).exists())
+
+    def test_deleted_project_is_hidden_then_torn_down(self):
+        self.fill()
+        BoardChange.objects.create(project_id=self.project.pk, kind="task", object_id=1, op="updated")
+        self.client.post(reverse("project_delete", args=[self.project.pk]))
+        self.assertEqual(self.client.get(reverse("project_detail", args=[self.project.pk])).status_code, 404)
+        self.assertTrue(Task.objects.filter(project=self.project).exists())
+
+        call_command("process_deletions", stdout=StringIO())
+        self.assertFalse(Project.objects.filter(pk=self.project.pk).exists())
+        self.assertFalse(Column.objects.filter(project_id=self.project.pk).exists())
+        self.assertFalse(Task.objects.exists())
+        self.assertFalse(BoardChange.objects.filter(project_id=self.project.pk).exists())
+
+    def test_deleted_workspace_is_torn_down(self):
+        self.fill()
+        self.client.post(reverse("workspace_delete", args=[self.ws.pk]))
+        self.assertEqual(self.client.get(reverse("workspace_detail", args=[self.ws.pk])).status_code, 404)
+
+        call_command("process_deletions", stdout=StringIO())
+        self.assertFalse(Workspace.objects.filter(pk=self.ws.pk).exists())
+        self.assertFalse(Project.objects.exists())
+        self.assertFalse(WorkspaceMember.objects.exists())
+
+
+class DashboardTests(BoardTestCase):
+    def test_stats_come_from_one_query_per_page(self):
+        overdue = now().date() - timedelta(days=1)
+        self.make_task("late", due_date=overdue).assignees.add(self.member)
+        self.make_task("finished", column=self.done)
+        self.make_task("archived", due_date=overdue, archived=True).assignees.add(self.member)
+        Workspace.objects.create(name="Own", owner=self.member)
+
+        with self.assertNumQueries(1):
+            rows = list(user_workspaces(self.member))
+        self.assertEqual(
+            [(ws.name, ws.project_count, ws.open_count, ws.overdue_count, ws.assigned_count) for ws in rows],
+            [("Own", 0, 0, 0, 0), ("Team", 1, 2, 1, 1)],
+        )
+
+        with self.assertNumQueries(1):
+            [board] = workspace_projects(self.ws, self.member)
+        self.assertEqual(
+            (board.task_count, board.done_count, board.overdue_count, board.assigned_count), (2, 1, 1, 1)
+        )
+
+
+class CardCacheTests(BoardTestCase):
+    def card(self):
+        columns = load_board(Project.objects.get(pk=self.project.pk), {}, self.owner)
+        tasks = [t for col in columns for t in col.filtered_tasks]
+        render_cards(tasks)
+        return tasks[0].card_html
+
+    def test_cards_follow_renamed_users_and_tags(self):
+        task = self.make_task()
+        tag = Tag.objects.create(name="red")
+        task.assignees.add(self.member)
+        task.tags.add(tag)
+        self.assertIn("@member", self.card())
+        self.assertIn("#red", self.card())
+
+        self.member.username = "renamed"
+        self.member.save()
+        tag.name = "blue"
+        tag.save()
+        self.assertIn("@renamed", self.card())
+        self.assertIn("#blue", self.card())
+
+
+@override_settings(STORAGES=PLAIN_STATIC)
+class StreamingTests(BoardTestCase):
+    def test_board_streams_column_by_column(self):
+        self.make_task("first card")
+        self.make_task("second card", column=self.done)
+        url = reverse("project_detail", args=[self.project.pk])
+        buffered = self.client.get(url, {"stream": "0"})
+        streamed = self.client.get(url, {"stream": "1"})
+        self.assertFalse(buffered.streaming)
+        self.assertTrue(streamed.streaming)
+
+        body = b"".join(streamed.streaming_content).decode()
+        self.assertLess(body.index("first card"), body.index("second card"))
+        self.assertIn("</html>", body)
+        self.assertNotIn("<!-- board columns -->", body)
+        self.assertContains(buffered, "second card")
+
+    def test_columns_are_filled_from_chunked_reads(self):
+        for title in ("a", "b"):
+            self.make_task(title)
+        self.make_task("c", column=self.done)
+        columns = list(self.project.columns.order_by("order", "pk"))
+        filled = [
+            (col.name, [t.title for t in col.filtered_tasks])
+            for col in iter_board(self.project, {}, self.owner, columns, chunk_size=1)
+        ]
+        self.assertEqual(filled, [("Todo", ["a", "b"]), ("Done", ["c"])])
+
+
+@override_settings(STORAGES=PLAIN_STATIC)
+class BenchmarkTests(TestCase):
+    SIZE = [
+        "--users", "3", "--workspaces", "1", "--members", "2", "--projects", "2",
+        "--columns", "2", "--tasks", "20", "--tags", "3", "--comments", "0.5", "--activity", "10",
+    ]
+
+    def test_generated_tenant_can_be_benchmarked(self):
+        call_command("generate_tenant", "--prefix", "t", *self.SIZE, stdout=StringIO())
+        self.assertEqual(Task.objects.count(), 40)
+        with self.assertRaises(CommandError):
+            call_command("generate_tenant", "--prefix", "t", *self.SIZE, stdout=StringIO())
+
+        out = StringIO()
+        call_command("benchmark_views", "--prefix", "t", "--repeat", "2", "--warmup", "0", stdout=out, stderr=StringIO())
+        report = json.loads(out.getvalue())
+        self.assertEqual(report["meta"]["repeat"], 2)
+        self.assertEqual(report["results"]["project_detail"]["samples"], 2)
+        self.assertFalse(report["results"]["project_clear_tasks"]["deferred"])
+        for name, result in report["results"].items():
+            self.assertLess(result["status"], 400, name)
+            self.assertGreater(result["queries"], 0, name)
+        with self.assertRaises(CommandError):
+            call_command("benchmark_views", "--prefix", "t", "--repeat", "0", stdout=StringIO())
+
+    def test_deferred_clear_times_the_purge(self):
+        call_command("generate_tenant", "--prefix", "t", *self.SIZE, stdout=StringIO())
+        out = StringIO()
+        with mock.patch("boards.purge.CHUNK_SIZE", 5):
+            call_command("benchmark_views", "--prefix", "t", "--repeat", "1", "--warmup", "0", stdout=out, stderr=StringIO())
+        result = json.loads(out.getvalue())["results"]["project_clear_tasks"]
+        self.assertTrue(result["deferred"])
+        self.assertIn("purge_ms", result)
+        cleared = Project.objects.get(clear_requested_at=None, task_count=0)
+        self.assertFalse(Task.objects.filter(project=cleared).exists())
+
+
+@override_settings(STORAGES=PLAIN_STATIC)
+class ServerTimingTests(BoardTestCase):
+    def test_header_reports_queries_and_templates(self):
+        self.make_task()
+        for stream in ("0", "1"):
+            response = self.client.get(reverse("project_detail", args=[self.project.pk]), {"stream": stream})
+            header = response["Server-Timing"]
+            self.assertRegex(header, r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="[1-9]\d* queries"')
+            self.assertIn("tpl;dur=", header)
+
+    @override_settings(SERVER_TIMING_LOG=True)
+    def test_log_line_names_the_view(self):
+        with self.assertLogs("boards.timing", "INFO") as logs:
+            self.client.get(reverse("workspace_list"))
+        self.assertIn("view=workspace_list method=GET status=200", logs.output[0])
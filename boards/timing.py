@@ -0,0 +1,168 @@
+"""
+Per-request timings exposed as a ``Server-Timing`` header.
+
+``ServerTimingMiddleware`` opens a timing scope per request (sync or async).
+SQL is measured by an execute wrapper installed on every connection as it
+is opened, so queries count whichever thread runs them; templates (through the
+``TimedDjangoTemplates`` backend), ``log_activity`` and email sending through
+``timed``. Outside a request scope ``timed`` costs one context-variable
+lookup, so the instrumentation can stay on in production.
+
+Metrics overlap: queries run while rendering or logging count towards both
+``db`` and ``tpl``/``telemetry``. For streamed responses the numbers cover
+the work done before the first byte.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from contextlib import ContextDecorator
+from contextvars import ContextVar
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.backends.django import DjangoTemplates, Template
+
+logger = logging.getLogger(__name__)
+
+METRICS = ("db", "tpl", "telemetry", "email")
+
+_scope: ContextVar[Optional[dict]] = ContextVar("server_timing", default=None)
+
+
+class timed(ContextDecorator):
+    """Add the time spent inside to metric ``name`` of the current request.
+    Nested sections of the same metric are only counted once."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def _recreate_cm(self):
+        # A fresh instance per decorated call: calls may overlap (threads).
+        return type(self)(self.name)
+
+    def __enter__(self):
+        scope = _scope.get()
+        self._scope = scope if scope is not None and self.name not in scope["active"] else None
+        if self._scope is not None:
+            self._scope["active"].add(self.name)
+            self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self._scope is not None:
+            self._scope[self.name] += time.perf_counter() - self._started
+            self._scope["active"].discard(self.name)
+        return False
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        with timed("tpl"):
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, with render time counted as ``tpl``."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+def _count_query(execute, sql, params, many, context):
+    scope = _scope.get()
+    if scope is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        scope["db"] += time.perf_counter() - started
+        scope["queries"] += 1
+
+
+def _install_query_timer(sender=None, connection=None, **kwargs):
+    # Wrappers survive reconnects of the same connection object.
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_query)
+
+
+def _header(scope: dict, total: float) -> str:
+    parts = [f"app;dur={total * 1000:.1f}", f'db;dur={scope["db"] * 1000:.1f};desc="{scope["queries"]} queries"']
+    parts += [f"{name};dur={scope[name] * 1000:.1f}" for name in METRICS[1:] if scope[name]]
+    return ", ".join(parts)
+
+
+class ServerTimingMiddleware:
+    """
+    Adds ``Server-Timing: app, db (with the query count), tpl, telemetry,
+    email`` to every response; with ``SERVER_TIMING_LOG`` also logs one
+    line per request tagged with the resolved URL name.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "SERVER_TIMING", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.log = getattr(settings, "SERVER_TIMING_LOG", False)
+        # Under ASGI, sync views run on executor threads whose connections
+        # this middleware never sees, so time queries on every connection.
+        connection_created.connect(_install_query_timer, dispatch_uid="boards.timing")
+        for connection in connections.all(initialized_only=True):
+            _install_query_timer(connection=connection)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        scope, token = self._start()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _scope.reset(token)
+        return self._finish(request, response, scope, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        scope, token = self._start()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _scope.reset(token)
+        return self._finish(request, response, scope, time.perf_counter() - started)
+
+    def _start(self):
+        scope = {"queries": 0, "active": set(), **dict.fromkeys(METRICS, 0.0)}
+        return scope, _scope.set(scope)
+
+    def _finish(self, request, response, scope: dict, total: float):
+        response["Server-Timing"] = _header(scope, total)
+        if self.log:
+            match = getattr(request, "resolver_match", None)
+            view = (match.view_name if match else None) or "-"
+            fields = {
+                "view": view,
+                "method": request.method,
+                "status": response.status_code,
+                "total_ms": round(total * 1000, 1),
+                "queries": scope["queries"],
+                **{f"{name}_ms": round(scope[name] * 1000, 1) for name in METRICS},
+            }
+            logger.info(
+                " ".join(f"{key}={value}" for key, value in fields.items()),
+                extra={"timing": fields},
+            )
+        return response
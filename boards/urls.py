@@ -13,11 +13,17 @@ urlpatterns = [
     # Workspaces
     path("", views.workspace_list, name="workspace_list"),
     path("workspaces/new/", views.workspace_create, name="workspace_create"),
+    path("my/tasks/", views.my_tasks, name="my_tasks"),
     path(
         "workspaces/<int:pk>/",
         views.workspace_detail,
         name="workspace_detail",
     ),
+    path(
+        "workspaces/<int:pk>/search/",
+        views.workspace_search,
+        name="workspace_search",
+    ),
     path(
         "workspaces/<int:pk>/delete/",
         views.workspace_delete,
@@ -30,6 +36,26 @@ urlpatterns = [
         name="project_create",
     ),
     path("projects/<int:pk>/", views.project_detail, name="project_detail"),
+    path(
+        "projects/<int:pk>/board.json",
+        views.project_board_json,
+        name="project_board_json",
+    ),
+    path(
+        "projects/<int:pk>/events/",
+        views.project_events,
+        name="project_events",
+    ),
+    path(
+        "projects/<int:pk>/changes/",
+        views.project_changes,
+        name="project_changes",
+    ),
+    path(
+        "projects/<int:pk>/archive/",
+        views.project_archive,
+        name="project_archive",
+    ),
     path(
         "projects/<int:pk>/delete/",
         views.project_delete,
@@ -41,6 +67,11 @@ urlpatterns = [
         views.column_create,
         name="column_create",
     ),
+    path(
+        "columns/<int:pk>/tasks/",
+        views.column_tasks,
+        name="column_tasks",
+    ),
     path(
         "columns/<int:pk>/rename/",
         views.column_rename,
@@ -57,6 +88,11 @@ urlpatterns = [
         views.task_create,
         name="task_create",
     ),
+    path(
+        "projects/<int:pk>/tasks/bulk/",
+        views.task_bulk,
+        name="task_bulk",
+    ),
     path("tasks/<int:pk>/edit/", views.task_edit, name="task_edit"),
     path("tasks/<int:pk>/archive/", views.task_archive, name="task_archive"),
     path(
@@ -1,4 +1,6 @@
+import json
 import logging
+from asgiref.sync import sync_to_async
 from .email_utils import send_brevo_email
 from django.conf import settings
 from django.contrib import messages
@@ -6,20 +8,38 @@ from django.contrib.auth import get_user_model, login
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.tokens import default_token_generator
 from django.contrib.auth.views import LoginView
+from django.core.handlers.asgi import ASGIRequest
 from django.core.mail import send_mail
+from django.db import connection
 from django.http import (
     HttpResponse,
     HttpResponseForbidden,
     HttpResponseNotAllowed,
     JsonResponse,
+    StreamingHttpResponse,
 )
 from django.shortcuts import get_object_or_404, redirect, render
-from django.template.loader import render_to_string
+from django.template.loader import get_template, render_to_string
 from django.urls import reverse
 from django.utils.encoding import force_bytes, force_str
-from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+from django.utils.http import parse_etags, urlsafe_base64_decode, urlsafe_base64_encode
+from django.utils.safestring import mark_safe
 from django.utils.timezone import now
 
+from .board import (
+    archived_page,
+    board_depth,
+    board_payload,
+    column_page,
+    get_board,
+    iter_board,
+    parse_board_filters,
+    render_cards,
+    task_payload,
+)
+from .dashboard import assigned_tasks_page, user_workspaces, workspace_projects
+from .bulk import BulkOperationError, apply_bulk_operation
+from .journal import board_etag, changes_since, latest_cursor
 from .forms import (
     WorkspaceForm,
     ProjectForm,
@@ -31,11 +51,18 @@ from .forms import (
     CustomAuthenticationForm,
 )
 from .models import Workspace, Project, Column, Task, WorkspaceMember
+from .purge import request_clear
 from .permissions import (
+    LIVE_PROJECTS,
+    LIVE_WORKSPACES,
     user_in_workspace_or_403,
     user_can_see_project_or_403,
+    user_can_see_task_or_403,
     user_is_workspace_owner,
 )
+from .ranking import needs_rebalance, rank_at_end, rank_for_drop, rebalance_column
+from .realtime import event_stream
+from .search import search_tasks
 from .telemetry import log_activity
 import logging
 from django.conf import settings
@@ -157,18 +184,24 @@ class WorkspaceLoginView(LoginView):
 
 @login_required
 def workspace_list(request):
-    qs_owned = Workspace.objects.filter(owner=request.user).order_by("name")
-    qs_member = (
-        Workspace.objects
-        .filter(memberships__user=request.user)
-        .exclude(owner=request.user)
-        .distinct()
-        .order_by("name")
-    )
-    context = {"owned": qs_owned, "member": qs_member}
+    workspaces = list(user_workspaces(request.user))
+    context = {
+        "owned": [ws for ws in workspaces if ws.owner_id == request.user.id],
+        "member": [ws for ws in workspaces if ws.owner_id != request.user.id],
+    }
     return render(request, "boards/workspace_list.html", context)
 
 
+@login_required
+def my_tasks(request):
+    tasks, next_cursor = assigned_tasks_page(request.user, after=request.GET.get("after"))
+    return render(
+        request,
+        "boards/my_tasks.html",
+        {"tasks": tasks, "next_cursor": next_cursor, "today": now().date()},
+    )
+
+
 @login_required
 def workspace_create(request):
     if request.method == "POST":
@@ -195,7 +228,7 @@ def workspace_detail(request, pk):
     if not isinstance(ws, Workspace):
         return ws  # 403
 
-    projects = ws.projects.order_by("-created_at")
+    projects = list(workspace_projects(ws, request.user))
     members = ws.memberships.select_related("user").order_by(
         "role", "user__username"
     )
@@ -206,19 +239,51 @@ def workspace_detail(request, pk):
         {
             "ws": ws,
             "projects": projects,
+            "totals": {
+                "open": sum(p.task_count for p in projects),
+                "overdue": sum(p.overdue_count for p in projects),
+                "assigned": sum(p.assigned_count for p in projects),
+            },
             "members": members,
             "invite_form": invite_form,
         },
     )
 
 
+@login_required
+def workspace_search(request, pk):
+    ws = user_in_workspace_or_403(request, pk)
+    if not isinstance(ws, Workspace):
+        return ws
+
+    query = request.GET.get("q", "").strip()
+    include_archived = request.GET.get("archived") == "1"
+    hits, next_cursor = search_tasks(
+        ws.pk, query, after=request.GET.get("after"), include_archived=include_archived
+    )
+    return render(
+        request,
+        "boards/search.html",
+        {
+            "ws": ws,
+            "query": query,
+            "include_archived": include_archived,
+            "hits": hits,
+            "next_cursor": next_cursor,
+        },
+    )
+
+
 @login_required
 def workspace_delete(request, pk):
-    ws = get_object_or_404(Workspace, pk=pk)
+    ws = get_object_or_404(LIVE_WORKSPACES, pk=pk)
     if not user_is_workspace_owner(request, ws):
         return HttpResponseForbidden("Only owner can delete workspace.")
     if request.method == "POST":
-        ws.delete()
+        # The subtree is removed in the background by `process_deletions`.
+        ws.delete_requested_at = now()
+        ws.save(update_fields=["delete_requested_at"])
+        log_activity(request, "workspace_deleted", workspace_id=ws.pk)
         messages.info(request, "Workspace deleted.")
         return redirect("workspace_list")
     return render(
@@ -329,52 +394,183 @@ def project_detail(request, pk):
     if not isinstance(project, Project):
         return project
 
-    # Filters
-    assignee = request.GET.get("assignee")  # "me" or user id
-    tag_id = request.GET.get("tag")
-    priority = request.GET.get("priority")
-    overdue = request.GET.get("overdue")  # "1" => overdue only
-
-    task_filters = {"archived": False, "project": project}
-    if assignee == "me":
-        task_filters["assignees__id"] = request.user.id
-    elif assignee and assignee.isdigit():
-        task_filters["assignees__id"] = int(assignee)
-    if tag_id and tag_id.isdigit():
-        task_filters["tags__id"] = int(tag_id)
-    if priority in {"low", "medium", "high"}:
-        task_filters["priority"] = priority
-
+    filters = parse_board_filters(request)
     today = now().date()
-
-    columns = list(project.columns.all().order_by("order"))
-    for col in columns:
-        qs = Task.objects.filter(column=col, **task_filters)
-        if overdue == "1":
-            qs = qs.filter(due_date__lt=today)
-        col.filtered_tasks = qs.select_related("project", "column").prefetch_related("tags", "assignees")
+    stream = request.GET.get("stream", "1" if getattr(settings, "BOARD_STREAMING", False) else "0") == "1"
 
     from .models import Tag
     members = project.workspace.memberships.select_related("user").values_list("user_id", "user__username")
     tags = Tag.objects.all()
-
-    return render(request, "boards/project_detail.html", {
+    context = {
         "project": project,
-        "columns": columns,
-        "filters": {"assignee": assignee, "tag": tag_id, "priority": priority, "overdue": overdue},
+        "filters": filters,
         "members": members,
         "tags": tags,
         "today": today,
+    }
+
+    if stream:
+        columns = list(project.columns.order_by("order", "pk"))
+        if columns:
+            return _stream_board(request, {**context, "columns": columns})
+    else:
+        columns = get_board(project, filters, request.user)
+        render_cards([t for col in columns for t in col.filtered_tasks])
+    return render(request, "boards/project_detail.html", {**context, "columns": columns})
+
+
+BOARD_STREAM_MARKER = "<!-- board columns -->"
+
+
+def _stream_board(request, context):
+    """
+    ``project_detail`` as a stream: the page around the columns goes out
+    first, then each column as soon as its cards are read and rendered.
+    """
+    page = render_to_string(
+        "boards/project_detail.html",
+        {**context, "stream_marker": mark_safe(BOARD_STREAM_MARKER)},
+        request=request,
+    )
+    head, tail = page.split(BOARD_STREAM_MARKER, 1)
+    column_template = get_template("boards/partials/board_column.html")
+    project = context["project"]
+
+    def parts():
+        yield head
+        for col in iter_board(project, context["filters"], request.user, context["columns"]):
+            render_cards(col.filtered_tasks)
+            html = column_template.render({"col": col, "project": project}, request)
+            col.filtered_tasks = ()  # sent; don't keep every card alive
+            yield html
+        yield tail
+
+    # ASGI servers need an async iterator or Django buffers the whole body.
+    content = _async_parts(parts()) if isinstance(request, ASGIRequest) else parts()
+    return StreamingHttpResponse(content, content_type="text/html; charset=utf-8")
+
+
+async def _async_parts(parts):
+    done = object()
+    # Thread-sensitive, so every step runs on the request's DB connection.
+    step = sync_to_async(next)
+    while (part := await step(parts, done)) is not done:
+        yield part
+
+@login_required
+def project_board_json(request, pk):
+    """
+    Board as compact JSON, with a strong ETag for conditional GETs.
+
+    ``?depth=`` asks for more than the first page of each column, so a
+    refresh keeps the cards a client already loaded with "Load more".
+    """
+    project = user_can_see_project_or_403(request, pk)
+    if not isinstance(project, Project):
+        return project
+
+    filters = parse_board_filters(request)
+    depth = board_depth(request.GET.get("depth"))
+    etag = board_etag(project, filters, request.user, depth)
+    if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+    if etag in if_none_match or "*" in if_none_match:
+        response = HttpResponse(status=304)
+    else:
+        # Read the cursor first: a change landing in between is replayed, not lost.
+        cursor = latest_cursor()
+        columns = get_board(project, filters, request.user, page_size=depth)
+        response = JsonResponse({**board_payload(project, columns), "cursor": cursor})
+    response["ETag"] = etag
+    # The payload is per-user (filters, access): cache privately, revalidate always.
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def stream_access(request, pk):
+    """
+    ``user_can_see_project_or_403`` for an open event stream, re-run every
+    heartbeat. It runs on a sync_to_async thread that no request cycle
+    cleans up, so the connection it opens is closed right away instead of
+    being held for the life of the stream.
+    """
+    # Drop the per-request memo so removed members are noticed.
+    request.__dict__.pop("_workspace_access", None)
+    try:
+        return user_can_see_project_or_403(request, pk)
+    finally:
+        connection.close()
+
+
+@login_required
+async def project_events(request, pk):
+    """Server-sent events for a board (needs the ASGI app, see Procfile)."""
+    if not isinstance(request, ASGIRequest):
+        # Under WSGI the stream would pin a worker; 204 tells EventSource to stop.
+        return HttpResponse(status=204)
+    project = await sync_to_async(stream_access)(request, pk)
+    if not isinstance(project, Project):
+        return project
+
+    async def still_allowed():
+        return isinstance(await sync_to_async(stream_access)(request, pk), Project)
+
+    response = StreamingHttpResponse(
+        event_stream(project.pk, still_allowed), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+@login_required
+def project_changes(request, pk):
+    """Tasks/columns changed since ``?since=<cursor>`` (see boards.journal)."""
+    project = user_can_see_project_or_403(request, pk)
+    if not isinstance(project, Project):
+        return project
+
+    since = request.GET.get("since", "")
+    if not since.isdigit():
+        return JsonResponse({"resync": True, "cursor": latest_cursor()})
+    response = JsonResponse(changes_since(project, int(since)))
+    response["Cache-Control"] = "private, no-store"
+    return response
+
+@login_required
+def project_archive(request, pk):
+    """Browse a board's archived tasks and restore them in bulk."""
+    project = user_can_see_project_or_403(request, pk)
+    if not isinstance(project, Project):
+        return project
+
+    if request.method == "POST":
+        try:
+            result = apply_bulk_operation(
+                project, request.user, request.POST.getlist("tasks"), "unarchive"
+            )
+        except BulkOperationError as exc:
+            messages.error(request, str(exc))
+        else:
+            log_activity(request, "tasks_unarchived", project_id=project.pk, count=result["updated"])
+            messages.info(request, f"Restored {result['updated']} task(s).")
+        return redirect("project_archive", pk=project.pk)
+
+    tasks, next_cursor = archived_page(project, after=request.GET.get("after"))
+    return render(request, "boards/project_archive.html", {
+        "project": project,
+        "tasks": tasks,
+        "next_cursor": next_cursor,
     })
 
 @login_required
 def project_delete(request, pk):
-    project = get_object_or_404(Project, pk=pk)
+    project = get_object_or_404(LIVE_PROJECTS.select_related("workspace"), pk=pk)
     ws = project.workspace
     if not user_is_workspace_owner(request, ws):
         return HttpResponseForbidden("Only workspace owner can delete projects.")
     if request.method == "POST":
-        project.delete()
+        project.delete_requested_at = now()
+        project.save(update_fields=["delete_requested_at"])
+        log_activity(request, "project_deleted", project_id=project.pk)
         messages.info(request, "Project deleted.")
         return redirect("workspace_detail", pk=ws.pk)
     return render(request, "boards/confirm_delete.html",
@@ -410,6 +606,30 @@ def column_create(request, project_pk):
 
 
 
+@login_required
+def column_tasks(request, pk):
+    """Next page of a column's cards (``?after=<cursor>`` plus board filters)."""
+    col = get_object_or_404(Column, pk=pk)
+    project = user_can_see_project_or_403(request, col.project_id)
+    if not isinstance(project, Project):
+        return project
+
+    filters = parse_board_filters(request)
+    tasks, next_cursor = column_page(col, filters, request.user, after=request.GET.get("after"))
+
+    if request.GET.get("format") == "json":
+        tags, users = {}, {}
+        return JsonResponse({
+            "tasks": [task_payload(t, tags, users) for t in tasks],
+            "tags": tags,
+            "users": users,
+            "next": next_cursor,
+        })
+    render_cards(tasks)
+    response = render(request, "boards/partials/task_cards.html", {"tasks": tasks})
+    response["X-Next-Cursor"] = next_cursor or ""
+    return response
+
 @login_required
 def column_rename(request, pk):
     col = get_object_or_404(Column, pk=pk)
@@ -514,16 +734,17 @@ def task_create(request, project_pk):
 
 @login_required
 def task_edit(request, pk):
-    task = get_object_or_404(Task, pk=pk)
-    project_perm = user_can_see_project_or_403(request, task.project.pk)
-    if not isinstance(project_perm, Project):
-        return HttpResponseForbidden("Not allowed")
+    task = user_can_see_task_or_403(request, pk)
+    if not isinstance(task, Task):
+        return task
 
     workspace = task.project.workspace
 
     if request.method == "POST":
         form = TaskForm(request.POST, instance=task, workspace=workspace)
         if form.is_valid():
+            if "column" in form.changed_data:
+                task.rank = rank_at_end(task.column_id, exclude_pk=task.pk)
             form.save()
             if request.headers.get("X-Requested-With") == "XMLHttpRequest":
                 return HttpResponse(status=204)
@@ -544,10 +765,10 @@ def task_edit(request, pk):
 
 @login_required
 def task_archive(request, pk):
-    task = get_object_or_404(Task, pk=pk)
+    task = user_can_see_task_or_403(request, pk)
+    if not isinstance(task, Task):
+        return task
     project = task.project
-    if not isinstance(user_can_see_project_or_403(request, project.pk), Project):
-        return HttpResponseForbidden("Not allowed")
 
     is_owner = project.workspace.owner_id == request.user.id
     is_creator = task.creator_id == request.user.id
@@ -564,18 +785,29 @@ def task_archive(request, pk):
 
 @login_required
 def task_move(request, pk, column_pk):
-    task = get_object_or_404(Task, pk=pk)
+    task = user_can_see_task_or_403(request, pk)
+    if not isinstance(task, Task):
+        return task
     project = task.project
-    perm = user_can_see_project_or_403(request, project.pk)
-    if not isinstance(perm, Project):
-        return perm
 
     if request.method != "POST":
         return HttpResponseNotAllowed(["POST"])
 
-    column = get_object_or_404(Column, pk=column_pk, project=project)
+    column = get_object_or_404(Column, pk=column_pk, project_id=project.pk)
+
+    # Optional drop target: land right after / before another card.
+    before = request.POST.get("before")
+    after = request.POST.get("after")
     task.column = column
-    task.save(update_fields=["column"])
+    task.rank = rank_for_drop(
+        column.pk,
+        task.pk,
+        before=int(before) if before and before.isdigit() else None,
+        after=int(after) if after and after.isdigit() else None,
+    )
+    task.save(update_fields=["column", "rank"])
+    if needs_rebalance(task.rank):
+        rebalance_column(column.pk)
 
     if request.headers.get("X-Requested-With") == "XMLHttpRequest":
         return JsonResponse({"ok": True, "task": pk, "column": column_pk})
@@ -583,13 +815,45 @@ def task_move(request, pk, column_pk):
     messages.success(request, "Task moved.")
     return redirect("project_detail", pk=project.pk)
 
+@login_required
+def task_bulk(request, pk):
+    """JSON endpoint: apply one operation to many tasks of a board."""
+    project = user_can_see_project_or_403(request, pk)
+    if not isinstance(project, Project):
+        return project
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+
+    try:
+        payload = json.loads(request.body or b"{}")
+        if not isinstance(payload, dict):
+            raise ValueError("Expected a JSON object.")
+        result = apply_bulk_operation(
+            project,
+            request.user,
+            payload.get("tasks"),
+            payload.get("op"),
+            payload.get("value"),
+        )
+    except ValueError as exc:  # includes JSON and BulkOperationError
+        return JsonResponse({"ok": False, "error": str(exc)}, status=400)
+
+    log_activity(
+        request,
+        "tasks_bulk_updated",
+        project_id=project.pk,
+        op=result["op"],
+        count=result["updated"],
+    )
+    return JsonResponse({"ok": True, **result})
+
 # ---------- Comments ----------
 
 @login_required
 def comment_create(request, task_pk):
-    task = get_object_or_404(Task, pk=task_pk)
-    if not isinstance(user_can_see_project_or_403(request, task.project.pk), Project):
-        return HttpResponseForbidden("Not allowed")
+    task = user_can_see_task_or_403(request, task_pk)
+    if not isinstance(task, Task):
+        return task
     if request.method == "POST":
         form = CommentForm(request.POST)
         if form.is_valid():
@@ -608,14 +872,17 @@ def comment_create(request, task_pk):
 def project_clear_tasks(request, pk):
     # Authorize via the workspace owner (adjust later if you add members)
     project = get_object_or_404(
-        Project.objects.select_related('workspace'),
+        LIVE_PROJECTS.select_related('workspace'),
         pk=pk,
         workspace__owner=request.user
     )
 
     if request.method == "POST":
-        # If Task is FK to Column, and Column FK to Project, clear via column__project
-        Task.objects.filter(column__project=project).delete()
+        count = Task.objects.filter(project=project).count()
+        # Large boards are cleared by `process_deletions`, not in the request.
+        if request_clear(project):
+            messages.info(request, f"Clearing {count} tasks in the background.")
+        log_activity(request, "project_cleared", project_id=project.pk, count=count)
 
         # AJAX → 204, otherwise redirect back to board
         if request.headers.get("x-requested-with") == "XMLHttpRequest":
@@ -0,0 +1,8 @@
+"""Gunicorn hooks (picked up automatically from the working directory)."""
+
+
+def worker_exit(server, worker):
+    # Write out any buffered ActivityLog rows before the worker goes away.
+    from boards.telemetry import flush_activity_buffer
+
+    flush_activity_buffer()
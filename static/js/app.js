@@ -11,6 +11,126 @@ function trackEvent(name, props = {}) {
   }
 }
 
+// ---------- Board refresh (JSON + ETag) ----------
+const PRIORITY_LABELS = { low: 'Low', medium: 'Medium', high: 'High' };
+
+function esc(value) {
+  const div = document.createElement('div');
+  div.textContent = value == null ? '' : String(value);
+  return div.innerHTML;
+}
+
+function renderCard(t, data) {
+  const prio = t.priority || 'low';
+  const label = PRIORITY_LABELS[prio] || prio;
+  const assignees = t.assignees
+    .map((id) => `<span class="pill">@${esc(data.users[id])}</span>`).join('');
+  const tags = t.tags
+    .map((id) => `<span class="chip">#${esc(data.tags[id].name)}</span>`).join('');
+  const due = t.due_date ? new Date(`${t.due_date}T00:00:00`).toLocaleDateString() : '';
+  return `
+    <li class="task-card" draggable="true" data-task-id="${t.id}">
+      <div class="task-top">
+        <input type="checkbox" class="task-select" value="${t.id}" aria-label="Select ${esc(t.title)}">
+        <strong class="task-title">${esc(t.title)}</strong>
+        <span class="prio" title="Priority ${label}">
+          <span class="prio-dot prio-${esc(prio)}"></span>
+          <span class="sr-only">Priority ${label}</span>
+        </span>
+      </div>
+      ${t.description ? `<p class="task-desc">${esc(t.description)}</p>` : ''}
+      ${due ? `<div class="muted">Due: ${esc(due)}</div>` : ''}
+      ${assignees ? `<div class="assignees">${assignees}</div>` : ''}
+      ${tags ? `<div class="tags">${tags}</div>` : ''}
+      <div class="task-actions">
+        <a href="/tasks/${t.id}/edit/?partial=1" data-modal-open>Edit</a> ·
+        <a class="danger-link" href="/tasks/${t.id}/archive/">Archive</a>
+      </div>
+    </li>`;
+}
+
+// Re-render the cards in place from board.json (one request); falls back to
+// a full reload when the set of columns changed (new/renamed/deleted column).
+async function refreshBoard() {
+  const board = document.querySelector('.columns[data-board-url]');
+  if (!board) return window.location.reload();
+
+  const lists = [...board.querySelectorAll('.dropzone[data-column-id]')];
+  const url = new URL(board.dataset.boardUrl, window.location.origin);
+  url.search = window.location.search;
+  // Ask for as many cards as the longest column shows, so pages opened with
+  // "Load more" stay open.
+  const shown = Math.max(0, ...lists.map((list) => list.querySelectorAll('.task-card').length));
+  if (shown) url.searchParams.set('depth', shown);
+  // no-cache: the browser revalidates with If-None-Match and reuses its copy on 304.
+  const res = await fetch(url, { cache: 'no-cache', headers: { 'Accept': 'application/json' } });
+  if (!res.ok) return window.location.reload();
+  const data = await res.json();
+
+  const sameColumns =
+    lists.length === data.columns.length &&
+    data.columns.every((col, i) => {
+      const colEl = lists[i].closest('.column');
+      return String(col.id) === lists[i].dataset.columnId &&
+        colEl.querySelector('.column-title').firstChild.textContent.trim() === col.name &&
+        colEl.style.getPropertyValue('--col-color').trim() === col.color;
+    });
+  if (!sameColumns) return window.location.reload();
+
+  data.columns.forEach((col, i) => {
+    const list = lists[i];
+    list.innerHTML = col.tasks.map((t) => renderCard(t, data)).join('');
+    ensurePlaceholder(list);
+    const column = list.closest('.column');
+    const count = column.querySelector('.column-title .count');
+    if (count) count.textContent = col.total;
+    const more = column.querySelector('.load-more');
+    if (more) setLoadMore(more, col.next);
+  });
+}
+
+// ---------- Lazy columns ----------
+// Columns render their first page of cards; "Load more" appends the next
+// page (same filters) from the column's keyset cursor.
+function setLoadMore(button, cursor) {
+  button.dataset.after = cursor || '';
+  button.hidden = !cursor;
+}
+
+async function loadMore(button) {
+  const list = button.closest('.column').querySelector('.dropzone');
+  const url = new URL(button.dataset.url, window.location.origin);
+  url.search = window.location.search;
+  url.searchParams.set('after', button.dataset.after);
+
+  button.disabled = true;
+  try {
+    const res = await fetch(url, { headers: { 'X-Requested-With': 'XMLHttpRequest' } });
+    if (!res.ok) throw new Error('Could not load more tasks');
+    const tpl = document.createElement('template');
+    tpl.innerHTML = await res.text();
+    tpl.content.querySelectorAll('.task-card').forEach((card) => {
+      // A card dropped below the loaded part is already on screen.
+      if (!list.querySelector(`.task-card[data-task-id="${card.dataset.taskId}"]`)) {
+        list.appendChild(card);
+      }
+    });
+    ensurePlaceholder(list);
+    setLoadMore(button, res.headers.get('X-Next-Cursor'));
+  } catch (err) {
+    console.error(err);
+  } finally {
+    button.disabled = false;
+  }
+}
+
+function initLoadMore() {
+  document.addEventListener('click', (e) => {
+    const button = e.target.closest('.load-more');
+    if (button) loadMore(button);
+  });
+}
+
 // ---------- Modal ----------
 function initModals() {
   const dlg  = document.getElementById('app-modal');
@@ -103,7 +223,7 @@ function wireModalForm(scope, dlg) {
       // Success via 204 or redirect
       if (res.status === 204 || res.redirected) {
         dlg.close();
-        window.location.reload();
+        await refreshBoard();
         return;
       }
 
@@ -147,6 +267,15 @@ function ensurePlaceholder(listEl) {
   }
 }
 
+// Card the dragged one should be inserted before, based on pointer Y.
+function cardAfterPointer(zone, y) {
+  const cards = [...zone.querySelectorAll('.task-card:not(.dragging)')];
+  return cards.find((card) => {
+    const box = card.getBoundingClientRect();
+    return y < box.top + box.height / 2;
+  }) || null;
+}
+
 function initDnD() {
   document.addEventListener('dragstart', (e) => {
     const card = e.target.closest('.task-card[draggable="true"]');
@@ -187,10 +316,22 @@ function initDnD() {
     if (!taskId || !columnId) return;
 
     const fromList = draggedEl.parentElement;
-    zone.appendChild(draggedEl);
+    const fromNext = draggedEl.nextSibling;
+    const card = draggedEl;
+    zone.insertBefore(card, cardAfterPointer(zone, e.clientY));
     ensurePlaceholder(fromList);
     ensurePlaceholder(zone);
 
+    // Tell the server which neighbour the card landed next to.
+    const body = new FormData();
+    const prev = card.previousElementSibling;
+    const next = card.nextElementSibling;
+    if (prev && prev.classList.contains('task-card')) {
+      body.append('after', prev.dataset.taskId);
+    } else if (next && next.classList.contains('task-card')) {
+      body.append('before', next.dataset.taskId);
+    }
+
     try {
       const resp = await fetch(`/tasks/${taskId}/move/${columnId}/`, {
         method: 'POST',
@@ -198,11 +339,12 @@ function initDnD() {
           'X-CSRFToken': CSRF,
           'X-Requested-With': 'XMLHttpRequest',
         },
+        body,
       });
       if (!resp.ok) throw new Error('Move failed');
       trackEvent('task-moved', { column: columnId });
     } catch (err) {
-      fromList.appendChild(draggedEl);
+      fromList.insertBefore(card, fromNext && fromNext.parentNode === fromList ? fromNext : null);
       ensurePlaceholder(fromList);
       ensurePlaceholder(zone);
       console.error(err);
@@ -211,6 +353,73 @@ function initDnD() {
   });
 }
 
+// ---------- Bulk actions ----------
+function initBulk() {
+  const bar = document.querySelector('form.bulk-bar');
+  if (!bar) return;
+  const opSelect = bar.querySelector('select[name="op"]');
+  const count = bar.querySelector('.bulk-count');
+
+  const selected = () => [...document.querySelectorAll('.task-select:checked')];
+
+  const refresh = () => {
+    const boxes = selected();
+    document.querySelectorAll('.task-card').forEach((card) => {
+      const box = card.querySelector('.task-select');
+      card.classList.toggle('selected', !!(box && box.checked));
+    });
+    count.textContent = `${boxes.length} selected`;
+    bar.hidden = boxes.length === 0;
+  };
+
+  const showValueFor = (op) => {
+    bar.querySelectorAll('select[name="value"]').forEach((sel) => {
+      sel.hidden = !sel.dataset.ops.split(' ').includes(op);
+    });
+  };
+
+  document.addEventListener('change', (e) => {
+    if (e.target.classList.contains('task-select')) refresh();
+  });
+  opSelect.addEventListener('change', () => showValueFor(opSelect.value));
+  bar.querySelector('[data-bulk-clear]').addEventListener('click', () => {
+    selected().forEach((box) => { box.checked = false; });
+    refresh();
+  });
+
+  bar.addEventListener('submit', async (e) => {
+    e.preventDefault();
+    const op = opSelect.value;
+    const valueSelect = bar.querySelector('select[name="value"]:not([hidden])');
+    const payload = {
+      op,
+      tasks: selected().map((box) => Number(box.value)),
+      value: op === 'archive' || !valueSelect ? null : valueSelect.value,
+    };
+    try {
+      const res = await fetch(bar.dataset.bulkUrl, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          'X-CSRFToken': CSRF,
+          'X-Requested-With': 'XMLHttpRequest',
+        },
+        body: JSON.stringify(payload),
+      });
+      const data = await res.json();
+      if (!res.ok || !data.ok) throw new Error(data.error || 'Bulk update failed');
+      trackEvent('tasks-bulk', { op, count: data.updated });
+      await refreshBoard();
+      refresh();
+    } catch (err) {
+      console.error(err);
+      alert(err.message || 'Could not update tasks. Please try again.');
+    }
+  });
+
+  showValueFor(opSelect.value);
+}
+
 // ---------- Hotkeys (single handler) ----------
 document.addEventListener('keydown', (e) => {
   if (e.target && /input|textarea|select|button/i.test(e.target.tagName)) return;
@@ -234,9 +443,45 @@ document.addEventListener('DOMContentLoaded', () => {
 });
 
 // ---------- Boot ----------
+// ---------- Live updates ----------
+// Other people's changes arrive as server-sent events; each burst triggers
+// one conditional board.json fetch, deferred while the user is mid-edit.
+function initLiveBoard() {
+  const board = document.querySelector('.columns[data-events-url]');
+  if (!board || !window.EventSource) return;
+
+  const source = new EventSource(board.dataset.eventsUrl);
+  let timer = null;
+
+  const refresh = async () => {
+    const modal = document.getElementById('app-modal');
+    if (draggedEl || (modal && modal.open)) {
+      timer = setTimeout(refresh, 1000);
+      return;
+    }
+    timer = null;
+    const checked = [...document.querySelectorAll('.task-select:checked')].map((box) => box.value);
+    await refreshBoard();
+    checked.forEach((id) => {
+      const box = document.querySelector(`.task-select[value="${id}"]`);
+      if (box) box.checked = true;
+    });
+    const box = document.querySelector('.task-select');
+    if (box) box.dispatchEvent(new Event('change', { bubbles: true }));
+  };
+
+  source.addEventListener('board', () => {
+    if (!timer) timer = setTimeout(refresh, 250);
+  });
+  window.addEventListener('beforeunload', () => source.close());
+}
+
 document.addEventListener('DOMContentLoaded', () => {
   initModals();
   initDnD();
+  initBulk();
+  initLoadMore();
+  initLiveBoard();
 });
 
 window.trackEvent = trackEvent;
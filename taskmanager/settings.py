@@ -68,6 +68,7 @@ INSTALLED_APPS = [
 SITE_ID = 1
 
 MIDDLEWARE = [
+    "boards.timing.ServerTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -82,7 +83,8 @@ ROOT_URLCONF = "taskmanager.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates plus render timing for the Server-Timing header.
+        "BACKEND": "boards.timing.TimedDjangoTemplates",
         "DIRS": [],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -108,10 +110,16 @@ if DATABASE_URL:
     DATABASES = {
         "default": dj_database_url.parse(
             DATABASE_URL,
-            conn_max_age=600,
+            # The web process runs under ASGI (Procfile), where persistent
+            # connections are not safe to keep: each request may run on a
+            # different thread. Reuse connections through a pooler such as
+            # PgBouncer instead; WSGI-only deployments can raise this.
+            conn_max_age=int(os.getenv("DB_CONN_MAX_AGE", "0")),
             ssl_require=not DEBUG,
         )
     }
+    # PgBouncer in transaction mode can't keep server-side cursors open.
+    DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = env_bool("DB_DISABLE_SERVER_SIDE_CURSORS")
 else:
     DATABASES = {
         "default": {
@@ -121,6 +129,60 @@ else:
     }
 
 
+# -------------------------
+# Cache
+# -------------------------
+# Board caches are invalidated by bumping version stamps in the cache itself,
+# so they only work when every worker sees the same cache (e.g. Redis or
+# Memcached). With the in-process default they are off unless enabled.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
+if CACHES["default"]["BACKEND"].endswith(".LocMemCache"):
+    # The default of 300 entries is far below one board's rendered cards.
+    CACHES["default"]["OPTIONS"] = {"MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", "20000"))}
+
+CACHE_SHARED = not CACHES["default"]["BACKEND"].endswith(".LocMemCache")
+# Cache built boards (see boards.caching). Rendered cards are cached either
+# way: their keys come from the database.
+BOARD_CACHE_ENABLED = env_bool("BOARD_CACHE_ENABLED", "true" if CACHE_SHARED else "false")
+BOARD_CACHE_TIMEOUT = int(os.getenv("BOARD_CACHE_TIMEOUT", "3600"))
+# Cards rendered per column up front; the rest load on demand.
+BOARD_COLUMN_PAGE_SIZE = int(os.getenv("BOARD_COLUMN_PAGE_SIZE", "50"))
+# Most cards per column board.json returns when a refresh asks for the
+# pages already opened with "Load more" (?depth=).
+BOARD_JSON_MAX_DEPTH = int(os.getenv("BOARD_JSON_MAX_DEPTH", "500"))
+# Stream project_detail column by column (also per request with ?stream=1).
+BOARD_STREAMING = env_bool("BOARD_STREAMING")
+# Server-Timing header on every response (db/tpl/telemetry/email), and
+# optionally one "boards.timing" log line per request.
+SERVER_TIMING = env_bool("SERVER_TIMING", "true")
+SERVER_TIMING_LOG = env_bool("SERVER_TIMING_LOG")
+# Membership checks cached across requests (0: per request only).
+WORKSPACE_ACCESS_CACHE_TIMEOUT = int(
+    os.getenv("WORKSPACE_ACCESS_CACHE_TIMEOUT", "300" if CACHE_SHARED else "0")
+)
+# Incremental board sync: clients further behind than this many journal
+# rows are told to reload the board; `trim_board_changes` drops older rows.
+BOARD_SYNC_MAX_CHANGES = int(os.getenv("BOARD_SYNC_MAX_CHANGES", "500"))
+BOARD_CHANGE_RETENTION_DAYS = int(os.getenv("BOARD_CHANGE_RETENTION_DAYS", "7"))
+# Sync cursors stay behind journal rows younger than this, so rows that
+# commit out of id order are never skipped (see boards.journal).
+BOARD_SYNC_SETTLE_SECONDS = float(os.getenv("BOARD_SYNC_SETTLE_SECONDS", "5"))
+# Live board events (ASGI only). LocalBroker reaches streams in the same
+# process only, so PostgreSQL deployments (several workers) use LISTEN/NOTIFY.
+REALTIME_BROKER = os.getenv(
+    "REALTIME_BROKER",
+    "boards.realtime.PostgresBroker"
+    if "postgresql" in DATABASES["default"]["ENGINE"]
+    else "boards.realtime.LocalBroker",
+)
+REALTIME_HEARTBEAT = float(os.getenv("REALTIME_HEARTBEAT", "15"))
+
+
 # -------------------------
 # Password validation
 # -------------------------
@@ -190,7 +252,13 @@ EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD", "")
 EMAIL_USE_TLS = env_bool("EMAIL_USE_TLS", "true")
 EMAIL_USE_SSL = env_bool("EMAIL_USE_SSL", "false")
 EMAIL_TIMEOUT = 20
+# Queue emails in the OutboundEmail table and deliver them from the
+# `send_outbox_emails` worker instead of inside the request.
+EMAIL_OUTBOX_ENABLED = env_bool("EMAIL_OUTBOX_ENABLED", "false" if DEBUG else "true")
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "8"))
 SITE_NAME = "Task Manager"
+# Absolute base URL for links in emails sent outside a request (digests).
+SITE_URL = os.getenv("SITE_URL", "https://tasks.blurryshady.dev")
 
 
 # -------------------------
@@ -201,6 +269,19 @@ PLAUSIBLE_SCRIPT = os.getenv("PLAUSIBLE_SCRIPT", "https://plausible.io/js/script
 ANALYTICS_ENABLED = bool(PLAUSIBLE_DOMAIN)
 
 ENABLE_TELEMETRY = env_bool("ENABLE_TELEMETRY", "true")
+# "sync" writes each ActivityLog row inside the request; "buffered" queues
+# rows in-process and writes them in batches from a background thread.
+TELEMETRY_MODE = os.getenv("TELEMETRY_MODE", "sync")
+TELEMETRY_BUFFER_SIZE = int(os.getenv("TELEMETRY_BUFFER_SIZE", "1000"))
+TELEMETRY_BATCH_SIZE = int(os.getenv("TELEMETRY_BATCH_SIZE", "100"))
+TELEMETRY_FLUSH_INTERVAL = float(os.getenv("TELEMETRY_FLUSH_INTERVAL", "2.0"))
+# Raw ActivityLog rows are deleted by `rollup_activity` once rolled up and
+# older than this many days (0 keeps them forever).
+ACTIVITY_RETENTION_DAYS = int(os.getenv("ACTIVITY_RETENTION_DAYS", "90"))
+# When set, `archive_activity` moves old rows into compressed JSONL segments
+# here and `rollup_activity` stops deleting raw rows itself.
+ACTIVITY_ARCHIVE_DIR = os.getenv("ACTIVITY_ARCHIVE_DIR", "")
+ACTIVITY_ARCHIVE_COMPRESSION = os.getenv("ACTIVITY_ARCHIVE_COMPRESSION", "gzip")  # or "zstd"
 
 
 # -------------------------
@@ -224,5 +305,10 @@ LOGGING = {
             "level": "ERROR",
             "propagate": False,
         },
+        "boards.timing": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
     },
 }
\ No newline at end of file